@@ -0,0 +1,102 @@
+"""
+ClusterEngine.suggest_clusters time vs number of affected satellites.
+
+    cd backend && PYTHONPATH=src python bench/bench_cluster_engine.py [max_sats]
+
+Every satellite is degraded (all go through clustering). Layouts:
+
+regional    a wide-area jamming event: sats spread over a ~4000 km box
+global      sats spread uniformly over the sphere
+edges       sats packed around both poles and along the antimeridian
+
+all-pairs   the previous adjacency build (haversine on every pair) + BFS, run up to
+            5k sats; the grid result is checked against it
+"""
+import math, random, sys, time
+from collections import deque
+
+from orbverflow.engines.cluster_engine import ClusterEngine, haversine_km
+from orbverflow.models import TelemetryRecord
+
+MAX = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+SIZES = [n for n in (10, 100, 1000, 5000, 10000, 50000, 100000) if n <= MAX]
+ALL_PAIRS_MAX = 5000
+
+
+def layout(kind: str, n: int, rng: random.Random):
+    for _ in range(n):
+        if kind == "regional":
+            yield rng.uniform(10, 45), rng.uniform(100, 145)
+        elif kind == "global":
+            yield math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)
+        else:
+            k = rng.random()
+            if k < 0.35:
+                yield rng.uniform(80, 90), rng.uniform(-180, 180)
+            elif k < 0.7:
+                yield rng.uniform(-90, -80), rng.uniform(-180, 180)
+            else:
+                yield rng.uniform(-80, 80), rng.choice((-1, 1)) * rng.uniform(170, 180)
+
+
+def fleet(kind: str, n: int):
+    rng = random.Random(n)
+    return {
+        f"S{i}": TelemetryRecord(
+            timestamp=0.0, sat_id=f"S{i}", lat=lat, lon=lon, alt=550.0, snr_db=3.0,
+            rssi_dbm=-90.0, packet_loss_pct=90.0, link_state="DOWN",
+        )
+        for i, (lat, lon) in enumerate(layout(kind, n, rng))
+    }
+
+
+def all_pairs(engine: ClusterEngine, latest):
+    affected = list(latest)
+    adj = {s: [] for s in affected}
+    for i, a in enumerate(affected):
+        ra = latest[a]
+        for b in affected[i + 1:]:
+            rb = latest[b]
+            if haversine_km(ra.lat, ra.lon, rb.lat, rb.lon) <= engine.cfg.distance_km_max:
+                adj[a].append(b)
+                adj[b].append(a)
+    seen, comps = set(), []
+    for s in affected:
+        if s in seen:
+            continue
+        seen.add(s)
+        q, comp = deque([s]), []
+        while q:
+            x = q.pop()
+            comp.append(x)
+            for y in adj[x]:
+                if y not in seen:
+                    seen.add(y)
+                    q.append(y)
+        comps.append(sorted(comp))
+    return comps
+
+
+def main() -> None:
+    for dist in (1500.0, 300.0):
+        engine = ClusterEngine()
+        engine.cfg.distance_km_max = dist
+        print(f"distance_km_max={dist:.0f}")
+        for kind in ("regional", "global", "edges"):
+            for n in SIZES:
+                latest = fleet(kind, n)
+                t = time.perf_counter()
+                res = engine.suggest_clusters(latest)
+                dt = time.perf_counter() - t
+                line = f"  {kind:<8} {n:>7} sats  grid {dt * 1000:9.1f} ms  clusters {len(res.clusters):>5}"
+                if n <= ALL_PAIRS_MAX:
+                    t = time.perf_counter()
+                    comps = all_pairs(engine, latest)
+                    base = time.perf_counter() - t
+                    assert engine._components(list(latest), latest) == comps, (kind, n)
+                    line += f"  all-pairs {base * 1000:9.1f} ms  ({base / max(dt, 1e-9):5.1f}x, same components)"
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
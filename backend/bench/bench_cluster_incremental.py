@@ -0,0 +1,107 @@
+"""
+suggest_clusters per tick: recomputed from scratch vs incremental (ClusterTracker).
+
+    cd backend && PYTHONPATH=src python bench/bench_cluster_incremental.py [sats] [ticks]
+
+fleet       20% of the sats degraded across 12 jamming regions of ~600 km, the rest ok
+tick        churn: 0.5% of the fleet switches degraded <-> ok and 0.5% jumps to a new
+            position, everything else keeps its record
+            drift: every sat also moves ~5 km (move_tolerance_km=25 for incremental)
+full        ClusterConfig(incremental=False): components rebuilt on every call
+incremental ClusterConfig(incremental=True); churn results are checked against full
+            every tick, and clusters whose members did not change must keep their id
+"""
+import math, random, sys, time
+
+from orbverflow.engines.cluster_engine import ClusterConfig, ClusterEngine
+from orbverflow.models import TelemetryRecord
+
+SATS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+TICKS = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+REGIONS = [(random.Random(r).uniform(-50, 50), random.Random(r + 100).uniform(-180, 180)) for r in range(12)]
+
+
+def record(sid: str, lat: float, lon: float, degraded: bool, rng: random.Random) -> TelemetryRecord:
+    snr, loss = (rng.uniform(0, 6), rng.uniform(60, 100)) if degraded else (rng.uniform(13, 20), rng.uniform(0, 5))
+    return TelemetryRecord(
+        timestamp=0.0, sat_id=sid, lat=lat, lon=lon, alt=550.0, snr_db=snr,
+        rssi_dbm=-80.0, packet_loss_pct=loss, link_state="DEGRADED" if degraded else "OK",
+    )
+
+
+def place(rng: random.Random, degraded: bool):
+    if degraded:
+        lat0, lon0 = rng.choice(REGIONS)
+        return lat0 + rng.uniform(-2.7, 2.7), (lon0 + rng.uniform(-2.7, 2.7) + 180.0) % 360.0 - 180.0
+    return math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)
+
+
+def fleet(rng: random.Random):
+    out = {}
+    for i in range(SATS):
+        degraded = rng.random() < 0.2
+        out[f"S{i}"] = record(f"S{i}", *place(rng, degraded), degraded, rng)
+    return out
+
+
+def tick(latest, rng: random.Random, drift: bool):
+    out = dict(latest)
+    ids = list(latest)
+    for sid in rng.sample(ids, SATS // 200):  # switch state
+        degraded = latest[sid].link_state != "DEGRADED"
+        out[sid] = record(sid, *place(rng, degraded), degraded, rng)
+    for sid in rng.sample(ids, SATS // 200):  # jump
+        r = out[sid]
+        out[sid] = record(sid, *place(rng, r.link_state == "DEGRADED"), r.link_state == "DEGRADED", rng)
+    if drift:
+        for sid, r in out.items():
+            lon = (r.lon + 0.05 + 180.0) % 360.0 - 180.0
+            out[sid] = r.model_copy(update={"lat": max(-90.0, min(90.0, r.lat + 0.01)), "lon": lon})
+    return out
+
+
+def run(drift: bool) -> None:
+    rng = random.Random(11)
+    full = ClusterEngine(ClusterConfig(incremental=False))
+    inc = ClusterEngine(ClusterConfig(incremental=True, move_tolerance_km=25.0 if drift else 0.0))
+    latest = fleet(rng)
+    inc.suggest_clusters(latest)  # first call loads the full result
+    t_full = t_inc = 0.0
+    prev_ids = {}
+    kept = changed = 0
+    for _ in range(TICKS):
+        latest = tick(latest, rng, drift)
+        t = time.perf_counter()
+        ref = full.suggest_clusters(latest)
+        t_full += time.perf_counter() - t
+        t = time.perf_counter()
+        res = inc.suggest_clusters(latest)
+        t_inc += time.perf_counter() - t
+        if not drift:
+            assert sorted(c.members for c in res.clusters) == sorted(c.members for c in ref.clusters)
+        ids = {tuple(c.members): c.cluster_id for c in res.clusters}
+        assert len(set(ids.values())) == len(ids)
+        for members, cid in ids.items():
+            if members in prev_ids:
+                assert prev_ids[members] == cid, members
+                kept += 1
+            else:
+                changed += 1
+        prev_ids = ids
+    s = inc.stats()
+    print(
+        f"{'drift' if drift else 'churn':<6} full {t_full / TICKS * 1000:8.1f} ms/tick   incremental "
+        f"{t_inc / TICKS * 1000:8.1f} ms/tick ({t_full / t_inc:5.1f}x)   clusters {len(res.clusters)}"
+        f"   unchanged kept their id {kept}, changed {changed}"
+        f"   rebuilds {s['rebuilds']}/{s['ticks']}  cells {s['cells']}  ids issued {s['ids_issued']}"
+    )
+
+
+def main() -> None:
+    print(f"{SATS} sats, {TICKS} ticks")
+    run(drift=False)
+    run(drift=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+suggest_clusters latency on one fleet snapshot: previous scalar path vs batch scoring.
+
+    cd backend && PYTHONPATH=src python bench/bench_cluster_scoring.py [sats]
+
+snapshots   jamming: 10% of the fleet degraded inside a ~2000 km region, the rest ok
+            outage:  every satellite degraded, spread over a ~4000 km box
+previous    consistency() for every sat (reasons + pydantic model each), haversine on
+            every pair of affected sats, BFS
+scalar      suggest_clusters() with ClusterConfig.vectorized=False (grid, no NumPy)
+numpy       suggest_clusters() with the NumPy batch path
+            (both with compact_per_sat=True: no result built for "ok" sats)
+"""
+import math, random, sys, time
+
+from bench_cluster_engine import all_pairs
+from orbverflow.engines.cluster_engine import ClusterConfig, ClusterEngine, np
+from orbverflow.models import TelemetryRecord
+
+SATS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+def snapshot(kind: str, n: int):
+    rng = random.Random(7)
+    out = {}
+    for i in range(n):
+        if kind == "outage" or rng.random() < 0.1:
+            lat, lon = (rng.uniform(20, 38), rng.uniform(110, 130)) if kind == "jamming" else (rng.uniform(10, 45), rng.uniform(100, 145))
+            snr, loss = rng.uniform(0, 6), rng.uniform(60, 100)
+        else:
+            lat, lon = math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)
+            snr, loss = rng.uniform(13, 20), rng.uniform(0, 5)
+        out[f"S{i}"] = TelemetryRecord(
+            timestamp=0.0, sat_id=f"S{i}", lat=lat, lon=lon, alt=550.0, snr_db=snr,
+            rssi_dbm=-80.0, packet_loss_pct=loss, link_state="DEGRADED",
+        )
+    return out
+
+
+def previous(engine: ClusterEngine, latest):
+    per_sat = engine.consistency(latest)
+    affected = {s: latest[s] for s, c in per_sat.items() if c.score >= engine.cfg.cluster_intensity_threshold}
+    return [c for c in all_pairs(engine, affected) if len(c) >= 2]
+
+
+def best(fn, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def main() -> None:
+    print(f"{SATS} sats, numpy {'yes' if np is not None else 'not installed'}")
+    for kind in ("jamming", "outage"):
+        latest = snapshot(kind, SATS)
+        scalar = ClusterEngine(ClusterConfig(vectorized=False, compact_per_sat=True))
+        vector = ClusterEngine(ClusterConfig(compact_per_sat=True))
+        ref = previous(scalar, latest)
+        for engine in (scalar, vector):
+            res = engine.suggest_clusters(latest)
+            assert sorted(c.members for c in res.clusters) == sorted(ref), kind
+        t_prev = best(lambda: previous(scalar, latest), repeat=1)
+        t_scalar = best(lambda: scalar.suggest_clusters(latest))
+        t_vec = best(lambda: vector.suggest_clusters(latest))
+        res = vector.suggest_clusters(latest)
+        print(
+            f"{kind:<8} previous {t_prev * 1000:9.1f} ms   scalar {t_scalar * 1000:8.1f} ms"
+            f"   numpy {t_vec * 1000:8.1f} ms ({t_prev / t_vec:6.1f}x)"
+            f"   clusters {len(res.clusters)}  per_sat {len(res.per_sat)}  ok_sats {res.ok_sats}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Sharded Airbus pack load time vs parser processes.
+
+    cd backend && PYTHONPATH=src python bench/bench_pack_load.py [shards] [rows_per_shard]
+
+Writes a pack of gzip'd CSV shards to a temp dir, then loads it with iter_airbus_pack()
+at workers = 1, 2, 4, ... up to the CPU count and reports rows/s and speedup.
+"""
+import csv, gzip, io, os, random, sys, tempfile, time
+
+from orbverflow.airbus.pack_loader import iter_airbus_pack
+
+SHARDS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+MAPPING = os.path.join(os.path.dirname(__file__), "..", "data", "mapping_airbus_v0.1.json")
+HEADER = ["timestamp", "satelliteId", "lat", "lon", "alt", "snr", "rssi", "loss", "modemReset", "linkState"]
+
+
+def write_pack(pack_dir: str) -> None:
+    t0 = time.time() - 3600
+    for k in range(SHARDS):
+        buf = io.StringIO()
+        w = csv.writer(buf)
+        w.writerow(HEADER)
+        for i in range(ROWS):
+            w.writerow([
+                f"{t0 + (i * SHARDS + k) * 0.01:.3f}", f"Sat{(i + k) % 1000}",
+                f"{random.uniform(-60, 60):.4f}", f"{random.uniform(-180, 180):.4f}", 550,
+                f"{random.uniform(3, 18):.2f}", -70, f"{random.uniform(0, 5):.2f}", 0, "OK",
+            ])
+        with gzip.open(os.path.join(pack_dir, f"telemetry_{k:03d}.csv.gz"), "wt", newline="") as f:
+            f.write(buf.getvalue())
+
+
+def load(pack_dir: str, workers: int) -> float:
+    t = time.perf_counter()
+    n = sum(len(b) for b in iter_airbus_pack(pack_dir, MAPPING, "AIRBUS", "BENCH", "v0.1", workers=workers))
+    assert n == SHARDS * ROWS
+    return time.perf_counter() - t
+
+
+def main() -> None:
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, cpus, *(w for w in (2, 4, 8, 16, 32) if w < cpus)})
+    with tempfile.TemporaryDirectory() as pack_dir:
+        write_pack(pack_dir)
+        print(f"{SHARDS} shards x {ROWS} rows, {cpus} CPUs")
+        base = None
+        for w in counts:
+            dt = load(pack_dir, w)
+            base = base or dt
+            print(f"workers={w:<3} {dt:7.2f} s  {SHARDS * ROWS / dt:>10,.0f} rows/s  speedup {base / dt:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
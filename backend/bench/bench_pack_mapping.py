@@ -0,0 +1,108 @@
+"""
+Single-file Airbus pack load rate (parse + mapping) on the demo pack scaled up.
+
+    cd backend && PYTHONPATH=src python bench/bench_pack_mapping.py [rows]
+
+per-row     the previous loader: walk the mapping per row, guess int/float for every value,
+            build source_fields per row, then TelemetryRecord(**fields)
+rows        iter_airbus_pack_rows(): compiled mapping -> TelemetryRows (what /airbus/load uses)
+records     iter_airbus_pack(): same, as TelemetryRecords
+"""
+import csv, json, os, sys, tempfile, time
+from datetime import datetime, timezone
+
+from orbverflow.airbus.pack_loader import _iter_json_records, LoadProgress, iter_airbus_pack, iter_airbus_pack_rows
+from orbverflow.models import TelemetryRecord, provenance_interner
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+HERE = os.path.dirname(__file__)
+MAPPING = os.path.join(HERE, "..", "data", "mapping_airbus_v0.1.json")
+DEMO = os.path.join(HERE, "..", "tests", "airbus_pack_demo", "telemetry.json")
+
+
+def write_packs(root: str) -> None:
+    with open(DEMO, encoding="utf-8") as f:
+        demo = json.load(f)
+    rows = [dict(demo[i % len(demo)], timestamp=1790000000 + i * 0.1) for i in range(ROWS)]
+    os.makedirs(os.path.join(root, "json"))
+    with open(os.path.join(root, "json", "telemetry.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+    os.makedirs(os.path.join(root, "csv"))
+    header = list(rows[0])
+    with open(os.path.join(root, "csv", "telemetry.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        w.writerows([r.get(k, "") for k in header] for r in rows)
+
+
+def _coerce_number(x):
+    if isinstance(x, str):
+        s = x.strip()
+        if s == "" or s.lower() == "null":
+            return None
+        try:
+            return float(s) if "." in s else int(s)
+        except ValueError:
+            return x
+    return x
+
+
+def _parse_timestamp(v):
+    if isinstance(v, (int, float)):
+        return float(v)
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    dt = datetime.fromisoformat(v.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def per_row(pack_dir: str) -> int:
+    with open(MAPPING, encoding="utf-8") as f:
+        mapping = json.load(f)
+    base = provenance_interner.make(source_vendor="AIRBUS", source_file="telemetry.json")
+    n = 0
+    for row in _iter_json_records(os.path.join(pack_dir, "telemetry.json"), LoadProgress()):
+        out, used = {}, []
+        for src, dst in mapping.items():
+            if src in row:
+                used.append(src)
+                out[dst] = _coerce_number(row[src])
+        out["timestamp"] = _parse_timestamp(out["timestamp"])
+        out.setdefault("rssi_dbm", -70.0)
+        out.setdefault("modem_reset_count", 0)
+        out["provenance"] = provenance_interner.with_fields(base, used)
+        TelemetryRecord(**out)
+        n += 1
+    return n
+
+
+def rate(fn, pack_dir: str) -> float:
+    best = float("inf")
+    for _ in range(3):
+        t = time.perf_counter()
+        n = fn(pack_dir)
+        best = min(best, time.perf_counter() - t)
+    return n / best
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        write_packs(root)
+        print(f"{ROWS} rows")
+        for kind in ("json", "csv"):
+            d = os.path.join(root, kind)
+            rows = rate(lambda p: sum(map(len, iter_airbus_pack_rows(p, MAPPING, "AIRBUS", "BENCH", "v0.1"))), d)
+            recs = rate(lambda p: sum(map(len, iter_airbus_pack(p, MAPPING, "AIRBUS", "BENCH", "v0.1"))), d)
+            line = f"{kind:<5} rows {rows:>10,.0f} r/s   records {recs:>10,.0f} r/s"
+            if kind == "json":
+                base = rate(per_row, d)
+                line += f"   per-row {base:>9,.0f} r/s   rows speedup {rows / base:4.1f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
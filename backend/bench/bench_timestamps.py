@@ -0,0 +1,70 @@
+"""
+Timestamp decoding rate: the previous per-row parser vs orbverflow.timestamps.
+
+    cd backend && PYTHONPATH=src python bench/bench_timestamps.py [rows] [sats]
+
+fleet-tick  ISO strings shared by `sats` rows (one per tick across the fleet, as in packs)
+distinct    a different ISO string on every row (worst case for the memo)
+epoch       numeric strings
+
+previous    str.replace + datetime.fromisoformat per row (after a failed float())
+per-row     parse_timestamp() per value (what ingest validation uses)
+column      parse_timestamps() on the whole column (what the CSV pack reader uses)
+"""
+import sys, time
+from datetime import datetime, timezone
+
+from orbverflow.timestamps import parse_iso, parse_timestamp, parse_timestamps
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+SATS = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+T0 = 1790000000
+
+
+def previous(v):
+    if isinstance(v, (int, float)):
+        return float(v)
+    try:
+        return float(v)
+    except ValueError:
+        pass
+    dt = datetime.fromisoformat(v.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def iso(t: float) -> str:
+    return datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def rate(fn, values) -> float:
+    best = float("inf")
+    for _ in range(3):
+        parse_iso.cache_clear()
+        t = time.perf_counter()
+        fn(values)
+        best = min(best, time.perf_counter() - t)
+    return len(values) / best
+
+
+def main() -> None:
+    cases = {
+        "fleet-tick": [iso(T0 + i // SATS) for i in range(ROWS)],
+        "distinct": [iso(T0 + i * 0.001) for i in range(ROWS)],
+        "epoch": [f"{T0 + i // SATS:.3f}" for i in range(ROWS)],
+    }
+    print(f"{ROWS} values, {SATS} sats per tick")
+    for name, values in cases.items():
+        assert all(abs(previous(v) - parse_timestamp(v)) < 1e-6 for v in values[:10000])
+        base = rate(lambda vs: [previous(v) for v in vs], values)
+        row = rate(lambda vs: [parse_timestamp(v) for v in vs], values)
+        col = rate(parse_timestamps, values)
+        print(
+            f"{name:<10} previous {base:>11,.0f}/s   per-row {row:>11,.0f}/s ({row / base:4.1f}x)"
+            f"   column {col:>12,.0f}/s ({col / base:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Validated vs trusted record construction at simulator-style ticks.
+
+    cd backend && PYTHONPATH=src python bench/bench_trusted_source.py [records_per_tick] [ticks]
+
+validated    TelemetryRecord(**fields) per sample (what generate_batch did)
+adapter      one TypeAdapter(List[TelemetryRecord]) call per tick
+trusted      TrustedSource.records(): construct without validation, 1 in 100 validated
+Each variant also reports build + store.add_records() per tick.
+"""
+import asyncio, random, sys, time
+
+from pydantic import TypeAdapter
+from typing import List
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.simulator.engine import SIM_PROVENANCE
+from orbverflow.state_store import TelemetryStateStore
+from orbverflow.trusted_sources import TrustedSource
+
+PER_TICK = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+TICKS = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+SATS = 1000
+
+
+def tick_fields(tick: int) -> List[dict]:
+    now = time.time() - TICKS + tick
+    return [
+        dict(
+            timestamp=now + (i // SATS) * 1e-3, sat_id=f"Sat{i % SATS}",
+            lat=random.uniform(-60, 60), lon=random.uniform(-180, 180), alt=550.0,
+            snr_db=random.uniform(12, 18), rssi_dbm=-70.0, packet_loss_pct=random.uniform(0, 3),
+            modem_reset_count=0, link_state="OK", spoofing=False, provenance=SIM_PROVENANCE,
+        )
+        for i in range(PER_TICK)
+    ]
+
+
+async def run(name, ticks, build) -> None:
+    t_build = t_total = float("inf")
+    for _ in range(3):  # best of 3, fresh store each time
+        store = TelemetryStateStore(window_seconds=3600)
+        b = total = 0.0
+        for fields in ticks:
+            t0 = time.perf_counter()
+            records = build(fields)
+            t1 = time.perf_counter()
+            await store.add_records(records)
+            b += t1 - t0
+            total += time.perf_counter() - t0
+        t_build, t_total = min(t_build, b), min(t_total, total)
+    per = lambda t: t / len(ticks) * 1000.0
+    n = PER_TICK * len(ticks)
+    print(f"{name:<10} build {per(t_build):7.2f} ms/tick ({n / t_build:>10,.0f} rec/s)   "
+          f"build+store {per(t_total):7.2f} ms/tick ({n / t_total:>9,.0f} rec/s)")
+
+
+async def main():
+    ticks = [tick_fields(t) for t in range(TICKS)]
+    adapter = TypeAdapter(List[TelemetryRecord])
+    src = TrustedSource("bench", sample_every=100)
+
+    print(f"{PER_TICK} records/tick, {TICKS} ticks")
+    await run("validated", ticks, lambda fs: [TelemetryRecord(**f) for f in fs])
+    await run("adapter", ticks, adapter.validate_python)
+    await run("trusted", ticks, src.records)
+    print(f"trusted source: {src.stats()}")
+
+
+asyncio.run(main())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from orbverflow.airbus.pack_loader import LoadProgress
+
+
+class PackLoadJob:
+    """One /airbus/load run: loader progress plus what actually reached the store."""
+
+    def __init__(self, job_id: str, pack_dir: str) -> None:
+        self.job_id = job_id
+        self.pack_dir = pack_dir
+        self.state = "running"  # running | done | failed
+        self.progress = LoadProgress()
+        self.ingested = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.state = "failed" if error else "done"
+        self.error = error
+        self.finished_at = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at
+        return {
+            "job_id": self.job_id,
+            "pack_dir": self.pack_dir,
+            "state": self.state,
+            **self.progress.as_dict(),
+            "ingested": self.ingested,
+            "duplicates": self.duplicates,
+            "batches": self.batches,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_sec": round(elapsed, 3),
+            "rows_per_sec": round(self.progress.rows / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+class PackLoadJobs:
+    """Recent pack loads (bounded), newest last."""
+
+    def __init__(self, keep: int = 20) -> None:
+        self.keep = keep
+        self._jobs: "OrderedDict[str, PackLoadJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def create(self, pack_dir: str) -> PackLoadJob:
+        job = PackLoadJob(f"load-{next(self._ids)}", pack_dir)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.keep:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: Optional[str] = None) -> Optional[PackLoadJob]:
+        if job_id is None:
+            return next(reversed(self._jobs.values()), None)
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [j.as_dict() for j in self._jobs.values()]
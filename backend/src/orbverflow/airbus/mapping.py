@@ -0,0 +1,396 @@
+"""
+Pack field mappings, compiled once per mapping file.
+
+Mapping JSON (data/mapping_airbus_v*.json):
+
+  {
+    "satelliteId": "sat_id",                           # plain rename
+    "altMeters":   {"to": "alt", "unit": "m"},         # declared unit -> converted to km
+    "pwr":         {"to": "power_watt", "scale": 0.001, "offset": 0.0},
+    "$derived": {                                      # target fields computed after mapping
+      "link_state": {"from": "packet_loss_pct", "bands": [[20, "OK"], [60, "DEGRADED"]], "else": "DOWN"},
+      "spoofing":   {"const": false}
+    }
+  }
+
+Derived fields only apply when the row did not provide the field itself.
+"""
+from __future__ import annotations
+
+import math
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from orbverflow.models import Provenance, provenance_interner
+from orbverflow.telemetry_rows import TelemetryRow, construct_record, link_code
+from orbverflow.timestamps import parse_timestamp
+
+
+class MappingError(ValueError):
+    pass
+
+
+def _to_int(v: Any) -> int:
+    if type(v) is int:
+        return v
+    f = float(v)
+    if not f.is_integer():
+        raise ValueError(f"not an integer: {v!r}")
+    return int(f)
+
+
+def _to_int32(v: Any) -> int:
+    # same bounds as TelemetryRecord.modem_reset_count
+    i = _to_int(v)
+    if not -(1 << 31) <= i < 1 << 31:
+        raise ValueError(f"out of int32 range: {v!r}")
+    return i
+
+
+def _to_str(v: Any) -> str:
+    if type(v) is str:
+        return v
+    if v is None:
+        raise TypeError("null")
+    return str(v)
+
+
+_TRUE = {"true", "1", "yes", "y", "t"}
+_FALSE = {"false", "0", "no", "n", "f"}
+
+
+def _to_bool(v: Any) -> bool:
+    if type(v) is bool:
+        return v
+    if isinstance(v, (int, float)) and v in (0, 1):
+        return bool(v)
+    if isinstance(v, str):
+        s = v.strip().lower()
+        if s in _TRUE:
+            return True
+        if s in _FALSE:
+            return False
+    raise ValueError(f"not a boolean: {v!r}")
+
+
+# target field -> converter (same types TelemetryRecord validates to)
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "timestamp": parse_timestamp,
+    "sat_id": _to_str,
+    "lat": float,
+    "lon": float,
+    "alt": float,
+    "snr_db": float,
+    "rssi_dbm": float,
+    "packet_loss_pct": float,
+    "modem_reset_count": _to_int32,
+    "power_watt": float,
+    "link_state": _to_str,
+    "spoofing": _to_bool,
+}
+
+# loader defaults for target fields a row may leave out (everything else is required)
+_DEFAULTS: Dict[str, Any] = {
+    "rssi_dbm": -70.0,
+    "modem_reset_count": 0,
+    "power_watt": None,
+    "spoofing": False,
+}
+
+# declared unit -> (scale, offset) into the record's unit (timestamp s, alt km, lat/lon deg, ...)
+_UNITS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "timestamp": {"s": (1.0, 0.0), "ms": (1e-3, 0.0), "us": (1e-6, 0.0)},
+    "lat": {"deg": (1.0, 0.0), "rad": (180.0 / math.pi, 0.0)},
+    "lon": {"deg": (1.0, 0.0), "rad": (180.0 / math.pi, 0.0)},
+    "alt": {"km": (1.0, 0.0), "m": (1e-3, 0.0), "ft": (0.0003048, 0.0)},
+    "snr_db": {"db": (1.0, 0.0)},
+    "rssi_dbm": {"dbm": (1.0, 0.0), "dbw": (1.0, 30.0)},
+    "packet_loss_pct": {"pct": (1.0, 0.0), "fraction": (100.0, 0.0)},
+    "power_watt": {"w": (1.0, 0.0), "mw": (1e-3, 0.0), "kw": (1e3, 0.0)},
+}
+
+_NUMERIC = {"timestamp", "lat", "lon", "alt", "snr_db", "rssi_dbm", "packet_loss_pct", "power_watt"}
+_REQUIRED = object()  # no default: the row must provide it
+_SKIP = object()      # no default, but a derived field fills it in
+
+
+def _is_null(v: Any) -> bool:
+    return v is None or (isinstance(v, str) and v.strip().lower() in ("", "null"))
+
+
+def _scaled(conv: Callable[[Any], Any], scale: float, offset: float) -> Callable[[Any], float]:
+    def convert(v: Any) -> float:
+        return conv(v) * scale + offset
+    return convert
+
+
+def _compile_field(src: str, spec: Any) -> Tuple[str, Callable[[Any], Any]]:
+    if isinstance(spec, str):
+        dst, scale, offset = spec, 1.0, 0.0
+    elif isinstance(spec, dict) and isinstance(spec.get("to"), str):
+        dst = spec["to"]
+        if "unit" in spec:
+            units = _UNITS.get(dst, {})
+            unit = str(spec["unit"]).lower()
+            if unit not in units:
+                raise MappingError(f"{src}: unit {spec['unit']!r} not supported for {dst} (known: {sorted(units)})")
+            scale, offset = units[unit]
+        else:
+            scale, offset = float(spec.get("scale", 1.0)), float(spec.get("offset", 0.0))
+    else:
+        raise MappingError(f"{src}: expected a target field name or {{\"to\": ...}}, got {spec!r}")
+
+    if dst not in _CONVERTERS:
+        raise MappingError(f"{src}: unknown target field {dst!r}")
+    conv = _CONVERTERS[dst]
+    if (scale, offset) != (1.0, 0.0):
+        if dst not in _NUMERIC:
+            raise MappingError(f"{src}: {dst} is not numeric, cannot scale it")
+        conv = _scaled(conv, scale, offset)
+    return dst, conv
+
+
+def _compile_derived(dst: str, spec: Any) -> Tuple[Optional[str], Callable[[Any], Any]]:
+    """(target field it is computed from or None, function of that field's value)."""
+    if dst not in _CONVERTERS:
+        raise MappingError(f"$derived: unknown target field {dst!r}")
+    if not isinstance(spec, dict):
+        raise MappingError(f"$derived.{dst}: expected an object, got {spec!r}")
+    if "const" in spec:
+        value = _CONVERTERS[dst](spec["const"])
+        return None, lambda _: value
+    src = spec.get("from")
+    if src not in _CONVERTERS or src == dst:
+        raise MappingError(f"$derived.{dst}: 'from' must be another target field, got {src!r}")
+    if "bands" in spec:
+        # [[upper bound (exclusive), value], ...] in increasing order, "else" above the last one
+        bands = [(float(hi), _CONVERTERS[dst](v)) for hi, v in spec["bands"]]
+        if "else" not in spec:
+            raise MappingError(f"$derived.{dst}: bands need an 'else' value")
+        fallback = _CONVERTERS[dst](spec["else"])
+
+        def band(x: Any) -> Any:
+            for hi, v in bands:
+                if x < hi:
+                    return v
+            return fallback
+        return src, band
+    if dst not in _NUMERIC:
+        raise MappingError(f"$derived.{dst}: needs 'const' or 'bands'")
+    scale, offset = float(spec.get("scale", 1.0)), float(spec.get("offset", 0.0))
+    return src, lambda x: x * scale + offset
+
+
+def _row_of_fields(out: Dict[str, Any], pid: int) -> TelemetryRow:
+    power = out["power_watt"]
+    return (
+        out["timestamp"], out["sat_id"], out["lat"], out["lon"], out["alt"],
+        out["snr_db"], out["rssi_dbm"], out["packet_loss_pct"],
+        math.nan if power is None else power,
+        out["modem_reset_count"],
+        link_code(out["link_state"]),
+        1 if out["spoofing"] else 0,
+        pid,
+    )
+
+
+RowBuilder = Callable[[Any], Any]
+
+# target fields in TelemetryRow order (provenance id last, added by the builder)
+_ROW_FIELDS = (
+    "timestamp", "sat_id", "lat", "lon", "alt", "snr_db", "rssi_dbm", "packet_loss_pct",
+    "power_watt", "modem_reset_count", "link_state", "spoofing",
+)
+_RECORD_FIELDS = (*_CONVERTERS, "provenance")
+
+
+class CompiledMapping:
+    """
+    A mapping file turned into per-field converters once, instead of walking the mapping
+    and guessing number types for every row.
+
+    - each target field has a fixed converter (float / int / str / bool / timestamp) plus
+      its declared unit conversion; converted values already have the record's types, so
+      no second pydantic validation is needed
+    - bind() specializes it for one file: column positions for CSV rows, keys for JSON
+      objects, and the file's provenance (source_fields computed once per file, from the
+      CSV header / the first JSON record)
+    - the bound builder walks that column plan, returning a TelemetryRecord or a
+      TelemetryRow (rows=True); rows it cannot take (missing or bad values) fall back to a
+      generic loop that applies defaults and reports the error
+    """
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        if not isinstance(spec, dict):
+            raise MappingError("mapping must be a JSON object")
+        self.fields: List[Tuple[str, str, Callable[[Any], Any]]] = []
+        for src, fspec in spec.items():
+            if src != "$derived":
+                self.fields.append((src, *_compile_field(src, fspec)))
+        self.derived: List[Tuple[str, Optional[str], Callable[[Any], Any]]] = [
+            (dst, *_compile_derived(dst, d)) for dst, d in (spec.get("$derived") or {}).items()
+        ]
+
+        derived = {dst for dst, _, _ in self.derived}
+        covered = {dst for _, dst, _ in self.fields} | derived
+        missing = [f for f in _CONVERTERS if f not in covered and f not in _DEFAULTS]
+        if missing:
+            raise MappingError(f"mapping does not provide required fields: {missing}")
+        # loader defaults for targets nothing maps to
+        self._base = {f: v for f, v in _DEFAULTS.items() if f not in covered}
+        # what a row that lacks the field gets
+        self._on_missing = {
+            dst: _DEFAULTS.get(dst, _SKIP if dst in derived else _REQUIRED) for _, dst, _ in self.fields
+        }
+
+    @property
+    def timestamp_sources(self) -> List[str]:
+        """Source fields mapped to timestamp (the loader decodes these column-wise)."""
+        return [src for src, dst, _ in self.fields if dst == "timestamp"]
+
+    def source_fields(self, available: Any) -> List[str]:
+        """Mapped source fields present in `available`, in mapping order."""
+        return [src for src, _, _ in self.fields if src in available]
+
+    def bind(
+        self,
+        provenance: Provenance,
+        columns: Optional[Sequence[str]] = None,
+        present: Optional[Sequence[str]] = None,
+        rows: bool = False,
+    ) -> RowBuilder:
+        """
+        Builder for one file's rows.
+
+        - columns (CSV header): input rows are lists
+        - otherwise input rows are dicts (JSON objects); present = keys of the file's first
+          record, used for source_fields (default: every mapped field)
+        - rows=True: build TelemetryRows (for store.add_rows) instead of TelemetryRecords
+        """
+        base = dict(self._base)
+        if columns is None:
+            steps = [(src, src, dst, conv, self._on_missing[dst]) for src, dst, conv in self.fields]
+            used = [src for src, _, _ in self.fields] if present is None else self.source_fields(present)
+            base["provenance"] = provenance_interner.with_fields(provenance, used)
+            return self._fast_builder(steps, base, rows, by_key=True, width=0)
+
+        index = {c: i for i, c in enumerate(columns)}
+        steps = [(index[src], src, dst, conv, self._on_missing[dst]) for src, dst, conv in self.fields if src in index]
+        given = {dst for _, _, dst, _, _ in steps}
+        for src, dst, _ in self.fields:
+            if src in index or dst in given:
+                continue
+            default = self._on_missing[dst]
+            if default is _REQUIRED:
+                raise MappingError(f"no column {src!r} for required field {dst!r}")
+            if default is not _SKIP:
+                base[dst] = default
+        base["provenance"] = provenance_interner.with_fields(provenance, [src for _, src, _, _, _ in steps])
+        return self._fast_builder(steps, base, rows, by_key=False, width=len(columns))
+
+    def _fast_builder(self, steps: List[Tuple], base: Dict[str, Any], rows: bool, by_key: bool, width: int) -> RowBuilder:
+        """
+        The bound file's row function, driven by a column plan fixed at bind time:
+
+        - values go into one flat list: the file's constants, then required fields grouped
+          by converter (one itemgetter fetch mapped through the converter per group, so
+          per-field work stays in C), then optional fields (default on an absent key /
+          empty cell), then derived fields
+        - each target field's position in that list is fixed here (the last source wins,
+          as in the generic loop), so one itemgetter picks the record / row fields
+
+        Rows it cannot handle (missing keys, short CSV rows, values that do not convert)
+        go to the generic builder, which applies defaults and raises the MappingError.
+        """
+        pid = provenance_interner.intern_id(base["provenance"])
+        slow = self._slow_builder(steps, base, rows, width, pid)
+
+        given = {dst for _, _, dst, _, _ in steps}
+        consts = [(dst, v) for dst, v in base.items() if dst not in given]
+        required: Dict[Callable[[Any], Any], List[int]] = {}  # converter -> step numbers
+        optional: List[int] = []
+        for n, (_, _, _, conv, default) in enumerate(steps):
+            if default is _REQUIRED or default is _SKIP:
+                required.setdefault(conv, []).append(n)
+            else:
+                optional.append(n)
+        groups = [(itemgetter(*(steps[n][0] for n in ns)), conv) for conv, ns in required.items() if len(ns) > 1]
+        # a converter with one field: plain lookup, no itemgetter / map per row
+        singles = [(steps[ns[0]][0], conv) for conv, ns in required.items() if len(ns) == 1]
+
+        # step numbers in the order build() appends their values, after the constants
+        order = [n for ns in required.values() if len(ns) > 1 for n in ns]
+        order += [ns[0] for ns in required.values() if len(ns) == 1] + optional
+        step_slot = {n: len(consts) + i for i, n in enumerate(order)}
+        slot = {dst: i for i, (dst, _) in enumerate(consts)}
+        for n, (_, _, dst, _, _) in enumerate(steps):
+            slot[dst] = step_slot[n]
+        derived = []
+        for dst, src, fn in self.derived:
+            if dst not in slot:
+                derived.append((None if src is None else slot[src], fn))
+                slot[dst] = len(consts) + len(order) + len(derived) - 1
+        optional_steps = [(steps[n][0], steps[n][3], steps[n][4]) for n in optional]
+
+        fields = _ROW_FIELDS if rows else _RECORD_FIELDS
+        pick = itemgetter(*(slot[f] for f in fields))
+        const_vals = [v for _, v in consts]
+        nan = math.nan
+
+        def build(row: Any) -> Any:
+            vals = const_vals.copy()
+            try:
+                for fetch, conv in groups:
+                    vals += map(conv, fetch(row))
+                for key, conv in singles:
+                    vals.append(conv(row[key]))
+                for key, conv, default in optional_steps:
+                    v = row.get(key) if by_key else row[key]
+                    vals.append(default if v is None or v == "" else conv(v))
+            except (KeyError, IndexError, TypeError, ValueError):
+                return slow(row)
+            for i, fn in derived:
+                vals.append(fn(None if i is None else vals[i]))
+            if not rows:
+                return construct_record(dict(zip(fields, pick(vals))))
+            ts, sat, lat, lon, alt, snr, rssi, loss, power, modem, link, spoof = pick(vals)
+            return (
+                ts, sat, lat, lon, alt, snr, rssi, loss, nan if power is None else power,
+                modem, link_code(link), 1 if spoof else 0, pid,
+            )
+        return build
+
+    def _slow_builder(self, steps: List[Tuple], base: Dict[str, Any], rows: bool, width: int, pid: int) -> RowBuilder:
+        derived = self.derived
+        emit = (lambda out: _row_of_fields(out, pid)) if rows else construct_record
+
+        def build(row: Any) -> Any:
+            if width and len(row) < width:
+                row = row + [None] * (width - len(row))
+            out = base.copy()
+            for key, src, dst, conv, default in steps:
+                v = row[key] if width else row.get(key)
+                try:
+                    out[dst] = conv(v)
+                except (TypeError, ValueError):
+                    v = _fallback(src, dst, v, default)
+                    if v is not _SKIP:
+                        out[dst] = v
+            for dst, src, fn in derived:
+                if dst not in out:
+                    out[dst] = fn(out[src] if src else None)
+            return emit(out)
+        return build
+
+
+def _fallback(src: str, dst: str, v: Any, default: Any) -> Any:
+    """Value for a field whose converter failed: its default when empty, else an error."""
+    if _is_null(v):
+        if default is _REQUIRED:
+            raise MappingError(f"{src} -> {dst}: required value missing or empty")
+        return default
+    raise MappingError(f"{src} -> {dst}: cannot convert {v!r}")
+
+
+def compile_mapping(spec: Dict[str, Any]) -> CompiledMapping:
+    return CompiledMapping(spec)
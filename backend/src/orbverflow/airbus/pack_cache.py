@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from orbverflow.binary_ingest import BinaryFormatError, decode_rows, encode_rows
+from orbverflow.models import provenance_interner
+from orbverflow.telemetry_rows import PROV, TelemetryRow
+
+
+# --- cache file (little-endian) --------------------------------------------------
+# header  = MAGIC + version(u16) + meta_len(u32) + meta (utf-8 JSON)
+# chunks  = { byte_len(u32) + OVTB payload (binary_ingest, column layout) }*
+#
+# meta: source path / size / mtime_ns / blake2b of the source file, mapping fingerprint,
+# provenance fields shared by every row. Files are written under a temporary name and
+# renamed when complete, so an entry that exists is whole.
+MAGIC = b"OVPC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_U32 = struct.Struct("<I")
+SUFFIX = ".ovpc"
+
+# bump when parsing/mapping semantics change: every entry written before becomes a miss
+LOADER_VERSION = 1
+
+
+def load_fingerprint(spec: Dict[str, Any], mapping_version: Optional[str], source_vendor: str, source_dataset_id: str) -> str:
+    """
+    Everything besides the source file that shapes the cached rows: the mapping (declared
+    version + exact content) and the provenance the rows are stamped with.
+    """
+    digest = hashlib.blake2b(json.dumps(spec, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+    return json.dumps([LOADER_VERSION, mapping_version, digest, source_vendor, source_dataset_id])
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_meta(mm: mmap.mmap) -> Tuple[Dict[str, Any], int]:
+    magic, version, meta_len = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION:
+        raise BinaryFormatError("not a pack cache file")
+    start = _HEADER.size
+    return json.loads(bytes(mm[start:start + meta_len]).decode("utf-8")), start + meta_len
+
+
+class PackCacheWriter:
+    """Collects one source file's parsed rows into a cache entry; commit() publishes it."""
+
+    def __init__(self, cache: "PackCache", path: str, meta: Dict[str, Any]) -> None:
+        self.cache = cache
+        self.path = path
+        self.meta = meta
+        self.tmp = f"{path}.{os.getpid()}.{next(cache._tmp_ids)}.tmp"
+        self._f = None
+        self._pid: Optional[int] = None
+        self.rows = 0
+        self.failed = False
+
+    def _open(self) -> None:
+        meta = dict(self.meta)
+        meta["provenance"] = (
+            provenance_interner.get(self._pid).model_dump() if self._pid is not None else None
+        )
+        raw = json.dumps(meta).encode("utf-8")
+        self._f = open(self.tmp, "wb")
+        self._f.write(_HEADER.pack(MAGIC, VERSION, len(raw)) + raw)
+
+    def add(self, rows: List[TelemetryRow]) -> None:
+        if self.failed or not rows:
+            return
+        pid = rows[0][PROV]
+        # one provenance per entry (what the loader produces per file); anything else
+        # is just not cached
+        if (self._pid is not None and pid != self._pid) or any(r[PROV] != pid for r in rows):
+            self.abort()
+            return
+        self._pid = pid
+        try:
+            if self._f is None:
+                self._open()
+            payload = encode_rows(rows, provenance_id=pid)
+            self._f.write(_U32.pack(len(payload)) + payload)
+            self.rows += len(rows)
+        except (OSError, BinaryFormatError, struct.error) as e:
+            print(f"[pack-cache] write failed for {self.meta['source']}: {e}")
+            self.abort()
+
+    def commit(self) -> None:
+        if self.failed:
+            return
+        try:
+            if self._f is None:
+                self._open()  # empty source file: still worth remembering
+            self._f.close()
+            os.replace(self.tmp, self.path)
+        except OSError as e:
+            print(f"[pack-cache] commit failed for {self.meta['source']}: {e}")
+            self.abort()
+            return
+        self._f = None
+        self.cache._committed(self.path)
+
+    def abort(self) -> None:
+        self.failed = True
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+class PackCache:
+    """
+    Parsed Airbus pack files, cached on disk as TelemetryRow chunks.
+
+    - one entry per (source file path, mapping fingerprint); it is valid while the
+      source's size and mtime are unchanged, or, when only the mtime moved (copy, touch),
+      while its blake2b content hash still matches
+    - a hit is read back through mmap and decoded chunk by chunk: no parsing, no mapping
+    - total size is capped at max_bytes; least recently used entries are evicted
+      (entry mtime = last use)
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()  # loads run in worker threads
+        self._tmp_ids = itertools.count()
+
+        self.hits = 0
+        self.misses = 0
+        self.hash_checks = 0
+        self.writes = 0
+        self.evictions = 0
+        self.invalidated = 0
+
+    def _entry_path(self, source: str, fingerprint: str) -> str:
+        key = hashlib.blake2b(f"{source}\0{fingerprint}".encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, key + SUFFIX)
+
+    def lookup(self, source: str, fingerprint: str) -> Optional[str]:
+        """Path of a valid entry for this source file + mapping, else None (a miss)."""
+        source = os.path.abspath(source)
+        path = self._entry_path(source, fingerprint)
+        try:
+            st = os.stat(source)
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                meta, _ = _read_meta(mm)
+        except (OSError, ValueError, struct.error):
+            meta = None
+        ok = (
+            meta is not None
+            and meta.get("source") == source
+            and meta.get("fingerprint") == fingerprint
+            and meta.get("size") == st.st_size
+        )
+        if ok and meta["mtime_ns"] != st.st_mtime_ns:
+            self.hash_checks += 1
+            ok = meta.get("blake2b") == file_digest(source)
+        if not ok:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(path)  # LRU order for eviction
+        except OSError:
+            pass
+        return path
+
+    def read(self, path: str) -> Iterator[Tuple[List[TelemetryRow], float]]:
+        """Rows of an entry chunk by chunk, with the fraction of the entry read so far."""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            meta, pos = _read_meta(mm)
+            prov = meta.get("provenance")
+            pid = provenance_interner.intern_id(provenance_interner.make(**prov)) if prov else 0
+            view = memoryview(mm)
+            try:
+                while pos < len(mm):
+                    (n,) = _U32.unpack_from(mm, pos)
+                    pos += _U32.size
+                    rows = decode_rows(view[pos:pos + n], provenance_id=pid)
+                    pos += n
+                    yield rows, pos / len(mm)
+            finally:
+                view.release()
+
+    def writer(self, source: str, fingerprint: str) -> PackCacheWriter:
+        source = os.path.abspath(source)
+        st = os.stat(source)
+        meta = {
+            "source": source,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "blake2b": file_digest(source),
+            "fingerprint": fingerprint,
+        }
+        return PackCacheWriter(self, self._entry_path(source, fingerprint), meta)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        out = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(SUFFIX):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def _committed(self, path: str) -> None:
+        with self._lock:
+            self.writes += 1
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, victim in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(victim)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def invalidate(self, pack_dir: Optional[str] = None) -> int:
+        """Drop every entry (pack_dir None) or the entries of files under pack_dir."""
+        root = os.path.join(os.path.abspath(pack_dir), "") if pack_dir is not None else None
+        removed = 0
+        with self._lock:
+            for _, _, path in self._entries():
+                if root is not None:
+                    try:
+                        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            source = _read_meta(mm)[0].get("source", "")
+                    except (OSError, ValueError, struct.error):
+                        source = ""  # unreadable entry: drop it too
+                    if source and not source.startswith(root):
+                        continue
+                try:
+                    os.remove(path)
+                    removed += 1
+                except OSError:
+                    pass
+            self.invalidated += removed
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "dir": self.cache_dir,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "hash_checks": self.hash_checks,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "invalidated": self.invalidated,
+        }
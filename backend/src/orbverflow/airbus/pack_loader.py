@@ -1,61 +1,43 @@
 from __future__ import annotations
 
+import codecs
+import contextlib
+import gzip
+import heapq
+import io
 import json
+import multiprocessing
 import os
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
-
-from orbverflow.models import TelemetryRecord, Provenance
-
-def _parse_timestamp(v: Any) -> float:
-    # already epoch
-    if isinstance(v, (int, float)):
-        return float(v)
-    # ISO string
-    if isinstance(v, str):
-        # accept "2026-01-30T10:00:00Z" or "...+00:00"
-        s = v.replace("Z", "+00:00")
-        dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt.timestamp()
-    raise ValueError(f"Unsupported timestamp: {v!r}")
+import re
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import groupby, islice
+from operator import itemgetter
+from typing import Any, BinaryIO, Dict, Generator, Iterator, List, Optional, Tuple
+
+from orbverflow.airbus.mapping import CompiledMapping, compile_mapping
+from orbverflow.airbus.pack_cache import PackCache, PackCacheWriter, load_fingerprint
+from orbverflow.binary_ingest import decode_rows, encode_rows, payload_provenance_id
+from orbverflow.models import TelemetryRecord, Provenance, provenance_interner
+from orbverflow.telemetry_rows import PROV, TS, TelemetryRow, record_of
+from orbverflow.timestamps import parse_timestamps
+
+try:  # optional: only needed for .zst shards
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
 
 def _read_json(path: str) -> Any:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def _read_csv_rows(path: str) -> List[Dict[str, Any]]:
-    # 不強制 pandas，hackathon 最小依賴，用 csv module
-    import csv
-    rows: List[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            rows.append(dict(r))
-    return rows
-
-def _coerce_number(x: Any) -> Any:
-    if x is None:
-        return None
-    if isinstance(x, (int, float)):
-        return x
-    if isinstance(x, str):
-        s = x.strip()
-        if s == "" or s.lower() == "null":
-            return None
-        # try int / float
-        try:
-            if "." in s:
-                return float(s)
-            return int(s)
-        except ValueError:
-            return x
-    return x
-
-def map_row_to_record(row: Dict[str, Any], mapping: Dict[str, str],
+def map_row_to_record(row: Dict[str, Any], mapping: Dict[str, Any],
                       provenance_base: Provenance) -> Tuple[TelemetryRecord, List[str]]:
     """
+    One-off mapping of a single row (compiles the mapping on every call); loaders compile
+    once with compile_mapping() and bind() per file.
+
     mapping example:
       {
         "satelliteId": "sat_id",
@@ -68,79 +50,507 @@ def map_row_to_record(row: Dict[str, Any], mapping: Dict[str, str],
         "link": "link_state"
       }
     """
-    out: Dict[str, Any] = {}
-    used_fields: List[str] = []
+    rec = compile_mapping(mapping).bind(provenance_base)(row)
+    return rec, list(rec.provenance.source_fields)
+
+# --- streaming readers -----------------------------------------------------------
+
+class LoadProgress:
+    """Shared between the loader (worker thread) and whoever reports progress; plain counters."""
+
+    def __init__(self) -> None:
+        self.files: List[str] = []
+        self.current_file: Optional[str] = None
+        self.bytes_total = 0
+        self.bytes_read = 0   # across finished files + position in the current one
+        self.rows = 0
+        self.cached: List[str] = []  # files served from the parsed-pack cache
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "files": list(self.files),
+            "current_file": self.current_file,
+            "bytes_total": self.bytes_total,
+            "bytes_read": self.bytes_read,
+            "pct": round(100.0 * self.bytes_read / self.bytes_total, 1) if self.bytes_total else 0.0,
+            "rows": self.rows,
+            "cached": list(self.cached),
+        }
+
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+_COMPRESSED = (".gz", ".zst", ".zstd")
+# CSV rows read (and timestamp-decoded) per step
+_CSV_CHUNK = 1024
+
+
+@contextlib.contextmanager
+def _open_pack_file(path: str) -> Iterator[Tuple[BinaryIO, BinaryIO]]:
+    """
+    (decompressed byte stream, on-disk file) for a pack file; progress is measured on the
+    on-disk file so it matches the sizes summed into bytes_total.
+    """
+    with open(path, "rb") as disk:
+        if path.endswith(".gz"):
+            with gzip.GzipFile(fileobj=disk, mode="rb") as f:
+                yield f, disk
+        elif path.endswith((".zst", ".zstd")):
+            if zstandard is None:
+                raise RuntimeError(f"{os.path.basename(path)}: reading .zst packs requires the 'zstandard' package")
+            with zstandard.ZstdDecompressor().stream_reader(disk) as f:
+                yield f, disk
+        else:
+            yield disk, disk
+
+
+def _iter_json_records(path: str, progress: LoadProgress, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse a top-level JSON array, or the "records" array of a top-level object,
+    yielding one element at a time. Only one chunk (plus the element being parsed) is held.
+    """
+    decoder = json.JSONDecoder()
+    base = progress.bytes_read
+    with _open_pack_file(path) as (f, disk):
+        text = codecs.getincrementaldecoder("utf-8")()
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> None:
+            nonlocal buf, pos, eof
+            raw = f.read(chunk_size)
+            progress.bytes_read = base + disk.tell()
+            if not raw:
+                eof = True
+                buf = buf[pos:] + text.decode(b"", final=True)
+            else:
+                buf = buf[pos:] + text.decode(raw)
+            pos = 0
+
+        def peek() -> str:
+            nonlocal pos
+            while True:
+                pos = _WS.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    raise ValueError(f"{path}: unexpected end of JSON")
+                fill()
+
+        def value() -> Any:
+            nonlocal pos
+            while True:
+                peek()
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                    # a number ending exactly at the buffer edge may continue in the next chunk
+                    if end < len(buf) or eof:
+                        pos = end
+                        return obj
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        def expect(ch: str) -> None:
+            nonlocal pos
+            if peek() != ch:
+                raise ValueError(f"{path}: expected {ch!r} in JSON")
+            pos += 1
+
+        def array() -> Iterator[Dict[str, Any]]:
+            nonlocal pos
+            expect("[")
+            if peek() == "]":
+                pos += 1
+                return
+            no_bulk_before = -1
+            while True:
+                # bulk: every element up to the last "}," in the buffer in one decode call.
+                # If that "}," is inside a string or a nested object the slice does not
+                # parse, and elements are taken one at a time past it.
+                cut = buf.rfind("},", pos)
+                if cut > pos and cut > no_bulk_before:
+                    try:
+                        items = json.loads("[" + buf[pos:cut + 1] + "]")
+                    except json.JSONDecodeError:
+                        no_bulk_before = cut
+                    else:
+                        pos = cut + 2
+                        yield from items
+                        continue
+                yield value()
+                c = peek()
+                pos += 1
+                if c == "]":
+                    return
+                if c != ",":
+                    raise ValueError(f"{path}: expected ',' or ']' in JSON array")
+
+        # 允許 list[dict] 或 {"records":[...]}
+        if peek() == "[":
+            yield from array()
+            return
+        expect("{")
+        while peek() != "}":
+            key = value()
+            expect(":")
+            if key == "records":
+                yield from array()
+                return
+            value()  # skip other keys
+            if peek() == ",":
+                pos += 1
+        raise ValueError(f"{path}: JSON object has no \"records\" array")
+
+
+def _iter_csv_rows(
+    path: str, mapping: CompiledMapping, prov_base: Provenance, progress: LoadProgress
+) -> Iterator[TelemetryRow]:
+    import csv
+    base = progress.bytes_read
+    with _open_pack_file(path) as (stream, disk):
+        reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+        header = next(reader, None)
+        if header is None:
+            return
+        # bound to the header's column positions: rows stay lists, no dict per row
+        build = mapping.bind(prov_base, columns=header, rows=True)
+        ts_cols = [i for i, c in enumerate(header) if c in mapping.timestamp_sources]
+        while True:
+            chunk = list(islice(reader, _CSV_CHUNK))
+            if not chunk:
+                break
+            progress.bytes_read = base + disk.tell()
+            for i in ts_cols:
+                _decode_timestamp_column(chunk, i)
+            for row in chunk:
+                if row:
+                    yield build(row)
+        progress.bytes_read = base + disk.tell()
+
+
+def _decode_timestamp_column(chunk: List[List[Any]], i: int) -> None:
+    """
+    Decode column i of a chunk of CSV rows in place, once per run of equal values (one
+    tick across the fleet). Short rows are skipped and a chunk with a bad value is left
+    as strings: the row builder then decodes those per row and reports the bad row.
+    """
+    rows = [row for row in chunk if len(row) > i]
+    try:
+        col = parse_timestamps([row[i] for row in rows])
+    except ValueError:
+        return
+    for row, ts in zip(rows, col):
+        row[i] = ts
 
-    for src_field, dst_field in mapping.items():
-        if src_field not in row:
+
+def _iter_file_rows(
+    path: str, mapping: CompiledMapping, prov_base: Provenance, progress: LoadProgress
+) -> Iterator[TelemetryRow]:
+    name = os.path.basename(path)
+    for ext in _COMPRESSED:
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+    if name.endswith(".csv"):
+        return _iter_csv_rows(path, mapping, prov_base, progress)
+    return _iter_json_rows(path, mapping, prov_base, progress)
+
+
+def _iter_json_rows(
+    path: str, mapping: CompiledMapping, prov_base: Provenance, progress: LoadProgress
+) -> Iterator[TelemetryRow]:
+    items = _iter_json_records(path, progress)
+    first = next(items, None)
+    if first is None:
+        return
+    # source_fields of the file: what its first record carries
+    build = mapping.bind(prov_base, present=list(first) if isinstance(first, dict) else None, rows=True)
+    yield build(first)
+    yield from map(build, items)
+
+
+# telemetry.csv, telemetry.json, telemetry_000.csv.gz, telemetry-2026-01-30.json.zst, ...
+_PACK_FILE = re.compile(r"^(telemetry(?:[_-][\w.-]+?)?)\.(csv|json)(?:\.(?:gz|zst|zstd))?$")
+
+
+def find_pack_files(pack_dir: str) -> List[str]:
+    """
+    Telemetry files (single file or shards, optionally compressed) of a pack, relative to
+    pack_dir. A shard present as both CSV and JSON (telemetry.csv + telemetry.json) is
+    only loaded once, from the CSV.
+    """
+    by_base: Dict[str, str] = {}
+    for n in sorted(os.listdir(pack_dir)):
+        m = _PACK_FILE.match(n)
+        if m is None:
             continue
-        used_fields.append(src_field)
-        out[dst_field] = _coerce_number(row[src_field])
+        kept = by_base.get(m.group(1))
+        if kept is None or (m.group(2) == "csv" and _PACK_FILE.match(kept).group(2) != "csv"):
+            by_base[m.group(1)] = n
+    if not by_base:
+        raise FileNotFoundError("No telemetry*.csv / telemetry*.json (optionally .gz / .zst) found in pack_dir")
+    return sorted(by_base.values())
 
-    # required fields normalize
-    if "timestamp" in out:
-        out["timestamp"] = _parse_timestamp(out["timestamp"])
 
-    # defaults if missing
-    out.setdefault("rssi_dbm", -70.0)
-    out.setdefault("modem_reset_count", 0)
-    out.setdefault("power_watt", None)
-    out.setdefault("spoofing", False)
+_U32 = struct.Struct("<I")
 
-    prov = provenance_base.model_copy(deep=True)
-    prov.source_fields = used_fields
 
-    out["provenance"] = prov
-    rec = TelemetryRecord(**out)
-    return rec, used_fields
+def _parse_shard(path: str, mapping: Dict[str, Any], prov_fields: Dict[str, Any], spool: str) -> Dict[int, List[str]]:
+    """
+    Worker side of a parallel pack load: map + validate one shard, sort it by timestamp
+    and spool it to `spool` as length-prefixed binary_ingest payloads (at most
+    _CACHE_CHUNK rows, one provenance id each). Link states travel as strings inside the
+    payloads; provenance ids are local to the worker process, so pid -> source_fields is
+    returned for the parent to remap.
+    """
+    prov_base = provenance_interner.make(**prov_fields)
+    rows = list(_iter_file_rows(path, compile_mapping(mapping), prov_base, LoadProgress()))
+    rows.sort(key=itemgetter(TS))  # usually already in order: linear for timsort
+    fields_by_pid: Dict[int, List[str]] = {}
+    with open(spool, "wb") as f:
+        for k in range(0, len(rows), _CACHE_CHUNK):
+            for pid, run in groupby(rows[k:k + _CACHE_CHUNK], key=itemgetter(PROV)):
+                payload = encode_rows(list(run), provenance_id=pid)
+                f.write(_U32.pack(len(payload)) + payload)
+                if pid not in fields_by_pid:
+                    fields_by_pid[pid] = list(provenance_interner.get(pid).source_fields)
+    return fields_by_pid
 
-def load_airbus_pack(
+
+def _spooled_rows(spool: str, pids: Dict[int, int], writer: Optional[PackCacheWriter]) -> Iterator[TelemetryRow]:
+    """
+    A shard's rows back from its spool, one payload at a time; decoding maps link states
+    and (through pids, worker id -> parent id) provenance ids onto this process's tables.
+    """
+    try:
+        with open(spool, "rb") as f:
+            while True:
+                head = f.read(_U32.size)
+                if not head:
+                    break
+                (n,) = _U32.unpack(head)
+                payload = f.read(n)
+                rows = decode_rows(payload, provenance_id=pids[payload_provenance_id(payload)])
+                if writer is not None:
+                    writer.add(rows)
+                yield from rows
+    except BaseException:
+        # parse error or the consumer stopped early: no partial cache entry
+        if writer is not None:
+            writer.abort()
+        raise
+    if writer is not None:
+        writer.commit()
+
+
+def _cached_stream(cache: PackCache, entry: str) -> Iterator[TelemetryRow]:
+    for rows, _ in cache.read(entry):  # written sorted
+        yield from rows
+
+
+def _iter_sharded_rows(
+    pack_dir: str,
+    names: List[str],
+    mapping: Dict[str, Any],
+    prov_fields: Dict[str, Any],
+    workers: int,
+    progress: LoadProgress,
+    cache: Optional[PackCache] = None,
+    fingerprint: str = "",
+) -> Iterator[TelemetryRow]:
+    """
+    Parse shards in a process pool, each spooled sorted to a temporary file, then yield
+    all rows merged in timestamp order, streaming: one payload per shard is held.
+    """
+    paths = [os.path.join(pack_dir, n) for n in names]
+    streams: List[Optional[Generator[TelemetryRow, None, None]]] = [None] * len(paths)
+
+    with tempfile.TemporaryDirectory(prefix="orbverflow-pack-") as spool_dir:
+        spools = [os.path.join(spool_dir, f"{i}.spool") for i in range(len(paths))]
+        todo = []
+        for i, path in enumerate(paths):
+            entry = cache.lookup(path, fingerprint) if cache is not None else None
+            if entry is None:
+                todo.append(i)
+                continue
+            streams[i] = _cached_stream(cache, entry)
+            progress.cached.append(names[i])
+            progress.bytes_read += os.path.getsize(path)
+
+        def adopt(i: int, fields_by_pid: Dict[int, List[str]]) -> None:
+            base = provenance_interner.make(**{**prov_fields, "source_file": names[i]})
+            pids = {
+                pid: provenance_interner.intern_id(provenance_interner.with_fields(base, fields))
+                for pid, fields in fields_by_pid.items()
+            }
+            writer = cache.writer(paths[i], fingerprint) if cache is not None else None
+            streams[i] = _spooled_rows(spools[i], pids, writer)
+            progress.bytes_read += os.path.getsize(paths[i])
+
+        if min(workers, len(todo)) <= 1:
+            for i in todo:
+                progress.current_file = names[i]
+                adopt(i, _parse_shard(paths[i], mapping, {**prov_fields, "source_file": names[i]}, spools[i]))
+        else:
+            # spawn: the loader runs in a worker thread of the server, forking from there is unsafe
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo)), mp_context=ctx) as pool:
+                futures = {
+                    pool.submit(_parse_shard, paths[i], mapping, {**prov_fields, "source_file": names[i]}, spools[i]): i
+                    for i in todo
+                }
+                for fut in as_completed(futures):
+                    adopt(futures[fut], fut.result())
+        progress.current_file = None
+        try:
+            yield from heapq.merge(*streams, key=itemgetter(TS))
+        finally:
+            # a consumer that stops early: close the spools (and abort cache writers)
+            for stream in streams:
+                if stream is not None:
+                    stream.close()
+
+
+_CACHE_CHUNK = 5000
+
+
+def _cached_rows(cache: PackCache, entry: str, path: str, progress: LoadProgress) -> Iterator[TelemetryRow]:
+    base = progress.bytes_read
+    size = os.path.getsize(path)
+    for rows, frac in cache.read(entry):
+        progress.bytes_read = base + int(size * frac)
+        yield from rows
+    progress.bytes_read = base + size
+
+
+def _batched(rows: Iterator[TelemetryRow], batch_size: int, progress: LoadProgress) -> Iterator[List[TelemetryRow]]:
+    batch: List[TelemetryRow] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            progress.rows += len(batch)
+            yield batch
+            batch = []
+    if batch:
+        progress.rows += len(batch)
+        yield batch
+
+
+def iter_airbus_pack_rows(
     pack_dir: str,
     mapping_path: str,
     source_vendor: str,
     source_dataset_id: str,
     mapping_version: str,
-) -> Tuple[List[TelemetryRecord], List[str]]:
+    batch_size: int = 5000,
+    progress: Optional[LoadProgress] = None,
+    workers: Optional[int] = None,
+    cache: Optional[PackCache] = None,
+) -> Iterator[List[TelemetryRow]]:
     """
-    pack_dir: 資料包資料夾，裡面放 telemetry.csv 或 telemetry.json 等
-    mapping_path: mapping_airbus_v0.1.json
+    Stream a pack as batches of at most batch_size TelemetryRows (for store.add_rows).
+    Blocking I/O: run it off the event loop.
+
+    - with a cache, files whose parsed rows are cached (same content, mapping and
+      provenance) are read back from it; the others are parsed and then cached
+    - the mapping is compiled once; each file gets a builder bound to its columns
+    - single file: read incrementally (streaming CSV reader / incremental JSON array
+      parser), so memory stays bounded by one batch whatever the file size
+    - several shards: each shard is parsed and mapped in its own process (up to
+      workers, default one per CPU) and spooled, sorted, to a temporary file; the spools
+      are then merged by timestamp as a stream (one chunk per shard in memory)
     """
-    mapping = _read_json(mapping_path)
+    spec = _read_json(mapping_path)
+    mapping = compile_mapping(spec)  # bad mappings fail here, before any file is read
+    progress = progress if progress is not None else LoadProgress()
+    progress.files = find_pack_files(pack_dir)
+    progress.bytes_total = sum(os.path.getsize(os.path.join(pack_dir, n)) for n in progress.files)
+    fingerprint = load_fingerprint(spec, mapping_version, source_vendor, source_dataset_id) if cache is not None else ""
 
-    files = []
-    records: List[TelemetryRecord] = []
+    if len(progress.files) > 1:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        prov_fields = dict(
+            source_vendor=source_vendor,
+            source_dataset_id=source_dataset_id,
+            source_fields=[],
+            mapping_version=mapping_version,
+        )
+        merged = _iter_sharded_rows(
+            pack_dir, progress.files, spec, prov_fields, workers, progress, cache, fingerprint
+        )
+        yield from _batched(merged, batch_size, progress)
+        return
 
-    # demo：優先找 telemetry.csv，找不到就找 telemetry.json
-    csv_path = os.path.join(pack_dir, "telemetry.csv")
-    json_path = os.path.join(pack_dir, "telemetry.json")
-
-    prov_base = Provenance(
-        source_vendor=source_vendor,
-        source_dataset_id=source_dataset_id,
-        source_file="",
-        source_fields=[],
-        mapping_version=mapping_version,
-    )
-
-    if os.path.exists(csv_path):
-        files.append("telemetry.csv")
-        prov_base.source_file = "telemetry.csv"
-        rows = _read_csv_rows(csv_path)
-        for row in rows:
-            rec, _ = map_row_to_record(row, mapping, prov_base)
-            records.append(rec)
-
-    elif os.path.exists(json_path):
-        files.append("telemetry.json")
-        prov_base.source_file = "telemetry.json"
-        data = _read_json(json_path)
-        # 允許 list[dict] 或 {"records":[...]}
-        rows = data["records"] if isinstance(data, dict) and "records" in data else data
-        for row in rows:
-            rec, _ = map_row_to_record(row, mapping, prov_base)
-            records.append(rec)
+    for name in progress.files:
+        path = os.path.join(pack_dir, name)
+        progress.current_file = name
+        prov_base = provenance_interner.make(
+            source_vendor=source_vendor,
+            source_dataset_id=source_dataset_id,
+            source_file=name,
+            source_fields=[],
+            mapping_version=mapping_version,
+        )
+        entry = cache.lookup(path, fingerprint) if cache is not None else None
+        if entry is not None:
+            progress.cached.append(name)
+            yield from _batched(_cached_rows(cache, entry, path, progress), batch_size, progress)
+            continue
+
+        writer = cache.writer(path, fingerprint) if cache is not None else None
+        try:
+            for batch in _batched(_iter_file_rows(path, mapping, prov_base, progress), batch_size, progress):
+                if writer is not None:
+                    writer.add(batch)
+                yield batch
+        except BaseException:
+            # parse error or the consumer stopped early: no partial entry
+            if writer is not None:
+                writer.abort()
+            raise
+        if writer is not None:
+            writer.commit()
+    progress.current_file = None
+
+
+def iter_airbus_pack(
+    pack_dir: str,
+    mapping_path: str,
+    source_vendor: str,
+    source_dataset_id: str,
+    mapping_version: str,
+    batch_size: int = 5000,
+    progress: Optional[LoadProgress] = None,
+    workers: Optional[int] = None,
+    cache: Optional[PackCache] = None,
+) -> Iterator[List[TelemetryRecord]]:
+    """iter_airbus_pack_rows() as TelemetryRecord batches."""
+    for rows in iter_airbus_pack_rows(
+        pack_dir, mapping_path, source_vendor, source_dataset_id, mapping_version, batch_size, progress, workers, cache
+    ):
+        yield [record_of(r) for r in rows]
 
-    else:
-        raise FileNotFoundError("No telemetry.csv or telemetry.json found in pack_dir")
 
-    return records, files
+def load_airbus_pack(
+    pack_dir: str,
+    mapping_path: str,
+    source_vendor: str,
+    source_dataset_id: str,
+    mapping_version: str,
+) -> Tuple[List[TelemetryRecord], List[str]]:
+    """
+    pack_dir: 資料包資料夾，裡面放 telemetry.csv 或 telemetry.json 等（or telemetry_000.csv.gz ... shards）
+    mapping_path: mapping_airbus_v0.1.json
+    Whole pack in memory; large packs should go through iter_airbus_pack().
+    """
+    progress = LoadProgress()
+    records: List[TelemetryRecord] = []
+    for batch in iter_airbus_pack(
+        pack_dir, mapping_path, source_vendor, source_dataset_id, mapping_version, progress=progress
+    ):
+        records.extend(batch)
+    return records, progress.files
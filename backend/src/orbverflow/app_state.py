@@ -1,9 +1,23 @@
+import os
+import tempfile
+
 from orbverflow.ws import WebSocketHub
+from orbverflow.models import provenance_interner
 from orbverflow.simulator.engine import SimulatorEngine
 from orbverflow.state_store import TelemetryStateStore
+from orbverflow.retention_sweeper import RetentionSweeper
+from orbverflow.ingest_pipeline import IngestPipeline
+from orbverflow.dedup_index import DedupIndex
+from orbverflow.ingest_sessions import IngestSessionRegistry
+from orbverflow.segment_log import TelemetrySegmentLog
 from orbverflow.provenance_registry import ProvenanceRegistry
+from orbverflow.airbus.load_jobs import PackLoadJobs
+from orbverflow.airbus.pack_cache import PackCache
+from orbverflow.replay_engine import ReplayEngine
 from orbverflow.engines.cluster_engine import ClusterEngine, ClusterConfig
+from orbverflow.engines.dbscan_engine import DbscanClusterEngine, DbscanConfig
 from orbverflow.incident_store import IncidentStore, IncidentStoreConfig
+from orbverflow.incident_feed import IncidentFeed
 from orbverflow.engines.jamming_engine import JammingEngine, JammingEngineConfig
 from orbverflow.playbook_store import PlaybookStore
 from orbverflow.engines.playbook_engine import PlaybookEngine
@@ -16,19 +30,86 @@ from orbverflow.scenario_state import scenario_state
 hub = WebSocketHub()
 engine = SimulatorEngine()
 
-store = TelemetryStateStore(window_seconds=600)  # 10 min
-prov_registry = ProvenanceRegistry()
+_window_seconds = int(os.getenv("TELEMETRY_WINDOW_SECONDS", "600"))  # 10 min
 
-cluster_engine = ClusterEngine(
-    ClusterConfig(
-        distance_km_max=1500.0,
-        cluster_intensity_threshold=0.55,
-        suspicious_threshold=0.35,
-        confirmed_threshold=0.55,
-        high_conf_threshold=0.75,
-        snr_ok_floor=12.0,
+# optional on-disk segment log; unset = memory only
+_log_dir = os.getenv("TELEMETRY_LOG_DIR")
+segment_log = TelemetrySegmentLog(_log_dir, window_seconds=_window_seconds) if _log_dir else None
+
+store = TelemetryStateStore(
+    window_seconds=_window_seconds,
+    backend=os.getenv("TELEMETRY_STORE_BACKEND", "deque"),  # deque | columnar | compressed
+    max_total_records=int(os.getenv("TELEMETRY_MAX_RECORDS", "0")) or None,  # records + rollup buckets, 0 = no cap
+    segment_log=segment_log,
+)
+retention_sweeper = RetentionSweeper(store, interval_sec=5.0)
+# distinct Provenance values alive at once; past it new ones are rejected at ingest
+provenance_interner.max_entries = int(os.getenv("PROVENANCE_MAX_ENTRIES", "4096"))
+provenance_interner.add_holder(store.provenance_ids)
+# (sat_id, timestamp) seen-set for idempotent ingest; INGEST_DEDUP=0 disables it
+dedup_index = (
+    DedupIndex(
+        window_seconds=_window_seconds,
+        max_keys=int(os.getenv("INGEST_DEDUP_MAX_KEYS", "2000000")),
     )
+    if os.getenv("INGEST_DEDUP", "1") != "0"
+    else None
 )
+ingest_pipeline = IngestPipeline(
+    store,
+    max_queue_batches=int(os.getenv("INGEST_QUEUE_MAX_BATCHES", "1024")),
+    max_batch_records=int(os.getenv("INGEST_MAX_BATCH_RECORDS", "5000")),
+    dedup=dedup_index,
+)
+# sequenced WS ingest: credit window, cumulative ack every N frames or T ms
+ingest_sessions = IngestSessionRegistry(
+    window=int(os.getenv("INGEST_WS_WINDOW", "64")),
+    ack_every=int(os.getenv("INGEST_WS_ACK_EVERY", "16")),
+    ack_interval_ms=float(os.getenv("INGEST_WS_ACK_MS", "50")),
+)
+prov_registry = ProvenanceRegistry()
+pack_load_jobs = PackLoadJobs()
+# parsed Airbus pack files, reused while the source files are unchanged; AIRBUS_PACK_CACHE=0 disables it
+pack_cache = (
+    PackCache(
+        os.getenv("AIRBUS_PACK_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "orbverflow-pack-cache"),
+        max_bytes=int(os.getenv("AIRBUS_PACK_CACHE_MAX_MB", "512")) * 1024 * 1024,
+    )
+    if os.getenv("AIRBUS_PACK_CACHE", "1") != "0"
+    else None
+)
+# recorded packs streamed back through ingest_pipeline (/replay/*)
+replay_engine = ReplayEngine(
+    ingest_pipeline,
+    tick_ms=float(os.getenv("REPLAY_TICK_MS", "50")),
+    max_batch_rows=int(os.getenv("REPLAY_MAX_BATCH_ROWS", "5000")),
+)
+provenance_interner.add_holder(replay_engine.provenance_ids)
+
+_cluster_cfg = dict(
+    distance_km_max=1500.0,
+    cluster_intensity_threshold=0.55,
+    suspicious_threshold=0.35,
+    confirmed_threshold=0.55,
+    high_conf_threshold=0.75,
+    snr_ok_floor=12.0,
+    # components carried across ticks, stable cluster ids; CLUSTER_INCREMENTAL=0 recomputes per call
+    incremental=os.getenv("CLUSTER_INCREMENTAL", "1") != "0",
+    move_tolerance_km=float(os.getenv("CLUSTER_MOVE_TOLERANCE_KM", "0")),
+    # CLUSTER_COMPACT_PER_SAT=1: per_sat skips "ok" sats (counted in ok_sats), cheaper on big fleets
+    compact_per_sat=os.getenv("CLUSTER_COMPACT_PER_SAT", "0") == "1",
+)
+# CLUSTER_ENGINE=dbscan: 3D (ECEF, altitude included) density clustering, needs NumPy
+if os.getenv("CLUSTER_ENGINE", "baseline") == "dbscan":
+    cluster_engine: ClusterEngine = DbscanClusterEngine(
+        DbscanConfig(
+            **_cluster_cfg,
+            eps_km=float(os.getenv("CLUSTER_DBSCAN_EPS_KM", "500")),
+            min_samples=int(os.getenv("CLUSTER_DBSCAN_MIN_SAMPLES", "3")),
+        )
+    )
+else:
+    cluster_engine = ClusterEngine(ClusterConfig(**_cluster_cfg))
 
 
 incident_store = IncidentStore(IncidentStoreConfig(cooldown_sec=10.0))
@@ -36,11 +117,13 @@ jamming_engine = JammingEngine(
     cluster_engine=cluster_engine,
     incident_store=incident_store,
     prov_registry=prov_registry,
-    cfg=JammingEngineConfig(min_affected_sats=2),
+    cfg=JammingEngineConfig(min_affected_sats=2, engine_type=cluster_engine.engine_name),
 )
 
 playbook_store = PlaybookStore()
 playbook_engine = PlaybookEngine(playbook_store)
+# GET /incidents/latest view, published by the detection cycle
+incident_feed = IncidentFeed(incident_store, playbook_store)
 
 mission_orchestrator = MissionContinuityOrchestrator(cooldown_sec=10)
 mission_continuity_store = MissionContinuityStore()
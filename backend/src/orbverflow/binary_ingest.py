@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import math
+import struct
+import sys
+from array import array
+from itertools import repeat
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from orbverflow.models import TelemetryRecord, provenance_interner
+from orbverflow.telemetry_rows import LINK_STATES, TelemetryRow, link_code
+
+
+# --- wire format (little-endian) -----------------------------------------------
+# header      = MAGIC + version(u16) + layout(u8) + n_fields(u8) + provenance_id(u32) + count(u32)
+# fields      = n_fields * ( name_len(u8) + name utf-8 + struct type code (1 char) )
+# sat table   = n(u16) + n * ( len(u16) + utf-8 )        sat_id column holds indexes into it
+# link table  = n(u16) + n * ( len(u16) + utf-8 )        link_state column holds indexes into it
+#               (table indexes use unsigned type codes; modem_reset_count must fit an int32)
+# body
+#   LAYOUT_ROWS     count fixed-width records packed with "<" + type codes (no padding)
+#   LAYOUT_COLUMNS  per field in header order: byte_len(u32) + count values of that type
+#
+# provenance_id is a ProvenanceInterner id (see POST /ingest/provenance); every record
+# of one payload shares it.
+MAGIC = b"OVTB"
+VERSION = 1
+LAYOUT_ROWS = 0
+LAYOUT_COLUMNS = 1
+
+_HEADER = struct.Struct("<4sHBBII")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+REQUIRED_FIELDS = (
+    "timestamp", "sat_id", "lat", "lon", "alt",
+    "snr_db", "rssi_dbm", "packet_loss_pct", "link_state",
+)
+OPTIONAL_FIELDS = ("modem_reset_count", "power_watt", "spoofing")
+_INDEX_FIELDS = ("sat_id", "link_state")
+_INT_FIELDS = _INDEX_FIELDS + ("modem_reset_count", "spoofing")
+
+_FLOAT_CODES = "fd"
+_INT_CODES = "bBhHiIqQ"
+_INDEX_CODES = "BHIQ"  # table indexes are unsigned: a negative one would wrap in the table
+_I32 = 1 << 31  # modem_reset_count is an int32 column in the stores
+
+# layout used by encode_records(): 8 doubles, two u16 table indexes, i32, u8
+DEFAULT_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "d"), ("sat_id", "H"), ("lat", "d"), ("lon", "d"), ("alt", "d"),
+    ("snr_db", "d"), ("rssi_dbm", "d"), ("packet_loss_pct", "d"), ("power_watt", "d"),
+    ("modem_reset_count", "i"), ("link_state", "H"), ("spoofing", "B"),
+)
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+class _Reader:
+    __slots__ = ("buf", "pos")
+
+    def __init__(self, buf: memoryview) -> None:
+        self.buf = buf
+        self.pos = 0
+
+    def take(self, n: int) -> memoryview:
+        if self.pos + n > len(self.buf):
+            raise BinaryFormatError("payload truncated")
+        out = self.buf[self.pos: self.pos + n]
+        self.pos += n
+        return out
+
+    def unpack(self, st: struct.Struct) -> Tuple:
+        return st.unpack(self.take(st.size))
+
+    def text(self, n: int) -> str:
+        try:
+            return bytes(self.take(n)).decode("utf-8")
+        except UnicodeDecodeError:
+            raise BinaryFormatError(f"invalid utf-8 at offset {self.pos - n}") from None
+
+    def strings(self) -> List[str]:
+        (n,) = self.unpack(_U16)
+        out: List[str] = []
+        for _ in range(n):
+            (ln,) = self.unpack(_U16)
+            out.append(self.text(ln))
+        return out
+
+
+def _check_fields(fields: Sequence[Tuple[str, str]]) -> None:
+    names = [n for n, _ in fields]
+    if len(set(names)) != len(names):
+        raise BinaryFormatError("duplicate field in layout")
+    for name, code in fields:
+        if name not in REQUIRED_FIELDS and name not in OPTIONAL_FIELDS:
+            raise BinaryFormatError(f"unknown field {name!r}")
+        if name in _INDEX_FIELDS:
+            allowed = _INDEX_CODES
+        elif name in _INT_FIELDS:
+            allowed = _INT_CODES
+        else:
+            allowed = _FLOAT_CODES + _INT_CODES
+        if code not in allowed:
+            raise BinaryFormatError(f"field {name!r}: unsupported type code {code!r}")
+    missing = [n for n in REQUIRED_FIELDS if n not in names]
+    if missing:
+        raise BinaryFormatError(f"missing fields: {', '.join(missing)}")
+
+
+def decode_rows(payload: bytes, provenance_id: Optional[int] = None) -> List[TelemetryRow]:
+    """
+    Decode one binary payload into TelemetryRows (no pydantic objects).
+    Raises BinaryFormatError on anything malformed; nothing is returned partially.
+    provenance_id overrides the payload's (for payloads written by another process).
+    """
+    rd = _Reader(memoryview(payload))
+    magic, version, layout, n_fields, pid, count = rd.unpack(_HEADER)
+    if magic != MAGIC:
+        raise BinaryFormatError("bad magic")
+    if version != VERSION:
+        raise BinaryFormatError(f"unsupported version {version}")
+    if provenance_id is not None:
+        pid = provenance_id
+    if pid not in provenance_interner:
+        raise BinaryFormatError(f"unknown provenance id {pid}")
+
+    fields: List[Tuple[str, str]] = []
+    for _ in range(n_fields):
+        (ln,) = rd.unpack(_U8)
+        name = rd.text(ln)
+        code = rd.text(1)
+        fields.append((name, code))
+    _check_fields(fields)
+    sat_table = rd.strings()
+    link_table = [link_code(s) for s in rd.strings()]
+
+    cols: Dict[str, Sequence] = {}
+    if layout == LAYOUT_ROWS:
+        rec = struct.Struct("<" + "".join(code for _, code in fields))
+        body = rd.take(rec.size * count)
+        if count:
+            for (name, _), col in zip(fields, zip(*rec.iter_unpack(body))):
+                cols[name] = col
+        else:
+            cols = {name: () for name, _ in fields}
+    elif layout == LAYOUT_COLUMNS:
+        for name, code in fields:
+            (nbytes,) = rd.unpack(_U32)
+            col = array(code)
+            if nbytes != col.itemsize * count:
+                raise BinaryFormatError(f"column {name!r}: expected {col.itemsize * count} bytes, got {nbytes}")
+            col.frombytes(rd.take(nbytes))
+            if sys.byteorder == "big":
+                col.byteswap()
+            cols[name] = col
+    else:
+        raise BinaryFormatError(f"unknown layout {layout}")
+    if rd.pos != len(rd.buf):
+        raise BinaryFormatError("trailing bytes after body")
+
+    ts = cols["timestamp"]
+    if not all(map(math.isfinite, ts)):
+        raise BinaryFormatError("non-finite timestamp")
+    try:
+        sats = [sat_table[i] for i in cols["sat_id"]]
+        links = [link_table[i] for i in cols["link_state"]]
+    except IndexError:
+        raise BinaryFormatError("string table index out of range") from None
+    modem = cols.get("modem_reset_count")
+    if modem and not (-_I32 <= min(modem) and max(modem) < _I32):
+        raise BinaryFormatError("modem_reset_count out of int32 range")
+
+    spoof = cols.get("spoofing")
+    return list(zip(
+        map(float, ts), sats,
+        map(float, cols["lat"]), map(float, cols["lon"]), map(float, cols["alt"]),
+        map(float, cols["snr_db"]), map(float, cols["rssi_dbm"]), map(float, cols["packet_loss_pct"]),
+        map(float, cols["power_watt"]) if "power_watt" in cols else repeat(math.nan),
+        cols.get("modem_reset_count", repeat(0)),
+        links,
+        [1 if v else 0 for v in spoof] if spoof is not None else repeat(0),
+        repeat(pid),
+    ))
+
+
+def payload_provenance_id(payload: bytes) -> int:
+    """The provenance_id a payload was written with (header only, nothing else checked)."""
+    if len(payload) < _HEADER.size:
+        raise BinaryFormatError("payload truncated")
+    return _HEADER.unpack_from(payload, 0)[4]
+
+
+def _strings(values: List[str]) -> bytes:
+    out = bytearray(_U16.pack(len(values)))
+    for s in values:
+        raw = s.encode("utf-8")
+        out += _U16.pack(len(raw))
+        out += raw
+    return bytes(out)
+
+
+def encode_records(
+    records: List[TelemetryRecord], provenance_id: int = 0, layout: int = LAYOUT_COLUMNS
+) -> bytes:
+    """Client-side helper: pack records (sharing one provenance id) with DEFAULT_FIELDS."""
+    sat_index: Dict[str, int] = {}
+    link_index: Dict[str, int] = {}
+    values: Dict[str, list] = {name: [] for name, _ in DEFAULT_FIELDS}
+    for r in records:
+        values["timestamp"].append(r.timestamp)
+        values["sat_id"].append(sat_index.setdefault(r.sat_id, len(sat_index)))
+        values["lat"].append(r.lat)
+        values["lon"].append(r.lon)
+        values["alt"].append(r.alt)
+        values["snr_db"].append(r.snr_db)
+        values["rssi_dbm"].append(r.rssi_dbm)
+        values["packet_loss_pct"].append(r.packet_loss_pct)
+        values["power_watt"].append(math.nan if r.power_watt is None else r.power_watt)
+        values["modem_reset_count"].append(r.modem_reset_count)
+        values["link_state"].append(link_index.setdefault(r.link_state, len(link_index)))
+        values["spoofing"].append(1 if r.spoofing else 0)
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, layout, len(DEFAULT_FIELDS), provenance_id, len(records)))
+    for name, code in DEFAULT_FIELDS:
+        raw = name.encode("utf-8")
+        out += _U8.pack(len(raw)) + raw + code.encode("ascii")
+    out += _strings(list(sat_index))
+    out += _strings(list(link_index))
+
+    if layout == LAYOUT_ROWS:
+        rec = struct.Struct("<" + "".join(code for _, code in DEFAULT_FIELDS))
+        for row in zip(*(values[name] for name, _ in DEFAULT_FIELDS)):
+            out += rec.pack(*row)
+    elif layout == LAYOUT_COLUMNS:
+        for name, code in DEFAULT_FIELDS:
+            col = array(code, values[name])
+            if sys.byteorder == "big":
+                col.byteswap()
+            raw = col.tobytes()
+            out += _U32.pack(len(raw)) + raw
+    else:
+        raise ValueError(f"unknown layout {layout}")
+    return bytes(out)
+
+
+def encode_rows(rows: List[TelemetryRow], provenance_id: int = 0) -> bytes:
+    """Pack TelemetryRows (sharing one provenance id) with DEFAULT_FIELDS, column layout."""
+    if not rows:
+        cols: List[Sequence] = [()] * 13
+    else:
+        cols = list(zip(*rows))
+    (ts, sats, lat, lon, alt, snr, rssi, loss, power, modem, links, spoof, _) = cols
+    sat_index: Dict[str, int] = {}
+    for s in sats:
+        if s not in sat_index:
+            sat_index[s] = len(sat_index)
+    link_index: Dict[int, int] = {}
+    for c in links:
+        if c not in link_index:
+            link_index[c] = len(link_index)
+    values = {
+        "timestamp": ts, "sat_id": [sat_index[s] for s in sats], "lat": lat, "lon": lon, "alt": alt,
+        "snr_db": snr, "rssi_dbm": rssi, "packet_loss_pct": loss, "power_watt": power,
+        "modem_reset_count": modem, "link_state": [link_index[c] for c in links], "spoofing": spoof,
+    }
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, LAYOUT_COLUMNS, len(DEFAULT_FIELDS), provenance_id, len(rows)))
+    for name, code in DEFAULT_FIELDS:
+        raw = name.encode("utf-8")
+        out += _U8.pack(len(raw)) + raw + code.encode("ascii")
+    out += _strings(list(sat_index))
+    out += _strings([LINK_STATES[c] for c in link_index])
+    for name, code in DEFAULT_FIELDS:
+        col = array(code, values[name])
+        if sys.byteorder == "big":
+            col.byteswap()
+        raw = col.tobytes()
+        out += _U32.pack(len(raw)) + raw
+    return bytes(out)
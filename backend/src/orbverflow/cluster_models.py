@@ -1,4 +1,4 @@
-from typing import List, Dict, Literal
+from typing import List, Dict, Literal, Optional
 from pydantic import BaseModel
 
 
@@ -17,6 +17,7 @@ class Thresholds(BaseModel):
     intensity: float
     snr_low: float
     loss_high: float
+    min_samples: Optional[int] = None  # dbscan_ecef_v1 only (distance_km = eps)
 
 
 class ClusterSummary(BaseModel):
@@ -41,4 +42,5 @@ class ClusterSuggestResponse(BaseModel):
     engine: str = "baseline_rule_v1"
     thresholds: Thresholds
     clusters: List[ClusterOut]
-    per_sat: Dict[str, ConsistencyResult]
+    per_sat: Dict[str, ConsistencyResult]  # every sat (compact_per_sat: suspicious or worse + cluster members)
+    ok_sats: int = 0  # scored "ok" and not listed in per_sat (0 unless compact_per_sat)
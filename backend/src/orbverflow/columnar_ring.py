@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Set
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.telemetry_rows import (
+    ALT, LAT, LINK, LOSS, LON, MODEM, POWER, PROV, RSSI, SNR, SPOOF, TS,
+    TelemetryRow, record_of, row_of,
+)
+
+
+class _LogicalTs:
+    """Sequence view of the ring's timestamp column in logical (oldest-first) order, for bisect."""
+
+    __slots__ = ("_ring",)
+
+    def __init__(self, ring: "SatRingBuffer") -> None:
+        self._ring = ring
+
+    def __len__(self) -> int:
+        return self._ring._size
+
+    def __getitem__(self, i: int) -> float:
+        ring = self._ring
+        return ring.ts[(ring._head + i) % ring.capacity]
+
+
+class SatRingBuffer:
+    """
+    Fixed-capacity ring buffer of typed arrays for ONE satellite.
+
+    Columns: timestamp / lat / lon / alt / snr_db / rssi_dbm / packet_loss_pct /
+    power_watt (NaN = None) / modem_reset_count / link_state code / spoofing /
+    provenance id (ProvenanceInterner). TelemetryRecord objects are only rebuilt when asked for.
+    When the buffer is full the oldest sample is overwritten (or a sample older than all
+    of them is not kept).
+
+    Samples are kept sorted by timestamp so range queries are a bisect plus a slice;
+    the rare out-of-order sample is shifted into place.
+    """
+
+    # bytes held per sample across all columns (used for memory accounting)
+    ROW_BYTES = 8 * 8 + 4 + 1 + 1 + 4
+
+    def __init__(self, sat_id: str, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.sat_id = sat_id
+        self.capacity = capacity
+        self._head = 0  # physical index of the oldest sample
+        self._size = 0
+
+        zeros_d = array("d", [0.0]) * capacity
+        self.ts = array("d", zeros_d)
+        self.lat = array("d", zeros_d)
+        self.lon = array("d", zeros_d)
+        self.alt = array("d", zeros_d)
+        self.snr = array("d", zeros_d)
+        self.rssi = array("d", zeros_d)
+        self.loss = array("d", zeros_d)
+        self.power = array("d", zeros_d)
+        self.modem = array("i", [0]) * capacity
+        self.link = array("B", [0]) * capacity
+        self.spoof = array("B", [0]) * capacity
+        self.prov = array("I", [0]) * capacity
+
+        # newest record, kept so latest() does not rebuild one per poll
+        self._last: Optional[TelemetryRecord] = None
+        self._ts_view = _LogicalTs(self)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def nbytes(self) -> int:
+        # columns are preallocated: memory is only given back when the ring is dropped
+        return self.capacity * self.ROW_BYTES
+
+    def _phys(self, i: int) -> int:
+        return (self._head + i) % self.capacity
+
+    def _move(self, src: int, dst: int) -> None:
+        for col in (self.ts, self.lat, self.lon, self.alt, self.snr, self.rssi, self.loss,
+                    self.power, self.modem, self.link, self.spoof, self.prov):
+            col[dst] = col[src]
+
+    def append(self, r: TelemetryRecord) -> int:
+        """Append one record. Returns how many samples were not kept (0 or 1), see append_row."""
+        return self.append_row(row_of(r), record=r)
+
+    def append_row(self, row: TelemetryRow, record: Optional[TelemetryRecord] = None) -> int:
+        """
+        Append one decoded row (bulk ingest path); `record` is its pydantic form if one exists.
+        Returns 1 when the buffer was full (oldest sample overwritten, or this one dropped
+        for being older than all of them), else 0: the net change in size is 1 - return.
+        """
+        ts = row[TS]
+        in_order = not self._size or ts >= self.ts[self._phys(self._size - 1)]
+
+        overwritten = 0
+        if self._size == self.capacity:
+            if not in_order and ts < self.ts[self._head]:
+                # older than everything we keep and no room: drop it
+                return 1
+            self._head = (self._head + 1) % self.capacity
+            self._size -= 1
+            overwritten = 1
+
+        if in_order:
+            pos = self._phys(self._size)
+        else:
+            # out-of-order: shift the tail right by one to keep timestamps sorted
+            i = bisect_right(self._ts_view, ts)
+            for j in range(self._size, i, -1):
+                self._move(self._phys(j - 1), self._phys(j))
+            pos = self._phys(i)
+        self._size += 1
+
+        self.ts[pos] = ts
+        self.lat[pos] = row[LAT]
+        self.lon[pos] = row[LON]
+        self.alt[pos] = row[ALT]
+        self.snr[pos] = row[SNR]
+        self.rssi[pos] = row[RSSI]
+        self.loss[pos] = row[LOSS]
+        self.power[pos] = row[POWER]
+        self.modem[pos] = row[MODEM]
+        self.link[pos] = row[LINK]
+        self.spoof[pos] = row[SPOOF]
+        self.prov[pos] = row[PROV]
+
+        if in_order:
+            # newest sample: reuse its record, or build lazily on latest()
+            self._last = record
+        return overwritten
+
+    def prune(self, cutoff: float) -> int:
+        """Drop samples older than cutoff from the head. Returns number dropped."""
+        dropped = bisect_left(self._ts_view, cutoff)
+        if dropped:
+            self._head = (self._head + dropped) % self.capacity
+            self._size -= dropped
+        if not self._size:
+            self._last = None
+        return dropped
+
+    def provenance_ids(self) -> Set[int]:
+        # whole column: slots outside the window only keep a few extra ids alive
+        return set(self.prov)
+
+    def _build(self, pos: int) -> TelemetryRecord:
+        # values come from an already validated record -> skip validation
+        return record_of((
+            self.ts[pos], self.sat_id, self.lat[pos], self.lon[pos], self.alt[pos],
+            self.snr[pos], self.rssi[pos], self.loss[pos], self.power[pos],
+            self.modem[pos], self.link[pos], self.spoof[pos], self.prov[pos],
+        ))
+
+    def latest(self) -> Optional[TelemetryRecord]:
+        if not self._size:
+            return None
+        if self._last is None:
+            self._last = self._build(self._phys(self._size - 1))
+        return self._last
+
+    def range(self, start: float, end: Optional[float] = None) -> List[TelemetryRecord]:
+        """Records with start <= timestamp <= end (end=None -> open), O(log n + k)."""
+        lo = bisect_left(self._ts_view, start)
+        hi = self._size if end is None else bisect_right(self._ts_view, end)
+        return [self._build(self._phys(i)) for i in range(lo, hi)]
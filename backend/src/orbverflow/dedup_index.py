@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.telemetry_rows import SAT, TS, TelemetryRow
+
+
+class DedupIndex:
+    """
+    Memory-bounded "already ingested" set of (sat_id, timestamp), for idempotent ingest.
+
+    - keys are bucketed into time slices (floor(ts / slice_seconds)); each slice is a set
+      of 64-bit key hashes, so one key costs a set slot + one int, not a tuple
+    - slices older than window_seconds behind the newest timestamp seen are dropped whole;
+      beyond max_keys the oldest slices go first
+    - a record older than the tracked horizon is let through (counted as untracked); the
+      store's own window prune is what discards those
+    - the horizon only follows timestamps up to max_future_sec past the wall clock: a
+      record further ahead (bad or skewed clock) is let through unrecorded (counted as
+      future) instead of pushing every normal-time key out of the horizon
+    - hashes are per process: a (rare) collision drops a record as a false duplicate
+    - keys are recorded when checked; a caller whose write then fails forget()s them
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = 600,
+        slice_seconds: int = 60,
+        max_keys: int = 2_000_000,
+        max_future_sec: float = 300.0,
+    ) -> None:
+        if slice_seconds <= 0:
+            raise ValueError("slice_seconds must be > 0")
+        self.window_seconds = window_seconds
+        self.slice_seconds = slice_seconds
+        self.max_keys = max_keys
+        self.max_future_sec = max_future_sec
+        self._n_slices = max(1, math.ceil(window_seconds / slice_seconds)) + 1
+        self._slices: Dict[int, Set[int]] = {}
+        self._high = -1 << 62  # newest slice id seen
+        self._keys = 0
+
+        self.checked = 0
+        self.duplicates = 0
+        self.untracked = 0
+        self.future = 0
+        self.slices_evicted = 0
+
+    def _evict_below(self, lowest: int) -> None:
+        for sid in [s for s in self._slices if s < lowest]:
+            self._keys -= len(self._slices.pop(sid))
+            self.slices_evicted += 1
+
+    def _evict_oldest(self) -> bool:
+        sid = min(self._slices)
+        if sid == self._high:
+            return False  # never drop the slice being written
+        self._keys -= len(self._slices.pop(sid))
+        self.slices_evicted += 1
+        return True
+
+    def seen(self, sat_id: str, ts: float) -> bool:
+        """True if (sat_id, ts) was already recorded; otherwise records it and returns False."""
+        self.checked += 1
+        sid = math.floor(ts / self.slice_seconds)
+        if sid <= self._high - self._n_slices:
+            self.untracked += 1
+            return False
+        bucket = self._slices.get(sid)
+        if bucket is None:
+            if sid > self._high:
+                # only a new newest slice reads the clock
+                if ts > time.time() + self.max_future_sec:
+                    self.future += 1
+                    return False
+                self._high = sid
+                self._evict_below(sid - self._n_slices + 1)
+            bucket = self._slices[sid] = set()
+        key = hash((sat_id, ts))
+        if key in bucket:
+            self.duplicates += 1
+            return True
+        bucket.add(key)
+        self._keys += 1
+        while self._keys > self.max_keys and self._evict_oldest():
+            pass
+        return False
+
+    def forget(self, sat_id: str, ts: float) -> None:
+        """Un-record (sat_id, ts), e.g. when its store write failed, so a retry is let through."""
+        bucket = self._slices.get(math.floor(ts / self.slice_seconds))
+        if bucket is not None:
+            key = hash((sat_id, ts))
+            if key in bucket:
+                bucket.remove(key)
+                self._keys -= 1
+
+    def filter_records(self, records: List[TelemetryRecord]) -> Tuple[List[TelemetryRecord], int]:
+        """(records not seen before, duplicates dropped). Also drops repeats within the batch."""
+        seen = self.seen
+        kept = [r for r in records if not seen(r.sat_id, r.timestamp)]
+        return kept, len(records) - len(kept)
+
+    def filter_rows(self, rows: List[TelemetryRow]) -> Tuple[List[TelemetryRow], int]:
+        seen = self.seen
+        kept = [r for r in rows if not seen(r[SAT], r[TS])]
+        return kept, len(rows) - len(kept)
+
+    def forget_records(self, records: List[TelemetryRecord]) -> None:
+        for r in records:
+            self.forget(r.sat_id, r.timestamp)
+
+    def forget_rows(self, rows: List[TelemetryRow]) -> None:
+        for r in rows:
+            self.forget(r[SAT], r[TS])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window_seconds,
+            "slice_seconds": self.slice_seconds,
+            "slices": len(self._slices),
+            "keys": self._keys,
+            "max_keys": self.max_keys,
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "untracked": self.untracked,
+            "future": self.future,
+            "slices_evicted": self.slices_evicted,
+        }
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Set
+from typing import Any, Dict, List, Optional, Tuple, Set
 from collections import Counter
 import math
 
+try:  # optional: batch scoring / distances; without it everything runs scalar
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 from orbverflow.cluster_models import (
     ConsistencyResult,
     ClusterOut,
@@ -13,6 +18,9 @@ from orbverflow.cluster_models import (
     Thresholds,
 )
 from orbverflow.models import TelemetryRecord  # 你既有 models.py
+from orbverflow.engines.spatial_grid import MIN_CELL_KM, SphericalGrid
+from orbverflow.engines.cluster_tracker import ClusterLabels, ClusterTracker
+from orbverflow.snapshot_memo import SnapshotMemo
 
 
 def _clamp(x: float, lo: float, hi: float) -> float:
@@ -31,6 +39,21 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return R * c
 
 
+def haversine_km_np(lat1: Any, lon1: Any, lat2: Any, lon2: Any) -> Any:
+    """haversine_km over NumPy arrays (broadcasting), same formula step by step."""
+    p1 = np.radians(lat1)
+    p2 = np.radians(lat2)
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+    a = np.sin(dlat / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dlon / 2) ** 2
+    return 6371.0 * (2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a)))
+
+
+# NumPy pays off from about this many sats per cell; distance blocks stay under ~1M entries
+_VEC_MIN = 16
+_VEC_BLOCK = 1 << 20
+
+
 @dataclass
 class ClusterConfig:
     distance_km_max: float = 1500.0
@@ -40,22 +63,46 @@ class ClusterConfig:
     high_conf_threshold: float = 0.75
     snr_ok_floor: float = 12.0  # below this starts becoming "bad"
     loss_high_floor: float = 50.0  # for debug-friendly threshold exposure
+    vectorized: bool = True  # NumPy batch path when NumPy is installed
+    incremental: bool = False  # keep components across calls (ClusterTracker), stable cluster ids
+    move_tolerance_km: float = 0.0  # incremental: moves up to this far keep the old position (0 = exact)
+    compact_per_sat: bool = False  # per_sat: only suspicious-or-worse sats + cluster members (ok_sats counts the rest)
 
 
 class ClusterEngine:
+    engine_name = "baseline_rule_v1"
+
     def __init__(self, config: ClusterConfig | None = None):
         self.cfg = config or ClusterConfig()
+        self._tracker: ClusterTracker | None = None
+        self._labels = ClusterLabels()
+        self._memo: SnapshotMemo[ClusterSuggestResponse] = SnapshotMemo()
+
+    def _tracker_for_cfg(self) -> ClusterTracker:
+        if self._tracker is None:
+            self._tracker = ClusterTracker(haversine_km, self.cfg.distance_km_max, self.cfg.move_tolerance_km)
+        else:
+            self._tracker.configure(self.cfg.distance_km_max, self.cfg.move_tolerance_km)
+        return self._tracker
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "engine": self.engine_name,
+            "memo": self._memo.stats(),
+            "incremental": self.cfg.incremental,
+        }
+        if self.cfg.incremental:
+            out["ids_issued"] = self._labels.issued
+            out.update(self._tracker_for_cfg().stats())
+        return out
 
-    def _intensity(self, r: TelemetryRecord) -> Tuple[float, List[str]]:
+    def _intensity_of(self, loss: float, snr: float) -> float:
         # packet_loss_pct: 0..100
-        loss = float(getattr(r, "packet_loss_pct", 0.0) or 0.0)
-        snr = float(getattr(r, "snr_db", 0.0) or 0.0)
-
         loss_norm = _clamp(loss / 100.0, 0.0, 1.0)
         snr_bad_norm = _clamp((self.cfg.snr_ok_floor - snr) / self.cfg.snr_ok_floor, 0.0, 1.0)
+        return _clamp(0.7 * loss_norm + 0.3 * snr_bad_norm, 0.0, 1.0)
 
-        intensity = _clamp(0.7 * loss_norm + 0.3 * snr_bad_norm, 0.0, 1.0)
-
+    def _reasons(self, loss: float, snr: float) -> List[str]:
         reasons: List[str] = []
         if loss >= self.cfg.loss_high_floor:
             reasons.append(f"packet_loss_pct high ({loss:.1f}%)")
@@ -63,31 +110,67 @@ class ClusterEngine:
             reasons.append(f"snr_db low ({snr:.1f} < {self.cfg.snr_ok_floor})")
         if not reasons:
             reasons.append("metrics within expected range")
+        return reasons
 
-        return intensity, reasons
+    def _intensity(self, r: TelemetryRecord) -> Tuple[float, List[str]]:
+        loss = float(getattr(r, "packet_loss_pct", 0.0) or 0.0)
+        snr = float(getattr(r, "snr_db", 0.0) or 0.0)
+        return self._intensity_of(loss, snr), self._reasons(loss, snr)
+
+    def _level(self, score: float) -> str:
+        if score >= self.cfg.high_conf_threshold:
+            return "high_confidence"
+        if score >= self.cfg.confirmed_threshold:
+            return "confirmed"
+        if score >= self.cfg.suspicious_threshold:
+            return "suspicious"
+        return "ok"
+
+    def _result(self, sat_id: str, loss: float, snr: float, intensity: float) -> ConsistencyResult:
+        return ConsistencyResult(
+            sat_id=sat_id,
+            level=self._level(intensity),
+            score=round(float(intensity), 4),
+            reasons=self._reasons(loss, snr),
+        )
 
     def consistency(self, latest: Dict[str, TelemetryRecord]) -> Dict[str, ConsistencyResult]:
         out: Dict[str, ConsistencyResult] = {}
         for sat_id, r in latest.items():
-            intensity, reasons = self._intensity(r)
-
-            if intensity >= self.cfg.high_conf_threshold:
-                level = "high_confidence"
-            elif intensity >= self.cfg.confirmed_threshold:
-                level = "confirmed"
-            elif intensity >= self.cfg.suspicious_threshold:
-                level = "suspicious"
-            else:
-                level = "ok"
-
-            out[sat_id] = ConsistencyResult(
-                sat_id=sat_id,
-                level=level,
-                score=round(float(intensity), 4),
-                reasons=reasons,
-            )
+            loss = float(getattr(r, "packet_loss_pct", 0.0) or 0.0)
+            snr = float(getattr(r, "snr_db", 0.0) or 0.0)
+            out[sat_id] = self._result(sat_id, loss, snr, self._intensity_of(loss, snr))
         return out
 
+    def _fleet_scores(self, latest: Dict[str, TelemetryRecord]) -> Tuple[List[str], Any, Any, Any]:
+        """
+        (sat ids, packet loss, snr, intensity) for the whole snapshot: one NumPy pass, or a
+        plain loop without NumPy. Same arithmetic as _intensity_of, element by element
+        (fmin / fmax treat NaN like _clamp does).
+        """
+        ids = list(latest)
+        recs = list(latest.values())
+        loss_l = [float(r.packet_loss_pct or 0.0) for r in recs]
+        snr_l = [float(r.snr_db or 0.0) for r in recs]
+        if np is None or not self.cfg.vectorized:
+            return ids, loss_l, snr_l, [self._intensity_of(l, s) for l, s in zip(loss_l, snr_l)]
+        loss = np.array(loss_l, dtype=np.float64)
+        snr = np.array(snr_l, dtype=np.float64)
+        floor = self.cfg.snr_ok_floor
+        loss_norm = np.fmax(0.0, np.fmin(1.0, loss / 100.0))
+        snr_bad_norm = np.fmax(0.0, np.fmin(1.0, (floor - snr) / floor))
+        intensity = np.fmax(0.0, np.fmin(1.0, 0.7 * loss_norm + 0.3 * snr_bad_norm))
+        return ids, loss, snr, intensity
+
+    def _at_least(self, intensity: Any, threshold: float) -> List[int]:
+        """Indexes whose score (intensity rounded to 4 places, as reported) is >= threshold."""
+        if np is None or not isinstance(intensity, np.ndarray):
+            return [i for i, x in enumerate(intensity) if round(x, 4) >= threshold]
+        # NumPy rounds differently from round() in the last place: settle the few
+        # values near the threshold with round() itself
+        idx = np.flatnonzero(intensity >= threshold - 1e-4)
+        return [int(i) for i in idx if round(float(intensity[i]), 4) >= threshold]
+
     def _calc_cluster_summary(
         self, member_results: Dict[str, ConsistencyResult]
     ) -> Tuple[float, float, Dict[str, int]]:
@@ -119,49 +202,197 @@ class ClusterEngine:
         order = ["packet_loss", "snr_drop", "modem_reset"]
         return [t for t in order if t in triggers]
 
-    def suggest_clusters(self, latest: Dict[str, TelemetryRecord]) -> ClusterSuggestResponse:
-        per_sat = self.consistency(latest)
+    def _components(self, affected: List[str], latest: Dict[str, TelemetryRecord]) -> List[List[str]]:
+        """
+        Connected components of "within distance_km_max" among affected sats, in order of
+        each component's first member in `affected`, members sorted.
+
+        - sats are bucketed in a SphericalGrid whose cells are at most distance_km_max
+          across, so every cell is connected on its own, without measuring anything
+        - neighboring cells are then joined by the first pair found within range, and a
+          cell pair already in one component (union-find) is skipped: distances are only
+          measured between cells, not all pairs of sats
+        """
+        dmax = self.cfg.distance_km_max
+        pts = [(latest[sid].lat, latest[sid].lon) for sid in affected]
+        # cells <= 2 * cell_km across; a bit under dmax / 2 so float error stays inside
+        cell_km = dmax * 0.4999
+        grid = SphericalGrid(dmax, cell_km=cell_km)
+        vec = np is not None and self.cfg.vectorized
+        if vec:
+            lat_v = np.array([p[0] for p in pts], dtype=np.float64)
+            lon_v = np.array([p[1] for p in pts], dtype=np.float64)
+            grid.add_many(lat_v, lon_v)
+        else:
+            for i, (lat, lon) in enumerate(pts):
+                grid.add(i, lat, lon)
+
+        parent = list(range(len(affected)))
+
+        def find(x: int) -> int:
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            while parent[x] != root:
+                parent[x], x = root, parent[x]
+            return root
+
+        # distance of each sat to its cell's first member, and each cell's reach from it:
+        # with the triangle inequality these rule out most pairs of two cells at once
+        # (bounds padded by 1 mm against float rounding)
+        own = [0.0] * len(affected)
+        reach: Dict[Tuple[int, int], float] = {}
+        for cell, items in grid.cells.items():
+            lat0, lon0 = pts[items[0]]
+            if vec and len(items) >= _VEC_MIN:
+                d = haversine_km_np(lat0, lon0, lat_v[items], lon_v[items])
+                d[0] = 0.0
+                for x, dx in zip(items, d.tolist()):
+                    own[x] = dx
+            else:
+                for x in items[1:]:
+                    own[x] = haversine_km(lat0, lon0, pts[x][0], pts[x][1])
+            reach[cell] = max(own[x] for x in items)
+
+        def touching_np(a_items: List[int], b_items: List[int], reach_a: float, reach_b: float) -> bool:
+            a_idx = np.array(a_items)
+            b_idx = np.array(b_items)
+            a0, b0 = a_items[0], b_items[0]
+            near_a = a_idx[haversine_km_np(lat_v[b0], lon_v[b0], lat_v[a_idx], lon_v[a_idx]) <= dmax + reach_b + 1e-6]
+            near_b = b_idx[haversine_km_np(lat_v[a0], lon_v[a0], lat_v[b_idx], lon_v[b_idx]) <= dmax + reach_a + 1e-6]
+            if not len(near_a) or not len(near_b):
+                return False
+            lat_b, lon_b = lat_v[near_b][None, :], lon_v[near_b][None, :]
+            step = max(1, _VEC_BLOCK // len(near_b))  # bounded distance matrix per block
+            for k in range(0, len(near_a), step):
+                block = near_a[k:k + step]
+                if (haversine_km_np(lat_v[block][:, None], lon_v[block][:, None], lat_b, lon_b) <= dmax).any():
+                    return True
+            return False
+
+        def touching(cell_a: Tuple[int, int], cell_b: Tuple[int, int]) -> bool:
+            """Is any sat of cell_a within range of any sat of cell_b?"""
+            a_items, b_items = grid.cells[cell_a], grid.cells[cell_b]
+            if vec and len(a_items) * len(b_items) >= _VEC_MIN * _VEC_MIN:
+                return touching_np(a_items, b_items, reach[cell_a], reach[cell_b])
+            lat_a0, lon_a0 = pts[a_items[0]]
+            lat_b0, lon_b0 = pts[b_items[0]]
+            # only sats that can reach the other cell at all, nearest to it first
+            near_a = sorted(
+                (d, a) for a in a_items
+                if (d := haversine_km(lat_b0, lon_b0, pts[a][0], pts[a][1])) <= dmax + reach[cell_b] + 1e-6
+            )
+            near_b = sorted(
+                (d, b) for b in b_items
+                if (d := haversine_km(lat_a0, lon_a0, pts[b][0], pts[b][1])) <= dmax + reach[cell_a] + 1e-6
+            )
+            for _, a in near_a:
+                lat_a, lon_a = pts[a]
+                limit = dmax + own[a] + 1e-6  # d(a, b) >= d(b, a0) - d(a, a0)
+                for d_b, b in near_b:
+                    if d_b > limit:
+                        break
+                    if haversine_km(lat_a, lon_a, pts[b][0], pts[b][1]) <= dmax:
+                        return True
+            return False
+
+        for items in grid.cells.values():
+            if cell_km >= MIN_CELL_KM:
+                for x in items[1:]:
+                    parent[x] = items[0]
+                continue
+            # degenerate threshold: cells cannot get that small, measure inside them too
+            for k, a in enumerate(items):
+                for b in items[k + 1:]:
+                    ra, rb = find(a), find(b)
+                    if ra != rb and haversine_km(pts[a][0], pts[a][1], pts[b][0], pts[b][1]) <= dmax:
+                        parent[rb] = ra
+
+        for cell, items in grid.cells.items():
+            for other in set(grid.neighbor_cells(cell)):
+                # each pair once; empty cells have no entry
+                if other <= cell or other not in grid.cells:
+                    continue
+                ra, rb = find(items[0]), find(grid.cells[other][0])
+                if ra != rb and touching(cell, other):
+                    parent[rb] = ra
+
+        by_root: Dict[int, List[str]] = {}
+        for i, sid in enumerate(affected):
+            by_root.setdefault(find(i), []).append(sid)
+        return [sorted(comp) for comp in by_root.values()]
+
+    # --- hooks for other clustering engines (see DbscanClusterEngine) ----------------
+
+    def _cluster(self, affected: List[str], latest: Dict[str, TelemetryRecord]) -> List[List[str]]:
+        """Groups of affected sats, in order of first member in `affected`, members sorted."""
+        if self.cfg.incremental:
+            return self._tracker_for_cfg().components(affected, latest, lambda: self._components(affected, latest))
+        return self._components(affected, latest)
+
+    def _grouping(self) -> str:
+        return f"distance <= {self.cfg.distance_km_max:.0f}km"
+
+    def _thresholds(self) -> Thresholds:
+        return Thresholds(
+            distance_km=self.cfg.distance_km_max,
+            intensity=self.cfg.cluster_intensity_threshold,
+            snr_low=self.cfg.snr_ok_floor,
+            loss_high=self.cfg.loss_high_floor,
+        )
+
+    def suggest_clusters(
+        self, latest: Dict[str, TelemetryRecord], version: Optional[int] = None
+    ) -> ClusterSuggestResponse:
+        """
+        - the whole snapshot is scored in one batch (_fleet_scores); per_sat has every
+          sat, or with compact_per_sat only the sats at suspicious or worse and cluster
+          members (the only ConsistencyResults built), ok_sats counting the rest
+        - incremental: components are carried over from the previous call and only
+          re-worked around sats that crossed the threshold or moved (ClusterTracker);
+          cluster ids then follow their members instead of being numbered per call
+        - version: StateStore.version of `latest`; the result is computed once per
+          version and shared by every caller (read-only); None always computes
+        """
+        return self._memo.get(version, lambda: self._suggest_clusters(latest))
+
+    def _suggest_clusters(self, latest: Dict[str, TelemetryRecord]) -> ClusterSuggestResponse:
+        ids, loss, snr, intensity = self._fleet_scores(latest)
+        susp = self.cfg.suspicious_threshold
+        if not self.cfg.compact_per_sat:
+            listed: Any = range(len(ids))
+        elif isinstance(intensity, list):
+            listed = [i for i, x in enumerate(intensity) if x >= susp]
+        else:
+            listed = np.flatnonzero(intensity >= susp).tolist()
+        per_sat: Dict[str, ConsistencyResult] = {
+            ids[i]: self._result(ids[i], float(loss[i]), float(snr[i]), float(intensity[i])) for i in listed
+        }
 
         # only cluster sats above threshold
-        affected = [sid for sid, c in per_sat.items() if c.score >= self.cfg.cluster_intensity_threshold]
-
-        # build adjacency by distance constraint
-        adj: Dict[str, List[str]] = {sid: [] for sid in affected}
-        for i in range(len(affected)):
-            a = affected[i]
-            ra = latest[a]
-            for j in range(i + 1, len(affected)):
-                b = affected[j]
-                rb = latest[b]
-                d = haversine_km(ra.lat, ra.lon, rb.lat, rb.lon)
-                if d <= self.cfg.distance_km_max:
-                    adj[a].append(b)
-                    adj[b].append(a)
-
-        # connected components (BFS)
-        clusters_members: List[List[str]] = []
-        seen: Set[str] = set()
-        for sid in affected:
-            if sid in seen:
-                continue
-            q = [sid]
-            seen.add(sid)
-            comp: List[str] = []
-            while q:
-                x = q.pop()
-                comp.append(x)
-                for y in adj.get(x, []):
-                    if y not in seen:
-                        seen.add(y)
-                        q.append(y)
-            clusters_members.append(sorted(comp))
+        affected_idx = self._at_least(intensity, self.cfg.cluster_intensity_threshold)
+        affected = [ids[i] for i in affected_idx]
+
+        clusters_members = self._cluster(affected, latest)
+
+        # members scored below suspicious (cluster threshold configured under it) still get a result
+        index = {ids[i]: i for i in affected_idx}
+        for members in clusters_members:
+            for sid in members:
+                if sid not in per_sat and len(members) >= 2:
+                    i = index[sid]
+                    per_sat[sid] = self._result(sid, float(loss[i]), float(snr[i]), float(intensity[i]))
 
         # ✅ (1) filter out singleton clusters for demo clarity
         clusters_members = [c for c in clusters_members if len(c) >= 2]
+        if self.cfg.incremental:
+            cluster_ids = self._labels.label(clusters_members)
+        else:
+            cluster_ids = [f"CL-{idx:03d}" for idx in range(1, len(clusters_members) + 1)]
 
         # build cluster output
         clusters: List[ClusterOut] = []
-        for idx, members in enumerate(clusters_members, start=1):
+        for cluster_id, members in zip(cluster_ids, clusters_members):
             # center
             lats = [latest[s].lat for s in members]
             lons = [latest[s].lon for s in members]
@@ -169,10 +400,12 @@ class ClusterEngine:
             center_lon = sum(lons) / len(lons)
 
             # radius
-            radius = 0.0
-            for s in members:
-                r = latest[s]
-                radius = max(radius, haversine_km(center_lat, center_lon, r.lat, r.lon))
+            if np is not None and self.cfg.vectorized and len(members) >= _VEC_MIN:
+                radius = float(haversine_km_np(center_lat, center_lon, np.array(lats), np.array(lons)).max())
+            else:
+                radius = 0.0
+                for lat, lon in zip(lats, lons):
+                    radius = max(radius, haversine_km(center_lat, center_lon, lat, lon))
 
             member_results = {s: per_sat[s] for s in members}
             avg_intensity = sum(member_results[s].score for s in members) / len(members)
@@ -182,14 +415,14 @@ class ClusterEngine:
 
             # ✅ (2) append triggered_by to reason for explainable demo
             reason = (
-                f"Grouped by distance <= {self.cfg.distance_km_max:.0f}km and anomaly intensity >= "
+                f"Grouped by {self._grouping()} and anomaly intensity >= "
                 f"{self.cfg.cluster_intensity_threshold:.2f} (avg={avg_intensity:.2f}); "
                 f"triggered_by={triggered_by}."
             )
 
             clusters.append(
                 ClusterOut(
-                    cluster_id=f"CL-{idx:03d}",
+                    cluster_id=cluster_id,
                     members=members,
                     center={"lat": round(center_lat, 6), "lon": round(center_lon, 6)},
                     radius_km=round(radius, 3),
@@ -208,13 +441,9 @@ class ClusterEngine:
         clusters.sort(key=lambda c: len(c.members), reverse=True)
 
         return ClusterSuggestResponse(
-            engine="baseline_rule_v1",
-            thresholds=Thresholds(
-                distance_km=self.cfg.distance_km_max,
-                intensity=self.cfg.cluster_intensity_threshold,
-                snr_low=self.cfg.snr_ok_floor,
-                loss_high=self.cfg.loss_high_floor,
-            ),
+            engine=self.engine_name,
+            thresholds=self._thresholds(),
             clusters=clusters,
             per_sat=per_sat,
+            ok_sats=len(ids) - len(per_sat),
         )
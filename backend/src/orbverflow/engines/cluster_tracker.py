@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from orbverflow.engines.spatial_grid import MIN_CELL_KM, Cell, SphericalGrid
+from orbverflow.models import TelemetryRecord
+
+# past this share of the tracked sats changing in one tick, starting over is cheaper
+REBUILD_FRACTION = 0.25
+REBUILD_MIN = 64
+
+Distance = Callable[[float, float, float, float], float]  # (lat1, lon1, lat2, lon2) -> km
+
+
+class ClusterTracker:
+    """
+    Connected components of affected sats ("within distance_km of each other"), kept
+    across ticks (ids: ClusterLabels).
+
+    - sats sit in SphericalGrid cells under distance_km / 2 across (as in
+      ClusterEngine._components), so a cell is always connected on its own; what is kept
+      is the graph of neighboring cells that touch, each edge with one witness pair of
+      sats within range
+    - a tick only touches sats that entered or left the affected set, or moved more
+      than move_tolerance_km from the position last processed (0 = any move):
+      an added sat is measured against the neighbor cells its cell does not touch yet;
+      a removed sat re-checks only the edges it was the witness of
+    - components are then a union-find over the (few) cells, and sats are grouped by
+      their cell's root
+    - the first tick, or one where more than REBUILD_FRACTION of the sats change,
+      starts over from an empty graph
+    """
+
+    def __init__(self, distance: Distance, distance_km: float, move_tolerance_km: float = 0.0) -> None:
+        self.distance = distance  # haversine_km, as ClusterEngine measures
+        self.distance_km = distance_km
+        self.move_tolerance_km = move_tolerance_km
+        self.ticks = 0
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        self.last_changed = 0
+        self.reset()
+
+    @property
+    def supported(self) -> bool:
+        """False when distance_km is too small for self-connected cells (caller recomputes)."""
+        return self.distance_km * 0.4999 >= MIN_CELL_KM
+
+    def reset(self) -> None:
+        """Forget positions and the cell graph."""
+        # cells <= 2 * cell_km across; a bit under distance_km / 2 so float error stays inside
+        self.grid = SphericalGrid(self.distance_km, cell_km=self.distance_km * 0.4999)
+        self._pos: Dict[str, Tuple[float, float]] = {}
+        self._cell_of: Dict[str, Cell] = {}
+        self._own: Dict[str, float] = {}  # distance to the cell center
+        self._reach: Dict[Cell, float] = {}  # upper bound of _own over the cell
+        self._edges: Dict[Cell, Dict[Cell, Tuple[str, str]]] = {}  # cell -> touching cell -> (own sat, its sat)
+        self._centers: Dict[Cell, Tuple[float, float]] = {}
+        self._neighbors: Dict[Cell, Tuple[Cell, ...]] = {}
+        self._root: Dict[Cell, Cell] = {}
+
+    def configure(self, distance_km: float, move_tolerance_km: float) -> None:
+        if distance_km != self.distance_km or move_tolerance_km != self.move_tolerance_km:
+            self.distance_km = distance_km
+            self.move_tolerance_km = move_tolerance_km
+            self.reset()
+
+    # --- cell graph ----------------------------------------------------------------
+
+    def _center(self, cell: Cell) -> Tuple[float, float]:
+        c = self._centers.get(cell)
+        if c is None:
+            c = self._centers[cell] = self.grid.center(cell)
+        return c
+
+    def _neighbor_cells(self, cell: Cell) -> Tuple[Cell, ...]:
+        n = self._neighbors.get(cell)
+        if n is None:
+            n = self._neighbors[cell] = tuple(c for c in set(self.grid.neighbor_cells(cell)) if c != cell)
+        return n
+
+    def _reaches(self, s: str, cell: Cell) -> Optional[str]:
+        """A sat of `cell` within range of s, if any."""
+        dmax = self.distance_km
+        distance, own, pos = self.distance, self._own, self._pos
+        lat, lon = pos[s]
+        c_lat, c_lon = self._center(cell)
+        d_c = distance(lat, lon, c_lat, c_lon)
+        # triangle inequality around the cell center, padded by 1 mm against float rounding
+        if d_c > dmax + self._reach[cell] + 1e-6:
+            return None
+        for b in self.grid.cells[cell]:
+            if d_c - own[b] > dmax + 1e-6 or own[b] - d_c > dmax + 1e-6:
+                continue
+            b_lat, b_lon = pos[b]
+            if distance(lat, lon, b_lat, b_lon) <= dmax:
+                return b
+        return None
+
+    def _connect(self, cell: Cell, other: Cell, a: str, b: str) -> None:
+        self._edges.setdefault(cell, {})[other] = (a, b)
+        self._edges.setdefault(other, {})[cell] = (b, a)
+
+    def _add(self, s: str, lat: float, lon: float) -> None:
+        grid = self.grid
+        cell = grid.cell_of(lat, lon)
+        grid.cells.setdefault(cell, []).append(s)
+        self._pos[s] = (lat, lon)
+        self._cell_of[s] = cell
+        c_lat, c_lon = self._center(cell)
+        own = self._own[s] = self.distance(c_lat, c_lon, lat, lon)
+        self._reach[cell] = max(self._reach.get(cell, 0.0), own)
+        touching = self._edges.get(cell, {})
+        for other in self._neighbor_cells(cell):
+            if other in touching or other not in grid.cells:
+                continue
+            b = self._reaches(s, other)
+            if b is not None:
+                self._connect(cell, other, s, b)
+                touching = self._edges[cell]
+
+    def _remove(self, s: str) -> None:
+        lat, lon = self._pos.pop(s)
+        cell = self._cell_of.pop(s)
+        del self._own[s]
+        self.grid.remove(s, lat, lon)
+        edges = self._edges
+        if cell not in self.grid.cells:
+            del self._reach[cell]
+            for other in edges.pop(cell, {}):
+                del edges[other][cell]
+            return
+        for other, (a, _) in list(edges.get(cell, {}).items()):
+            if a != s:
+                continue
+            # s was this edge's witness: look for another pair, else the cells part
+            del edges[cell][other], edges[other][cell]
+            for x in self.grid.cells[cell]:
+                b = self._reaches(x, other)
+                if b is not None:
+                    self._connect(cell, other, x, b)
+                    break
+
+    def _cell_roots(self) -> None:
+        parent = {cell: cell for cell in self.grid.cells}
+
+        def find(x: Cell) -> Cell:
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+            while parent[x] != root:
+                parent[x], x = root, parent[x]
+            return root
+
+        for cell, touching in self._edges.items():
+            for other in touching:
+                ra, rb = find(cell), find(other)
+                if ra != rb:
+                    parent[rb] = ra
+        self._root = {cell: find(cell) for cell in parent}
+
+    # --- ticks ---------------------------------------------------------------------
+
+    def components(
+        self,
+        affected: List[str],
+        latest: Dict[str, TelemetryRecord],
+        rebuild: Callable[[], List[List[str]]],
+    ) -> List[List[str]]:
+        """
+        Same result as rebuild() (ClusterEngine._components) over the positions last
+        processed: components in order of their first member in `affected`, members
+        sorted. rebuild() itself only runs when cells cannot be used (see supported).
+        """
+        self.ticks += 1
+        if not self.supported:
+            self.rebuilds += 1
+            return rebuild()
+
+        pos = self._pos
+        tol = self.move_tolerance_km
+        entered: List[str] = []
+        moved: List[str] = []
+        for s in affected:
+            r = latest[s]
+            old = pos.get(s)
+            if old is None:
+                entered.append(s)
+            elif old != (r.lat, r.lon) and (tol <= 0 or self.distance(old[0], old[1], r.lat, r.lon) > tol):
+                moved.append(s)
+        current = set(affected)
+        left = [s for s in pos if s not in current]
+        changed = len(entered) + len(moved) + len(left)
+        self.last_changed = changed
+
+        if changed > max(REBUILD_MIN, REBUILD_FRACTION * max(len(pos), len(affected))):
+            self.reset()
+            self.rebuilds += 1
+            entered, moved, left = list(affected), [], []
+        elif changed:
+            self.incremental_updates += 1
+        for s in left:
+            self._remove(s)
+        for s in moved:
+            self._remove(s)
+        for s in moved + entered:
+            r = latest[s]
+            self._add(s, r.lat, r.lon)
+        if changed:
+            self._cell_roots()
+
+        root, cell_of = self._root, self._cell_of
+        by_root: Dict[Cell, List[str]] = {}
+        for s in affected:
+            by_root.setdefault(root[cell_of[s]], []).append(s)
+        return [sorted(members) for members in by_root.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "distance_km": self.distance_km,
+            "move_tolerance_km": self.move_tolerance_km,
+            "ticks": self.ticks,
+            "rebuilds": self.rebuilds,
+            "incremental_updates": self.incremental_updates,
+            "last_changed": self.last_changed,
+            "tracked_sats": len(self._pos),
+            "cells": len(self.grid.cells),
+            "cell_edges": sum(len(t) for t in self._edges.values()) // 2,
+        }
+
+
+class ClusterLabels:
+    """
+    Cluster ids that follow their members from one call to the next.
+
+    - each cluster keeps the id of the previous cluster it shares the most members with
+      (ties: the older id); a merge keeps the id of its largest predecessor, split-off
+      parts and new clusters get fresh ids
+    """
+
+    def __init__(self) -> None:
+        self._next_id = 1
+        self._cluster_of: Dict[str, int] = {}  # sat -> id of the cluster it was last reported in
+
+    def label(self, clusters: List[List[str]]) -> List[str]:
+        """Ids ("CL-001", ...) for this tick's clusters, in the same order."""
+        prev = self._cluster_of
+        claims = []
+        for k, members in enumerate(clusters):
+            for cid, n in Counter(prev[s] for s in members if s in prev).items():
+                claims.append((-n, cid, k))
+        claims.sort()
+        ids: List[Optional[int]] = [None] * len(clusters)
+        taken: Set[int] = set()
+        for _, cid, k in claims:
+            if ids[k] is None and cid not in taken:
+                ids[k] = cid
+                taken.add(cid)
+        for k in range(len(clusters)):
+            if ids[k] is None:
+                ids[k] = self._next_id
+                self._next_id += 1
+        self._cluster_of = {s: cid for members, cid in zip(clusters, ids) for s in members}
+        return [f"CL-{cid:03d}" for cid in ids]
+
+    @property
+    def issued(self) -> int:
+        return self._next_id - 1
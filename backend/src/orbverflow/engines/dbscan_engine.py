@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from itertools import product
+from typing import Any, Dict, List, Tuple
+
+try:  # required here: the grid DBSCAN is all array work
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from orbverflow.cluster_models import Thresholds
+from orbverflow.engines.cluster_engine import ClusterConfig, ClusterEngine
+from orbverflow.models import TelemetryRecord
+
+# WGS84 ellipsoid, km
+WGS84_A_KM = 6378.137
+WGS84_E2 = 6.69437999014e-3
+
+# point pairs measured per NumPy block; dense cell pairs above _HEAVY_PAIRS only need
+# one pair within eps (both sides are all core), so they are checked one by one, late
+_PAIR_BLOCK = 1 << 21
+_HEAVY_PAIRS = 1 << 14
+
+# neighbor cells: cells are eps / sqrt(3) wide, so eps reaches 2 cells along each axis;
+# "forward" half of the 5 x 5 x 5 block (each cell pair is visited once)
+_OFFSETS = [d for d in product(range(-2, 3), repeat=3) if d > (0, 0, 0)]
+
+
+def ecef_km(lat: Any, lon: Any, alt_km: Any) -> Any:
+    """(n, 3) ECEF positions (km) from geodetic lat / lon (deg) and altitude (km), WGS84."""
+    phi = np.radians(lat)
+    lam = np.radians(lon)
+    sin_phi = np.sin(phi)
+    cos_phi = np.cos(phi)
+    n = WGS84_A_KM / np.sqrt(1.0 - WGS84_E2 * sin_phi * sin_phi)
+    return np.stack(
+        [
+            (n + alt_km) * cos_phi * np.cos(lam),
+            (n + alt_km) * cos_phi * np.sin(lam),
+            (n * (1.0 - WGS84_E2) + alt_km) * sin_phi,
+        ],
+        axis=1,
+    )
+
+
+def _pairs(starts_a: Any, counts_a: Any, starts_b: Any, counts_b: Any) -> Tuple[Any, Any]:
+    """Every (i, j), i in cell a, j in cell b, for the given cell pairs (sorted point indexes)."""
+    sizes = counts_a * counts_b
+    total = int(sizes.sum())
+    first = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    k = np.arange(total, dtype=np.int64) - first
+    nb = np.repeat(counts_b, sizes)
+    return np.repeat(starts_a, sizes) + k // nb, np.repeat(starts_b, sizes) + k % nb
+
+
+def _roots(n: int, u: Any, v: Any) -> Any:
+    """
+    Connected components of n nodes over edges (u, v): each node's smallest member.
+    Hook every root onto the smaller root across an edge, then pointer-jump, until
+    no edge crosses two components.
+    """
+    lab = np.arange(n)
+    while len(u):
+        lu, lv = lab[u], lab[v]
+        cross = lu != lv
+        if not cross.any():
+            break
+        lu, lv = lu[cross], lv[cross]
+        m = np.minimum(lu, lv)
+        np.minimum.at(lab, lu, m)
+        np.minimum.at(lab, lv, m)
+        while True:
+            nxt = lab[lab]
+            if np.array_equal(nxt, lab):
+                break
+            lab = nxt
+        u, v = u[cross], v[cross]
+    return lab
+
+
+def dbscan(xyz: Any, eps: float, min_samples: int) -> Tuple[Any, Any]:
+    """
+    DBSCAN over (n, 3) points: (labels, core mask), label -1 = noise.
+
+    - grid index: cells a hair under eps / sqrt(3) wide, so all points of a cell are
+      within eps of each other; a cell holding min_samples points is all core, and the
+      core points of any cell form one group
+    - point pairs are measured only between neighbor cells (and inside cells too small
+      to be all core), in NumPy blocks; two all-core cells only need one pair within
+      eps: their bounding boxes usually decide, the rest are measured last and only
+      when not connected yet
+    - core groups are joined by core pairs within eps (union-find over cells); a border
+      point joins its nearest core neighbor (ties: the lower point index)
+    """
+    n = len(xyz)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=bool)
+    eps2 = eps * eps
+    size = max(eps / math.sqrt(3.0) * (1.0 - 1e-9), 1e-9)
+    ijk = np.floor(xyz / size).astype(np.int64)
+    # rank-compress each axis so packed cell keys fit in int64 whatever eps is
+    axes = [np.unique(ijk[:, d]) for d in range(3)]
+    ranks = [np.searchsorted(axes[d], ijk[:, d]) for d in range(3)]
+    key = (ranks[0] * len(axes[1]) + ranks[1]) * len(axes[2]) + ranks[2]
+    cell_keys, cell_of = np.unique(key, return_inverse=True)
+    cell_of = cell_of.reshape(-1)
+    ncells = len(cell_keys)
+
+    order = np.argsort(cell_of, kind="stable")  # sorted space: points grouped by cell
+    pts = xyz[order]
+    cell = cell_of[order]
+    counts = np.bincount(cell_of, minlength=ncells)
+    starts = np.cumsum(counts) - counts
+    cell_ijk = ijk[order[starts]]
+    big = counts >= min_samples
+
+    def neighbor(off: Tuple[int, int, int]) -> Tuple[Any, Any]:
+        ok = np.ones(ncells, dtype=bool)
+        r = []
+        for d in range(3):
+            t = cell_ijk[:, d] + off[d]
+            rd = np.minimum(np.searchsorted(axes[d], t), len(axes[d]) - 1)
+            ok &= axes[d][rd] == t
+            r.append(rd)
+        k = (r[0] * len(axes[1]) + r[1]) * len(axes[2]) + r[2]
+        at = np.minimum(np.searchsorted(cell_keys, k), ncells - 1)
+        ok &= cell_keys[at] == k
+        return np.flatnonzero(ok), at[ok]
+
+    hits_i: List[Any] = []  # pairs within eps across cells (counted as neighbors)
+    hits_j: List[Any] = []
+    hits_d: List[Any] = []
+    near_i: List[Any] = []  # pairs inside small cells (neighbors already counted)
+    near_j: List[Any] = []
+    near_d: List[Any] = []
+    dense_a: List[Any] = []  # neighbor cells both all core: connectivity only
+    dense_b: List[Any] = []
+
+    def measure(a: Any, b: Any, out_i: List[Any], out_j: List[Any], out_d: List[Any], upper: bool) -> None:
+        sizes = counts[a] * counts[b]
+        ends = np.cumsum(sizes)
+        lo = 0
+        while lo < len(a):
+            # cell pairs of one block (at least one)
+            hi = max(lo + 1, int(np.searchsorted(ends, (ends[lo - 1] if lo else 0) + _PAIR_BLOCK, side="right")))
+            i, j = _pairs(starts[a[lo:hi]], counts[a[lo:hi]], starts[b[lo:hi]], counts[b[lo:hi]])
+            if upper:
+                keep = i < j
+                i, j = i[keep], j[keep]
+            diff = pts[i] - pts[j]
+            d2 = np.einsum("ij,ij->i", diff, diff)
+            within = d2 <= eps2
+            out_i.append(i[within])
+            out_j.append(j[within])
+            out_d.append(d2[within])
+            lo = hi
+
+    for off in _OFFSETS:
+        a, b = neighbor(off)
+        if not len(a):
+            continue
+        dense = big[a] & big[b]
+        dense_a.append(a[dense])
+        dense_b.append(b[dense])
+        if not dense.all():
+            measure(a[~dense], b[~dense], hits_i, hits_j, hits_d, upper=False)
+    small = np.flatnonzero(~big & (counts >= 2))
+    if len(small):
+        measure(small, small, near_i, near_j, near_d, upper=True)
+
+    def cat(parts: List[Any], dtype: Any) -> Any:
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    hi_, hj_, hd_ = cat(hits_i, np.int64), cat(hits_j, np.int64), cat(hits_d, np.float64)
+    ni_, nj_, nd_ = cat(near_i, np.int64), cat(near_j, np.int64), cat(near_d, np.float64)
+
+    neighbors = counts[cell] + np.bincount(hi_, minlength=n) + np.bincount(hj_, minlength=n)
+    core = neighbors >= min_samples
+
+    # core groups (one per cell) joined by core pairs within eps
+    both = core[hi_] & core[hj_]
+    edges = np.unique(cell[hi_[both]] * ncells + cell[hj_[both]])
+    eu, ev = edges // ncells, edges % ncells
+
+    # all-core cell pairs: point bounding boxes settle most of them (every pair within
+    # eps / none), a 1e-9 margin leaves float ties to measuring
+    da, db = cat(dense_a, np.int64), cat(dense_b, np.int64)
+    if len(da):
+        lo_c = np.minimum.reduceat(pts, starts)
+        hi_c = np.maximum.reduceat(pts, starts)
+        gap = np.maximum(np.maximum(lo_c[db] - hi_c[da], lo_c[da] - hi_c[db]), 0.0)
+        span = np.maximum(hi_c[db] - lo_c[da], hi_c[da] - lo_c[db])
+        apart = np.einsum("ij,ij->i", gap, gap) > eps2 * (1.0 + 1e-9)
+        close = np.einsum("ij,ij->i", span, span) <= eps2 * (1.0 - 1e-9)
+        eu, ev = np.concatenate([eu, da[close]]), np.concatenate([ev, db[close]])
+        unsure = ~apart & ~close
+        da, db = da[unsure], db[unsure]
+    lab = _roots(ncells, eu, ev)
+
+    if len(da):
+        # the rest, only between groups not connected yet: one pair within eps is enough
+        split = lab[da] != lab[db]
+        da, db = da[split], db[split]
+        light = counts[da] * counts[db] <= _HEAVY_PAIRS
+        if light.any():
+            ci: List[Any] = []
+            cj: List[Any] = []
+            measure(da[light], db[light], ci, cj, [], upper=False)
+            ci_, cj_ = cat(ci, np.int64), cat(cj, np.int64)
+            eu = np.concatenate([eu, cell[ci_]])
+            ev = np.concatenate([ev, cell[cj_]])
+            lab = _roots(ncells, eu, ev)
+
+        def find(x: int) -> int:
+            while lab[x] != x:
+                lab[x] = lab[lab[x]]
+                x = int(lab[x])
+            return x
+
+        for ca, cb in zip(da[~light].tolist(), db[~light].tolist()):
+            ra, rb = find(ca), find(cb)
+            if ra == rb:
+                continue
+            pa = pts[starts[ca]:starts[ca] + counts[ca]]
+            pb = pts[starts[cb]:starts[cb] + counts[cb]]
+            step = max(1, _PAIR_BLOCK // len(pb))
+            for k in range(0, len(pa), step):
+                diff = pa[k:k + step, None, :] - pb[None, :, :]
+                if (np.einsum("ijk,ijk->ij", diff, diff) <= eps2).any():
+                    lab[max(ra, rb)] = min(ra, rb)
+                    break
+        while True:
+            nxt = lab[lab]
+            if np.array_equal(nxt, lab):
+                break
+            lab = nxt
+
+    labels = np.where(core, lab[cell], -1)
+
+    # border points: nearest core neighbor
+    pi = np.concatenate([hi_, hj_, ni_, nj_])
+    pj = np.concatenate([hj_, hi_, nj_, ni_])
+    pd = np.concatenate([hd_, hd_, nd_, nd_])
+    border = ~core[pi] & core[pj]
+    if border.any():
+        pi, pj, pd = pi[border], pj[border], pd[border]
+        pick = np.lexsort((order[pj], pd, pi))
+        first = np.unique(pi[pick], return_index=True)[1]
+        chosen = pick[first]
+        labels[pi[chosen]] = labels[pj[chosen]]
+
+    out = np.empty(n, dtype=np.int64)
+    out[order] = labels
+    is_core = np.empty(n, dtype=bool)
+    is_core[order] = core
+    return out, is_core
+
+
+@dataclass
+class DbscanConfig(ClusterConfig):
+    eps_km: float = 500.0  # 3D (ECEF) neighborhood radius
+    min_samples: int = 3  # sats within eps_km (itself included) that make a core sat
+
+
+class DbscanClusterEngine(ClusterEngine):
+    """
+    ClusterEngine with density clustering in 3D in place of surface-distance chaining.
+
+    - affected sats (same scoring and threshold as the baseline) are converted to ECEF
+      once, altitude included, so sats stacked in different orbits over one spot are
+      not neighbors, and clustered with dbscan(eps_km, min_samples)
+    - noise sats are left out; the rest of the response (per_sat, summaries, centers,
+      memoization per snapshot version) is ClusterEngine's
+    - incremental=True keeps cluster ids stable (ClusterLabels); components are
+      recomputed every call, there is no tracker
+    """
+
+    engine_name = "dbscan_ecef_v1"
+
+    def __init__(self, config: DbscanConfig | None = None):
+        if np is None:
+            raise RuntimeError("the dbscan cluster engine (CLUSTER_ENGINE=dbscan) requires the 'numpy' package")
+        super().__init__(config or DbscanConfig())
+        self.last_ms = 0.0
+        self.last_core = 0
+        self.last_noise = 0
+
+    def _cluster(self, affected: List[str], latest: Dict[str, TelemetryRecord]) -> List[List[str]]:
+        t0 = time.perf_counter()
+        n = len(affected)
+        recs = [latest[s] for s in affected]
+        lat = np.fromiter((r.lat for r in recs), dtype=np.float64, count=n)
+        lon = np.fromiter((r.lon for r in recs), dtype=np.float64, count=n)
+        alt = np.fromiter((r.alt for r in recs), dtype=np.float64, count=n)
+        labels, core = dbscan(ecef_km(lat, lon, alt), self.cfg.eps_km, self.cfg.min_samples)
+
+        clustered = np.flatnonzero(labels >= 0)
+        groups: Dict[int, List[str]] = {}
+        for i, label in zip(clustered.tolist(), labels[clustered].tolist()):
+            groups.setdefault(label, []).append(affected[i])
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        self.last_core = int(core.sum())
+        self.last_noise = n - len(clustered)
+        return [sorted(members) for members in groups.values()]
+
+    def _grouping(self) -> str:
+        return f"ECEF density (eps {self.cfg.eps_km:.0f}km, min_samples {self.cfg.min_samples})"
+
+    def _thresholds(self) -> Thresholds:
+        return Thresholds(
+            distance_km=self.cfg.eps_km,
+            intensity=self.cfg.cluster_intensity_threshold,
+            snr_low=self.cfg.snr_ok_floor,
+            loss_high=self.cfg.loss_high_floor,
+            min_samples=self.cfg.min_samples,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "engine": self.engine_name,
+            "memo": self._memo.stats(),
+            "incremental": self.cfg.incremental,
+            "eps_km": self.cfg.eps_km,
+            "min_samples": self.cfg.min_samples,
+            "last_cluster_ms": round(self.last_ms, 3),
+            "last_core": self.last_core,
+            "last_noise": self.last_noise,
+        }
+        if self.cfg.incremental:
+            out["ids_issued"] = self._labels.issued
+        return out
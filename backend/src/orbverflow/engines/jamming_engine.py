@@ -7,6 +7,7 @@ from typing import Any, Dict, Optional, Tuple
 from orbverflow.incident_store import Incident, IncidentStore
 from orbverflow.engines.cluster_engine import ClusterEngine
 from orbverflow.models import TelemetryRecord
+from orbverflow.snapshot_memo import SnapshotMemo
 
 
 def _clamp(x: float, lo: float, hi: float) -> float:
@@ -27,6 +28,8 @@ class JammingEngine:
     - Reuse ClusterEngine /clusters/suggest result to emit a JAMMING incident.
     - Adds dataset provenance from ProvenanceRegistry if available.
     - Uses IncidentStore cooldown to avoid spamming new incident IDs.
+    - Memoized per store snapshot version: pollers and loops on the same snapshot share
+      one detection (and one incident upsert).
     """
 
     def __init__(
@@ -40,6 +43,10 @@ class JammingEngine:
         self.incident_store = incident_store
         self.prov_registry = prov_registry
         self.cfg = cfg or JammingEngineConfig()
+        self._memo: SnapshotMemo[Tuple[Optional[Incident], str]] = SnapshotMemo()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"memo": self._memo.stats()}
 
     def _get_dataset_meta(self) -> Optional[Dict[str, Any]]:
         pr = self.prov_registry
@@ -63,11 +70,21 @@ class JammingEngine:
         self,
         latest: Dict[str, TelemetryRecord],
         now_ts: Optional[float] = None,
+        version: Optional[int] = None,
+    ) -> Tuple[Optional[Incident], str]:
+        """version: StateStore.version of `latest` (None = no memoization)."""
+        return self._memo.get(version, lambda: self._detect(latest, now_ts, version))
+
+    def _detect(
+        self,
+        latest: Dict[str, TelemetryRecord],
+        now_ts: Optional[float],
+        version: Optional[int],
     ) -> Tuple[Optional[Incident], str]:
         if not latest:
             return None, "no telemetry available"
 
-        cluster_resp = self.cluster_engine.suggest_clusters(latest)
+        cluster_resp = self.cluster_engine.suggest_clusters(latest, version=version)
 
         if not cluster_resp.clusters:
             return None, "no clusters above thresholds"
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0  # same sphere as haversine_km
+MIN_CELL_KM = 1e-6
+
+Cell = Tuple[int, int]  # (latitude band, longitude column)
+
+
+class SphericalGrid:
+    """
+    Lat/lon buckets for "everything within radius_km" queries on the sphere.
+
+    - latitude bands are cell_km tall (default: the radius), so a query only visits the
+      bands within one radius of latitude
+    - each band is cut into longitude columns at most cell_km wide at its equatorward
+      edge (its widest): any two points of a cell are at most 2 * cell_km apart (a
+      meridian leg plus a parallel leg), fewer, narrower-angled columns toward the poles
+    - the longitude span searched around latitude phi is asin(sin(d) / cos(phi)) (d =
+      radius as an angle); once |phi| + d reaches a pole every column is searched, which
+      covers neighbors across the pole
+    - longitudes wrap: columns are taken modulo the band's column count, so cells on
+      either side of the antimeridian are neighbors
+    """
+
+    def __init__(self, radius_km: float, cell_km: Optional[float] = None) -> None:
+        self.radius_km = radius_km
+        # radius as an angle, padded a hair so float rounding never drops a boundary pair
+        self._d = max(radius_km, MIN_CELL_KM) / EARTH_RADIUS_KM * (1.0 + 1e-9)
+        cell = cell_km if cell_km is not None else radius_km
+        self._band_deg = min(math.degrees(max(cell, MIN_CELL_KM) / EARTH_RADIUS_KM), 180.0)
+        self._nbands = max(1, math.ceil(180.0 / self._band_deg))
+        self._ncols: Dict[int, int] = {}
+        self.cells: Dict[Cell, List[Hashable]] = {}
+
+    def _band(self, lat: float) -> int:
+        b = int((min(max(lat, -90.0), 90.0) + 90.0) / self._band_deg)
+        return min(b, self._nbands - 1)
+
+    def _band_edges(self, band: int) -> Tuple[float, float]:
+        lo = -90.0 + band * self._band_deg
+        return lo, min(lo + self._band_deg, 90.0)
+
+    def _cols(self, band: int) -> int:
+        n = self._ncols.get(band)
+        if n is None:
+            lo, hi = self._band_edges(band)
+            equatorward = 0.0 if lo <= 0.0 <= hi else min(abs(lo), abs(hi))
+            n = max(1, math.ceil(360.0 * math.cos(math.radians(equatorward)) / self._band_deg))
+            self._ncols[band] = n
+        return n
+
+    def _col(self, band: int, lon: float) -> int:
+        n = self._cols(band)
+        return min(int(((lon + 180.0) % 360.0) / (360.0 / n)), n - 1)
+
+    def cell_of(self, lat: float, lon: float) -> Cell:
+        b = self._band(lat)
+        return b, self._col(b, lon)
+
+    def center(self, cell: Cell) -> Tuple[float, float]:
+        band, col = cell
+        lo, hi = self._band_edges(band)
+        width = 360.0 / self._cols(band)
+        return (lo + hi) / 2.0, -180.0 + (col + 0.5) * width
+
+    def add(self, item: Hashable, lat: float, lon: float) -> None:
+        self.cells.setdefault(self.cell_of(lat, lon), []).append(item)
+
+    def remove(self, item: Hashable, lat: float, lon: float) -> None:
+        """Drop an item added at (lat, lon); empty cells are deleted."""
+        cell = self.cell_of(lat, lon)
+        items = self.cells[cell]
+        items.remove(item)
+        if not items:
+            del self.cells[cell]
+
+    def add_many(self, lat: Any, lon: Any) -> None:
+        """Items 0..n-1 at NumPy arrays lat / lon: cell_of() in one pass, same arithmetic."""
+        import numpy as np
+
+        bands = np.minimum(((np.clip(lat, -90.0, 90.0) + 90.0) / self._band_deg).astype(np.int64), self._nbands - 1)
+        uniq, inverse = np.unique(bands, return_inverse=True)
+        n = np.array([self._cols(b) for b in uniq.tolist()], dtype=np.int64)[inverse]
+        cols = np.minimum((((lon + 180.0) % 360.0) / (360.0 / n)).astype(np.int64), n - 1)
+        cells = self.cells
+        for i, cell in enumerate(zip(bands.tolist(), cols.tolist())):
+            cells.setdefault(cell, []).append(i)
+
+    def _lon_span(self, abs_lat: float) -> float:
+        """Longitude half-width (deg) holding every point within radius of latitude abs_lat; >= 180 = all."""
+        phi = math.radians(min(abs_lat, 90.0))
+        if phi + self._d >= math.pi / 2:
+            return 360.0
+        return math.degrees(math.asin(min(1.0, math.sin(self._d) / math.cos(phi)))) + 1e-9
+
+    def _around(self, lat_lo: float, lat_hi: float, lon_lo: float, lon_hi: float) -> Iterator[Cell]:
+        reach = math.degrees(self._d)
+        span = self._lon_span(max(abs(lat_lo), abs(lat_hi)))
+        for band in range(self._band(lat_lo - reach), self._band(lat_hi + reach) + 1):
+            n = self._cols(band)
+            if span >= 180.0 or (lon_hi - lon_lo) + 2 * span + 360.0 / n >= 360.0:
+                for c in range(n):
+                    yield band, c
+                continue
+            c0 = self._col(band, lon_lo - span)
+            count = (self._col(band, lon_hi + span) - c0) % n + 1
+            for k in range(count):
+                yield band, (c0 + k) % n
+
+    def neighbor_cells(self, cell: Cell) -> Iterator[Cell]:
+        """Cells (itself included) that can hold a point within radius of any point of `cell`."""
+        band, col = cell
+        lo, hi = self._band_edges(band)
+        width = 360.0 / self._cols(band)
+        lon_lo = -180.0 + col * width
+        return self._around(lo, hi, lon_lo, lon_lo + width)
+
+    def candidates(self, lat: float, lon: float) -> Iterator[Hashable]:
+        """Items that may lie within radius of (lat, lon); callers still check the distance."""
+        for cell in self._around(lat, lat, lon, lon):
+            yield from self.cells.get(cell, ())
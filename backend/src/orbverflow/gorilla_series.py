@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import math
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.telemetry_rows import (
+    ALT, LAT, LINK, LOSS, LON, MODEM, POWER, PROV, RSSI, SNR, SPOOF, TS,
+    TelemetryRow, record_of, row_of,
+)
+
+
+# --- bit stream ---------------------------------------------------------------
+
+class _BitWriter:
+    __slots__ = ("_buf", "_acc", "_n")
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+        self._acc = 0
+        self._n = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._n += nbits
+        if self._n >= 64:
+            extra = self._n - (self._n // 8) * 8
+            self._buf += (self._acc >> extra).to_bytes(self._n // 8, "big")
+            self._acc &= (1 << extra) - 1
+            self._n = extra
+
+    def getvalue(self) -> bytes:
+        if self._n:
+            pad = (-self._n) % 8
+            self._buf += (self._acc << pad).to_bytes((self._n + pad) // 8, "big")
+            self._acc = 0
+            self._n = 0
+        return bytes(self._buf)
+
+
+class _BitReader:
+    __slots__ = ("_data", "_pos")
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._pos = 0
+
+    def read(self, nbits: int) -> int:
+        pos = self._pos
+        first = pos >> 3
+        last = (pos + nbits + 7) >> 3
+        chunk = int.from_bytes(self._data[first:last], "big")
+        shift = (last - first) * 8 - (pos - first * 8) - nbits
+        self._pos = pos + nbits
+        return (chunk >> shift) & ((1 << nbits) - 1)
+
+    def bit(self) -> int:
+        pos = self._pos
+        self._pos = pos + 1
+        return (self._data[pos >> 3] >> (7 - (pos & 7))) & 1
+
+
+_D = struct.Struct(">d")
+_Q = struct.Struct(">Q")
+
+
+def _f2u(x: float) -> int:
+    return _Q.unpack(_D.pack(x))[0]
+
+
+def _u2f(u: int) -> float:
+    return _D.unpack(_Q.pack(u))[0]
+
+
+def _zz(v: int) -> int:
+    return (v << 1) ^ (v >> 63)
+
+
+def _unzz(u: int) -> int:
+    return (u >> 1) ^ -(u & 1)
+
+
+# --- column codecs ------------------------------------------------------------
+# timestamps: integer microseconds, delta-of-delta with variable buckets
+# (tuned for ~1 Hz telemetry with sub-ms jitter)
+_DOD_BUCKETS = ((0b10, 2, 12), (0b110, 3, 20), (0b1110, 4, 32))
+
+
+def _encode_ts(w: _BitWriter, ts_us: List[int]) -> None:
+    w.write(ts_us[0], 64)
+    if len(ts_us) == 1:
+        return
+    prev_delta = ts_us[1] - ts_us[0]
+    w.write(_zz(prev_delta), 64)
+    for i in range(2, len(ts_us)):
+        delta = ts_us[i] - ts_us[i - 1]
+        dod = delta - prev_delta
+        prev_delta = delta
+        if dod == 0:
+            w.write(0, 1)
+            continue
+        z = _zz(dod)
+        for prefix, plen, bits in _DOD_BUCKETS:
+            if z < (1 << bits):
+                w.write(prefix, plen)
+                w.write(z, bits)
+                break
+        else:
+            w.write(0b1111, 4)
+            w.write(z, 64)
+
+
+def _decode_ts(r: _BitReader, n: int) -> List[int]:
+    out = [r.read(64)]
+    if n == 1:
+        return out
+    delta = _unzz(r.read(64))
+    out.append(out[0] + delta)
+    for _ in range(2, n):
+        if not r.bit():
+            dod = 0
+        elif not r.bit():
+            dod = _unzz(r.read(12))
+        elif not r.bit():
+            dod = _unzz(r.read(20))
+        elif not r.bit():
+            dod = _unzz(r.read(32))
+        else:
+            dod = _unzz(r.read(64))
+        delta += dod
+        out.append(out[-1] + delta)
+    return out
+
+
+def _encode_floats(w: _BitWriter, values: List[float]) -> None:
+    """Gorilla XOR encoding: 0 = repeat, 10 = reuse previous leading/trailing window, 11 = new window."""
+    prev = _f2u(values[0])
+    w.write(prev, 64)
+    lead, trail = 65, 0  # no window yet
+    for v in values[1:]:
+        cur = _f2u(v)
+        x = cur ^ prev
+        prev = cur
+        if x == 0:
+            w.write(0, 1)
+            continue
+        lz = 64 - x.bit_length()
+        tz = (x & -x).bit_length() - 1
+        if lz >= lead and tz >= trail:
+            w.write(0b10, 2)
+            w.write(x >> trail, 64 - lead - trail)
+        else:
+            lz = min(lz, 31)
+            sig = 64 - lz - tz
+            w.write(0b11, 2)
+            w.write(lz, 5)
+            w.write(sig - 1, 6)  # 1..64 stored as 0..63
+            w.write(x >> tz, sig)
+            lead, trail = lz, tz
+
+
+def _decode_floats(r: _BitReader, n: int) -> List[float]:
+    prev = r.read(64)
+    out = [_u2f(prev)]
+    lead = trail = 0
+    for _ in range(1, n):
+        if r.bit():
+            if r.bit():
+                lead = r.read(5)
+                sig = r.read(6) + 1
+                trail = 64 - lead - sig
+            prev ^= r.read(64 - lead - trail) << trail
+        out.append(_u2f(prev))
+    return out
+
+
+def _encode_small_ints(w: _BitWriter, values: List[int], signed: bool = False) -> None:
+    """
+    Mostly-constant ints (resets, link code, flags): 0 = same as previous, 1 + 32 bits =
+    new value. signed columns (int32) are zigzagged into the 32 bits, others are u32.
+    """
+    prev = None
+    for v in values:
+        if v == prev:
+            w.write(0, 1)
+        else:
+            w.write(1, 1)
+            w.write(_zz(v) if signed else v, 32)
+            prev = v
+
+
+def _decode_small_ints(r: _BitReader, n: int, signed: bool = False) -> List[int]:
+    out: List[int] = []
+    prev = 0
+    for _ in range(n):
+        if r.bit():
+            prev = _unzz(r.read(32)) if signed else r.read(32)
+        out.append(prev)
+    return out
+
+
+_FLOAT_COLS = ("lat", "lon", "alt", "snr", "rssi", "loss", "power")
+_INT_COLS = ("modem", "link", "spoof", "prov")
+_SIGNED_COLS = ("modem",)
+
+
+class _Chunk:
+    """A sealed, immutable block of compressed samples."""
+
+    __slots__ = ("min_ts", "max_ts", "count", "data", "pids")
+
+    # python object + slots overhead, roughly
+    OVERHEAD_BYTES = 120
+
+    def __init__(self, min_ts: float, max_ts: float, count: int, data: bytes, pids: FrozenSet[int]) -> None:
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.count = count
+        self.data = data
+        self.pids = pids  # provenance ids inside, so they can be listed without decoding
+
+
+def _encode_chunk(cols: Dict[str, list]) -> bytes:
+    w = _BitWriter()
+    _encode_ts(w, cols["ts_us"])
+    for c in _FLOAT_COLS:
+        _encode_floats(w, cols[c])
+    for c in _INT_COLS:
+        _encode_small_ints(w, cols[c], c in _SIGNED_COLS)
+    return w.getvalue()
+
+
+def _decode_chunk(ch: _Chunk) -> Dict[str, list]:
+    r = _BitReader(ch.data)
+    n = ch.count
+    cols: Dict[str, list] = {"ts_us": _decode_ts(r, n)}
+    for c in _FLOAT_COLS:
+        cols[c] = _decode_floats(r, n)
+    for c in _INT_COLS:
+        cols[c] = _decode_small_ints(r, n, c in _SIGNED_COLS)
+    return cols
+
+
+class GorillaSeries:
+    """
+    Compressed per-sat history (Gorilla-style):
+    - sealed chunks of chunk_size samples: delta-of-delta timestamps (µs) + XOR-encoded floats
+    - only the open head (plain typed arrays) is mutable; it is sealed once full
+    - expiry drops whole chunks; samples of a partly expired chunk are masked on read
+
+    Timestamps are kept at microsecond resolution.
+    """
+
+    def __init__(self, sat_id: str, chunk_size: int = 120) -> None:
+        self.sat_id = sat_id
+        self.chunk_size = chunk_size
+        self._chunks: List[_Chunk] = []
+        self._chunk_max = array("d")  # max_ts per sealed chunk, for bisect
+        self._head: Dict[str, array] = self._empty_head()
+        self._size = 0
+        self._low_water = -math.inf  # samples below this are expired but not yet dropped
+
+        self._last: Optional[TelemetryRecord] = None
+        self._newest_ts = -math.inf
+        self._decoded: Tuple[int, Optional[Dict[str, list]]] = (-1, None)  # (id(chunk), columns)
+
+    @staticmethod
+    def _empty_head() -> Dict[str, array]:
+        head = {"ts_us": array("q")}
+        for c in _FLOAT_COLS:
+            head[c] = array("d")
+        head["modem"] = array("i")
+        head["link"] = array("B")
+        head["spoof"] = array("B")
+        head["prov"] = array("I")
+        return head
+
+    def __len__(self) -> int:
+        return self._size
+
+    def nbytes(self) -> int:
+        sealed = sum(len(ch.data) + _Chunk.OVERHEAD_BYTES for ch in self._chunks)
+        head = sum(a.itemsize * len(a) for a in self._head.values())
+        return sealed + head
+
+    @staticmethod
+    def _cols_row(row: TelemetryRow) -> Dict[str, object]:
+        return {
+            "ts_us": int(round(row[TS] * 1_000_000)),
+            "lat": row[LAT], "lon": row[LON], "alt": row[ALT],
+            "snr": row[SNR], "rssi": row[RSSI], "loss": row[LOSS], "power": row[POWER],
+            "modem": row[MODEM], "link": row[LINK], "spoof": row[SPOOF], "prov": row[PROV],
+        }
+
+    def _seal(self, cols: Dict[str, list]) -> _Chunk:
+        ts = cols["ts_us"]
+        return _Chunk(ts[0] / 1e6, ts[-1] / 1e6, len(ts), _encode_chunk(cols), frozenset(cols["prov"]))
+
+    def append(self, r: TelemetryRecord) -> int:
+        return self.append_row(row_of(r), record=r)
+
+    def append_row(self, trow: TelemetryRow, record: Optional[TelemetryRecord] = None) -> int:
+        """Append one decoded row; `record` is its pydantic form if the caller has one."""
+        ts = trow[TS]
+        row = self._cols_row(trow)
+        head = self._head
+        hts = head["ts_us"]
+        ts_us = row["ts_us"]
+
+        if self._chunks and ts < self._chunks[-1].max_ts:
+            # rare: sample belongs inside a sealed chunk -> decode, insert, re-seal
+            ci = min(bisect_left(self._chunk_max, ts), len(self._chunks) - 1)
+            cols = {k: list(v) for k, v in _decode_chunk(self._chunks[ci]).items()}
+            i = bisect_right(cols["ts_us"], ts_us)
+            for k, v in row.items():
+                cols[k].insert(i, v)
+            ch = self._seal(cols)
+            self._chunks[ci] = ch
+            self._chunk_max[ci] = ch.max_ts
+            self._decoded = (-1, None)
+        else:
+            i = len(hts) if not hts or ts_us >= hts[-1] else bisect_right(hts, ts_us)
+            for k, v in row.items():
+                head[k].insert(i, v)
+            if len(hts) >= self.chunk_size:
+                ch = self._seal({k: list(v) for k, v in head.items()})
+                self._chunks.append(ch)
+                self._chunk_max.append(ch.max_ts)
+                self._head = self._empty_head()
+
+        self._size += 1
+        if ts >= self._newest_ts:
+            # newest sample: reuse its record, or build lazily on latest()
+            self._newest_ts = ts
+            self._last = record
+        return 0
+
+    def prune(self, cutoff: float) -> int:
+        self._low_water = max(self._low_water, cutoff)
+        n = bisect_left(self._chunk_max, cutoff)
+        dropped = 0
+        if n:
+            dropped = sum(ch.count for ch in self._chunks[:n])
+            del self._chunks[:n]
+            del self._chunk_max[:n]
+            self._decoded = (-1, None)
+        if not self._chunks:
+            hts = self._head["ts_us"]
+            k = bisect_left(hts, int(round(cutoff * 1_000_000)))
+            if k:
+                for a in self._head.values():
+                    del a[:k]
+                dropped += k
+        self._size -= dropped
+        if not self._size:
+            self._last = None
+            self._newest_ts = -math.inf
+        return dropped
+
+    def provenance_ids(self) -> Set[int]:
+        out = set(self._head["prov"])
+        for ch in self._chunks:
+            out |= ch.pids
+        return out
+
+    def _cols_of(self, ch: _Chunk) -> Dict[str, list]:
+        key, cols = self._decoded
+        if key != id(ch) or cols is None:
+            cols = _decode_chunk(ch)
+            self._decoded = (id(ch), cols)
+        return cols
+
+    def _emit(self, cols, i: int, out: List[TelemetryRecord]) -> None:
+        out.append(record_of((
+            cols["ts_us"][i] / 1e6, self.sat_id,
+            cols["lat"][i], cols["lon"][i], cols["alt"][i],
+            cols["snr"][i], cols["rssi"][i], cols["loss"][i], cols["power"][i],
+            cols["modem"][i], cols["link"][i], cols["spoof"][i], cols["prov"][i],
+        )))
+
+    def latest(self) -> Optional[TelemetryRecord]:
+        if not self._size:
+            return None
+        if self._last is None:
+            out: List[TelemetryRecord] = []
+            if len(self._head["ts_us"]):
+                self._emit(self._head, len(self._head["ts_us"]) - 1, out)
+            else:
+                ch = self._chunks[-1]
+                self._emit(self._cols_of(ch), ch.count - 1, out)
+            self._last = out[0]
+        return self._last
+
+    def range(self, start: float, end: Optional[float] = None) -> List[TelemetryRecord]:
+        start = max(start, self._low_water)
+        # same rounding as on write, so a sample stamped exactly at start/end is included
+        lo_us = int(round(start * 1_000_000))
+        hi_us = None if end is None else int(round(end * 1_000_000))
+        out: List[TelemetryRecord] = []
+
+        ci = bisect_left(self._chunk_max, start)
+        for ch in self._chunks[ci:]:
+            if end is not None and ch.min_ts > end:
+                return out
+            cols = self._cols_of(ch)
+            ts = cols["ts_us"]
+            a = bisect_left(ts, lo_us)
+            b = len(ts) if hi_us is None else bisect_right(ts, hi_us)
+            for i in range(a, b):
+                self._emit(cols, i, out)
+
+        hts = self._head["ts_us"]
+        a = bisect_left(hts, lo_us)
+        b = len(hts) if hi_us is None else bisect_right(hts, hi_us)
+        for i in range(a, b):
+            self._emit(self._head, i, out)
+        return out
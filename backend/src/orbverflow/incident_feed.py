@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from orbverflow.incident_store import Incident, IncidentStore
+from orbverflow.playbook_store import PlaybookStore
+
+
+class IncidentFeed:
+    """
+    The GET /incidents/latest view, published by the detection cycle (simulator /
+    replay loop) and only read by HTTP clients, so polling never runs detection,
+    upserts incidents or proposes playbooks.
+
+    - publish() at the end of each cycle; refresh() when something else in the view
+      changed (a playbook approval)
+    - `version` goes up only when the view's content changes; the ETag is the version
+      plus a per-process tag, so a restart never answers 304 to an old ETag
+    - wait_for(version) parks a long-poll until the version moves past it (or timeout)
+    """
+
+    def __init__(self, incident_store: IncidentStore, playbook_store: PlaybookStore) -> None:
+        self.incident_store = incident_store
+        self.playbook_store = playbook_store
+        self.version = 0
+        self._tag = os.urandom(4).hex()
+        self._reason = "no detection cycle yet"
+        self._body: Dict[str, Any] = self._build(None, self._reason)
+        self._changed = asyncio.Event()
+
+        self.publishes = 0
+        self.reads = 0
+        self.not_modified = 0
+        self.waits = 0
+        self.wait_timeouts = 0
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._tag}-{self.version}"'
+
+    def _build(self, incident: Optional[Incident], reason: str) -> Dict[str, Any]:
+        # the last detected incident, else the one the store still holds
+        incident = incident or self.incident_store.latest()
+        if incident is None:
+            return {"ok": True, "has_incident": False, "incident": None, "playbooks": None, "reason": reason}
+        return {
+            "ok": True,
+            "has_incident": True,
+            "incident": incident.model_dump(),
+            "playbooks": [p.dict() for p in self.playbook_store.list_for_incident(incident.incident_id)],
+            "reason": reason,
+        }
+
+    def _set(self, body: Dict[str, Any]) -> bool:
+        if body == self._body:
+            return False
+        self._body = body
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        return True
+
+    def publish(self, incident: Optional[Incident], reason: str) -> bool:
+        """End of a detection cycle; True if the view changed."""
+        self.publishes += 1
+        self._reason = reason
+        return self._set(self._build(incident, reason))
+
+    def refresh(self) -> bool:
+        """Re-read the stores (same reason as the last cycle); True if the view changed."""
+        return self._set(self._build(None, self._reason))
+
+    def latest(self) -> Dict[str, Any]:
+        self.reads += 1
+        return {**self._body, "version": self.version}
+
+    async def wait_for(self, version: int, timeout: float) -> bool:
+        """
+        Wait while the view is still at `version`; False on timeout. Any other version
+        (older, or one a previous process handed out) returns at once.
+        """
+        if version != self.version:
+            return True
+        self.waits += 1
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.wait_timeouts += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "publishes": self.publishes,
+            "reads": self.reads,
+            "not_modified": self.not_modified,
+            "waits": self.waits,
+            "wait_timeouts": self.wait_timeouts,
+        }
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from orbverflow.dedup_index import DedupIndex
+from orbverflow.models import TelemetryRecord
+from orbverflow.state_store import TelemetryStateStore
+from orbverflow.telemetry_rows import TelemetryRow, check_records, check_rows
+
+
+# called after each store write with the records written (rows: latest record per sat)
+PostWriteHook = Callable[[List[TelemetryRecord]], Awaitable[None]]
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class _Item:
+    __slots__ = ("records", "rows")
+
+    def __init__(self, records: Optional[List[TelemetryRecord]] = None, rows: Optional[List[TelemetryRow]] = None) -> None:
+        self.records = records
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.records) if self.records is not None else len(self.rows or ())
+
+
+class IngestPipeline:
+    """
+    Staged ingest between producers and TelemetryStateStore.
+
+    - producers only enqueue: try_submit() (HTTP) fails fast when the queue is full so the
+      route can answer 429 + Retry-After; submit() (WS) waits for room, so the ack is
+      withheld until the batch is accepted
+    - both raise ValueError for a batch the store could not hold (check_rows), so the
+      producer hears about it instead of the batch failing later in the merged write
+    - one consumer task drains the bounded queue, merging queued batches into one store
+      write of up to max_batch_records (waiting up to linger_ms for more when the first
+      batch is small)
+    - post-write hooks (mission continuity, ...) run on the consumer after each write, so
+      a slow analytics step delays the queue, not the producers' acks
+    - if a merged write still fails, its batches are written one by one and only the
+      failing ones are dropped (counted in write_failures / records_failed)
+    - with a DedupIndex, records already ingested (same sat_id + timestamp) are dropped at
+      submit time and the count is returned to the producer; keys are only marked seen
+      once the batch is certain to be queued, and unmarked if its store write fails
+    """
+
+    def __init__(
+        self,
+        store: TelemetryStateStore,
+        max_queue_batches: int = 1024,
+        max_batch_records: int = 5000,
+        linger_ms: float = 0.0,
+        dedup: Optional[DedupIndex] = None,
+    ) -> None:
+        if max_queue_batches <= 0:
+            raise ValueError("max_queue_batches must be > 0")
+        self.store = store
+        self.max_queue_batches = max_queue_batches
+        self.max_batch_records = max_batch_records
+        self.linger_ms = linger_ms
+        self.dedup = dedup
+        self._queue: "asyncio.Queue[_Item]" = asyncio.Queue(maxsize=max_queue_batches)
+        self._hooks: List[PostWriteHook] = []
+        self._task: Optional[asyncio.Task] = None
+
+        self.queued_records = 0
+        self.batches_in = 0
+        self.records_in = 0
+        self.batches_rejected = 0
+        self.records_rejected = 0
+        self.duplicates = 0
+        self.store_writes = 0
+        self.records_written = 0
+        self.last_write_records = 0
+        self.max_write_records = 0
+        self.last_write_ms = 0.0
+        self.hook_errors = 0
+        self.batches_invalid = 0
+        self.write_failures = 0
+        self.records_failed = 0
+        self.last_write_error = ""
+        # records/sec drained by the consumer (EWMA), used for Retry-After
+        self._drain_rate = 0.0
+
+    def add_hook(self, hook: PostWriteHook) -> None:
+        self._hooks.append(hook)
+
+    def _check(self, item: _Item) -> None:
+        try:
+            if item.records is not None:
+                check_records(item.records)
+            else:
+                check_rows(item.rows or [])
+        except ValueError:
+            self.batches_invalid += 1
+            raise
+
+    def _accept(self, item: _Item) -> int:
+        """Drop already-ingested records from a queued item. Returns duplicates dropped."""
+        dups = 0
+        if self.dedup is not None:
+            if item.records is not None:
+                item.records, dups = self.dedup.filter_records(item.records)
+            else:
+                item.rows, dups = self.dedup.filter_rows(item.rows or [])
+        self.duplicates += dups
+        self.queued_records += len(item)
+        self.batches_in += 1
+        self.records_in += len(item)
+        return dups
+
+    def try_submit(
+        self, records: Optional[List[TelemetryRecord]] = None, rows: Optional[List[TelemetryRow]] = None
+    ) -> int:
+        """
+        Enqueue without waiting. Returns duplicates dropped; IngestQueueFull if there is
+        no room, ValueError if the batch cannot be stored.
+        """
+        item = _Item(records, rows)
+        self._check(item)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.batches_rejected += 1
+            self.records_rejected += len(item)
+            raise IngestQueueFull() from None
+        return self._accept(item)
+
+    async def submit(
+        self, records: Optional[List[TelemetryRecord]] = None, rows: Optional[List[TelemetryRow]] = None
+    ) -> int:
+        """Enqueue, waiting for room in the queue. Returns duplicates dropped; ValueError as try_submit."""
+        item = _Item(records, rows)
+        self._check(item)
+        await self._queue.put(item)
+        # put() returns as soon as the item is in, before the consumer can run,
+        # so filtering it here is still ahead of the store write
+        return self._accept(item)
+
+    def retry_after_sec(self) -> int:
+        """Rough time for the consumer to drain what is queued now (>= 1s)."""
+        if self._drain_rate <= 0.0:
+            return 1
+        return max(1, math.ceil(self.queued_records / self._drain_rate))
+
+    async def _collect(self) -> List[_Item]:
+        items = [await self._queue.get()]
+        n = len(items[0])
+        deadline = time.monotonic() + self.linger_ms / 1000.0
+        while n < self.max_batch_records:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            items.append(item)
+            n += len(item)
+        return items
+
+    async def _put(self, items: List[_Item]) -> List[TelemetryRecord]:
+        """One store write of same-kind items. Returns what the hooks see."""
+        if items[0].records is not None:
+            records = [r for it in items for r in it.records]
+            await self.store.add_records(records)
+            return records
+        latest = await self.store.add_rows([r for it in items for r in it.rows])
+        return list(latest.values())
+
+    async def _put_merged(self, items: List[_Item]) -> Tuple[int, List[TelemetryRecord]]:
+        """Write items in one go; if that fails, one by one so only the bad ones are lost."""
+        try:
+            return sum(map(len, items)), await self._put(items)
+        except Exception as e:
+            if len(items) == 1:
+                self._failed(items[0], e)
+                return 0, []
+        n = 0
+        written: List[TelemetryRecord] = []
+        for it in items:
+            try:
+                written.extend(await self._put([it]))
+            except Exception as e:
+                self._failed(it, e)
+            else:
+                n += len(it)
+        return n, written
+
+    def _failed(self, item: _Item, e: Exception) -> None:
+        self.write_failures += 1
+        self.records_failed += len(item)
+        self.last_write_error = f"{type(e).__name__}: {e}"
+        if self.dedup is not None:
+            # marked seen at submit; unmark so a retry of the batch is not a duplicate
+            if item.records is not None:
+                self.dedup.forget_records(item.records)
+            else:
+                self.dedup.forget_rows(item.rows or [])
+
+    async def _write(self, items: List[_Item]) -> None:
+        items = [it for it in items if len(it)]
+        if not items:
+            return  # everything was a duplicate
+        t0 = time.perf_counter()
+        n = 0
+        written: List[TelemetryRecord] = []
+        try:
+            for part in (
+                [it for it in items if it.records is not None],
+                [it for it in items if it.rows is not None],
+            ):
+                if part:
+                    k, w = await self._put_merged(part)
+                    n += k
+                    written.extend(w)
+        finally:
+            self.queued_records -= sum(map(len, items))
+        if not n:
+            return
+
+        dt = time.perf_counter() - t0
+        self.store_writes += 1
+        self.records_written += n
+        self.last_write_records = n
+        self.max_write_records = max(self.max_write_records, n)
+        self.last_write_ms = dt * 1000.0
+        if dt > 0:
+            rate = n / dt
+            self._drain_rate = rate if self._drain_rate == 0.0 else 0.8 * self._drain_rate + 0.2 * rate
+
+        for hook in self._hooks:
+            try:
+                await hook(written)
+            except Exception as e:
+                self.hook_errors += 1
+                print(f"[ingest] post-write hook failed: {e}")
+
+    async def run(self) -> None:
+        while True:
+            items = await self._collect()
+            try:
+                await self._write(items)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Wait until everything queued so far has been written (and hooks ran)."""
+        await self._queue.join()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_batches": self.max_queue_batches,
+            "queued_records": self.queued_records,
+            "batches_in": self.batches_in,
+            "records_in": self.records_in,
+            "batches_rejected": self.batches_rejected,
+            "records_rejected": self.records_rejected,
+            "duplicates": self.duplicates,
+            "store_writes": self.store_writes,
+            "records_written": self.records_written,
+            "avg_write_records": round(self.records_written / self.store_writes, 1) if self.store_writes else 0.0,
+            "last_write_records": self.last_write_records,
+            "max_write_records": self.max_write_records,
+            "last_write_ms": round(self.last_write_ms, 3),
+            "drain_rate_rps": round(self._drain_rate, 1),
+            "hook_errors": self.hook_errors,
+            "batches_invalid": self.batches_invalid,
+            "write_failures": self.write_failures,
+            "records_failed": self.records_failed,
+            "last_write_error": self.last_write_error,
+            "dedup": self.dedup.stats() if self.dedup is not None else None,
+        }
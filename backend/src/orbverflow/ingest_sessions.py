@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ProducerSession:
+    """Stream position of one producer (gateway) on the sequenced WS ingest protocol."""
+
+    __slots__ = ("producer_id", "last_seq", "connected", "last_seen", "frames", "records", "duplicates", "rejected")
+
+    def __init__(self, producer_id: str) -> None:
+        self.producer_id = producer_id
+        self.last_seq = 0          # highest seq accepted into the ingest pipeline
+        self.connected = False
+        self.last_seen = time.time()
+        self.frames = 0
+        self.records = 0
+        self.duplicates = 0        # frames re-sent after a reconnect (seq <= last_seq), dropped
+        self.rejected = 0          # frames that failed to decode/validate (seq consumed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "producer_id": self.producer_id,
+            "last_seq": self.last_seq,
+            "connected": self.connected,
+            "last_seen": self.last_seen,
+            "frames": self.frames,
+            "records": self.records,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+        }
+
+
+class IngestSessionRegistry:
+    """
+    In-memory producer_id -> ProducerSession, so a gateway that reconnects resumes after
+    the last sequence number the server accepted instead of re-sending (or losing) frames.
+
+    - window: frames a producer may have in flight beyond the last ack (credit)
+    - ack_every / ack_interval_ms: cumulative ack after N frames or T ms, whichever first
+    - bounded: idle (disconnected) sessions are evicted LRU beyond max_sessions
+    """
+
+    def __init__(
+        self,
+        window: int = 64,
+        ack_every: int = 16,
+        ack_interval_ms: float = 50.0,
+        max_sessions: int = 10_000,
+    ) -> None:
+        if window <= 0 or ack_every <= 0:
+            raise ValueError("window and ack_every must be > 0")
+        self.window = window
+        self.ack_every = min(ack_every, window)
+        self.ack_interval_ms = ack_interval_ms
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, ProducerSession]" = OrderedDict()
+
+    def open(self, producer_id: str) -> Optional[ProducerSession]:
+        """Attach a connection to producer_id. None if that producer is already connected."""
+        s = self._sessions.get(producer_id)
+        if s is None:
+            s = self._sessions[producer_id] = ProducerSession(producer_id)
+            self._evict()
+        elif s.connected:
+            return None
+        self._sessions.move_to_end(producer_id)
+        s.connected = True
+        s.last_seen = time.time()
+        return s
+
+    def close(self, s: ProducerSession) -> None:
+        s.connected = False
+        s.last_seen = time.time()
+
+    def get(self, producer_id: str) -> Optional[ProducerSession]:
+        return self._sessions.get(producer_id)
+
+    def _evict(self) -> None:
+        if len(self._sessions) <= self.max_sessions:
+            return
+        for pid in list(self._sessions.keys()):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if not self._sessions[pid].connected:
+                del self._sessions[pid]
+
+    def stats(self) -> Dict[str, Any]:
+        sessions = list(self._sessions.values())
+        return {
+            "window": self.window,
+            "ack_every": self.ack_every,
+            "ack_interval_ms": self.ack_interval_ms,
+            "producers": len(sessions),
+            "connected": sum(1 for s in sessions if s.connected),
+            "frames": sum(s.frames for s in sessions),
+            "duplicates": sum(s.duplicates for s in sessions),
+            "rejected": sum(s.rejected for s in sessions),
+        }
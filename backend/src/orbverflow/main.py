@@ -7,7 +7,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from orbverflow.app_state import hub, engine, store, prov_registry
+from orbverflow.app_state import hub, engine, store, prov_registry, retention_sweeper, ingest_pipeline
 from orbverflow.models import TelemetryBatch
 
 from orbverflow.routes.health import router as health_router
@@ -17,6 +17,7 @@ from orbverflow.routes.ingest import router as ingest_router, _maybe_trigger_mis
 from orbverflow.routes.state import router as state_router
 from orbverflow.routes.meta import router as meta_router
 from orbverflow.routes.airbus import router as airbus_router
+from orbverflow.routes.replay import router as replay_router
 from orbverflow.routes.clusters import router as clusters_router
 from orbverflow.routes.incidents import router as incidents_router, maybe_emit_jamming_events
 from orbverflow.routes.playbooks import router as playbooks_router
@@ -49,6 +50,7 @@ app.include_router(ingest_router)
 app.include_router(state_router)
 app.include_router(meta_router)
 app.include_router(airbus_router)
+app.include_router(replay_router)
 app.include_router(clusters_router)
 app.include_router(incidents_router)
 app.include_router(playbooks_router)
@@ -81,13 +83,14 @@ async def replay_loop():
     """
     For DISABLE_SIM=1 (Airbus / ingest-only mode):
     - periodically broadcast fleet_snapshot from store.latest_all()
+      (fed by /ingest, /airbus/load, or a pack streamed on its own clock via /replay/start)
     - periodically run maybe_emit_jamming_events so incident/playbooks/audit can still appear via WS
     """
     await asyncio.sleep(0.2)
 
     while True:
         try:
-            latest_snapshot = await store.latest_all()
+            version, latest_snapshot = await store.latest_versioned()
 
             # Make a fleet_snapshot from latest_snapshot values
             records = list(latest_snapshot.values()) if latest_snapshot else []
@@ -97,7 +100,7 @@ async def replay_loop():
                 await hub.broadcast_json(_to_fleet_snapshot(records))
 
             # WS-first: emit incident/playbook/audit even without simulator
-            await maybe_emit_jamming_events(latest_snapshot, now_ts=time.time())
+            await maybe_emit_jamming_events(latest_snapshot, now_ts=time.time(), version=version)
 
         except Exception as e:
             print(f"[replay_loop] failed: {e}")
@@ -124,8 +127,8 @@ async def simulator_loop():
         # WS-first: emit incident/playbook/audit (instead of relying on REST polling)
         # Demo hooks should never kill the simulator loop.
         try:
-            latest_snapshot = await store.latest_all()
-            await maybe_emit_jamming_events(latest_snapshot, now_ts=time.time())
+            version, latest_snapshot = await store.latest_versioned()
+            await maybe_emit_jamming_events(latest_snapshot, now_ts=time.time(), version=version)
         except Exception as e:
             print(f"[simulator] maybe_emit_jamming_events failed: {e}")
 
@@ -145,6 +148,16 @@ async def simulator_loop():
 
 @app.on_event("startup")
 async def on_startup():
+    # refill the window from the segment log (no-op when persistence is off); the
+    # replayed keys seed the dedup index so re-sent records are still dropped
+    t0 = time.time()
+    dedup = ingest_pipeline.dedup
+    replayed = await store.replay_log(on_rows=dedup.filter_rows if dedup is not None else None)
+    if replayed:
+        print(f"[startup] replayed {replayed} records from segment log in {time.time() - t0:.2f}s")
+
+    retention_sweeper.start()
+    ingest_pipeline.start()
     if os.getenv("DISABLE_SIM", "0") != "1":
         prov_registry.set_dataset(DEFAULT_SIM_META)
         asyncio.create_task(simulator_loop())
@@ -1,6 +1,8 @@
+import time
 from enum import Enum
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from orbverflow.timestamps import parse_timestamp
 
 
 class Scenario(str, Enum):
@@ -11,12 +13,177 @@ class Scenario(str, Enum):
 
 
 class Provenance(BaseModel):
+    # shared between records via ProvenanceInterner -> must never be mutated in place
+    model_config = ConfigDict(frozen=True)
+
     source_vendor: str = "SIM"
     source_dataset_id: str = "SIM_DEMO"
     source_file: str = "simulator"
     source_fields: List[str] = Field(default_factory=list)
     mapping_version: Optional[str] = None
 
+    def key(self) -> Tuple:
+        return (
+            self.source_vendor,
+            self.source_dataset_id,
+            self.source_file,
+            tuple(self.source_fields),
+            self.mapping_version,
+        )
+
+
+class ProvenanceTableFull(ValueError):
+    """More distinct Provenance values alive than ProvenanceInterner.max_entries."""
+
+
+class ProvenanceInterner:
+    """
+    Interning table for Provenance.
+
+    Provenance values barely change (one per simulator / pack file / producer), so records
+    share one immutable entry instead of carrying their own copy. Entries are also
+    addressable by a small int id (used by the columnar stores and the binary formats);
+    the full object is only expanded when a record is dumped at the API boundary.
+
+    - bounded: a new value past max_entries live entries raises ProvenanceTableFull
+      (rejected at ingest) instead of growing without limit
+    - ids are never reused (a stale id fails instead of naming another entry) and fit
+      the 32-bit id columns
+    - collect() releases entries no holder (the store, a loaded replay, ...) references
+      any more; pinned entries and ones used in the last min_age_sec are kept, which
+      covers rows still on their way to the store
+    """
+
+    MAX_ID = 0xFFFFFFFF  # array("I") columns, u32 in the binary formats
+
+    def __init__(self, max_entries: int = 4096, min_age_sec: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.min_age_sec = min_age_sec
+        self._entries: Dict[int, Provenance] = {}
+        self._by_key: Dict[Tuple, int] = {}
+        self._by_obj: Dict[int, int] = {}  # id(entry) -> pid, dropped with the entry
+        self._used: Dict[int, float] = {}  # pid -> last interned / looked up (monotonic)
+        self._pinned: Set[int] = set()
+        self._holders: List[Callable[[], Iterable[int]]] = []
+        self._next_id = 0
+        self.rejected = 0
+        self.released = 0
+        self.collections = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, pid: object) -> bool:
+        return pid in self._entries
+
+    def _touch(self, pid: int) -> int:
+        self._used[pid] = time.monotonic()
+        return pid
+
+    def _add(self, p: Provenance, key: Tuple) -> int:
+        if len(self._entries) >= self.max_entries or self._next_id > self.MAX_ID:
+            self.rejected += 1
+            raise ProvenanceTableFull(
+                f"provenance table full ({len(self._entries)} distinct values in use, "
+                f"max {self.max_entries})"
+            )
+        pid = self._next_id
+        self._next_id += 1
+        self._entries[pid] = p
+        self._by_key[key] = pid
+        self._by_obj[id(p)] = pid
+        return self._touch(pid)
+
+    def intern_id(self, p: Provenance) -> int:
+        pid = self._by_obj.get(id(p))
+        if pid is not None:
+            return pid
+        key = p.key()
+        pid = self._by_key.get(key)
+        if pid is None:
+            return self._add(p, key)
+        return self._touch(pid)
+
+    def peek_id(self, p: Provenance) -> Optional[int]:
+        """Id of p's entry, without adding one."""
+        pid = self._by_obj.get(id(p))
+        return pid if pid is not None else self._by_key.get(p.key())
+
+    def intern(self, p: Provenance) -> Provenance:
+        return self._entries[self.intern_id(p)]
+
+    def make(self, **fields: Any) -> Provenance:
+        """Shared entry for these field values (only constructs a Provenance on first sight)."""
+        base = Provenance.model_fields
+        key = tuple(
+            tuple(fields.get(k, ())) if k == "source_fields"
+            else fields.get(k, base[k].get_default(call_default_factory=True))
+            for k in ("source_vendor", "source_dataset_id", "source_file", "source_fields", "mapping_version")
+        )
+        pid = self._by_key.get(key)
+        if pid is not None:
+            return self._entries[self._touch(pid)]
+        return self.intern(Provenance(**fields))
+
+    def with_fields(self, base: Provenance, source_fields: List[str]) -> Provenance:
+        """Shared entry equal to base with source_fields replaced (per-row pack mapping)."""
+        k = base.key()
+        pid = self._by_key.get(k[:3] + (tuple(source_fields),) + k[4:])
+        if pid is not None:
+            return self._entries[self._touch(pid)]
+        return self.intern(base.model_copy(update={"source_fields": list(source_fields)}))
+
+    def get(self, pid: int) -> Provenance:
+        return self._entries[pid]
+
+    def pin(self, p: Provenance) -> Provenance:
+        """Shared entry that collect() never releases (defaults, the simulator's)."""
+        entry = self.intern(p)
+        self._pinned.add(self.intern_id(entry))
+        return entry
+
+    def add_holder(self, holder: Callable[[], Iterable[int]]) -> None:
+        """holder() -> ids still referenced outside the table (asked on every collect)."""
+        self._holders.append(holder)
+
+    def collect(self, now: Optional[float] = None) -> int:
+        """Release entries nothing references any more. Returns entries released."""
+        self.collections += 1
+        now = now if now is not None else time.monotonic()
+        live = set(self._pinned)
+        for holder in self._holders:
+            live.update(holder())
+        released = 0
+        for pid in [pid for pid in self._entries if pid not in live]:
+            if now - self._used.get(pid, 0.0) < self.min_age_sec:
+                continue
+            p = self._entries.pop(pid)
+            del self._by_key[p.key()]
+            del self._by_obj[id(p)]
+            self._used.pop(pid, None)
+            released += 1
+        self.released += released
+        return released
+
+    def maybe_collect(self) -> int:
+        """collect() once more than half the table is in use (holders can be costly to ask)."""
+        return self.collect() if len(self._entries) > self.max_entries // 2 else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "pinned": len(self._pinned),
+            "next_id": self._next_id,
+            "rejected": self.rejected,
+            "released": self.released,
+            "collections": self.collections,
+        }
+
+
+provenance_interner = ProvenanceInterner()
+DEFAULT_PROVENANCE = provenance_interner.pin(Provenance())
+
 
 class TelemetryRecord(BaseModel):
     timestamp: float
@@ -28,13 +195,26 @@ class TelemetryRecord(BaseModel):
     snr_db: float
     rssi_dbm: float
     packet_loss_pct: float
-    modem_reset_count: int = 0
+    modem_reset_count: int = Field(0, ge=-(1 << 31), lt=1 << 31)  # int32 column in the stores
     power_watt: Optional[float] = None
 
     link_state: str  # OK / DEGRADED / DOWN
     spoofing: bool = False
 
-    provenance: Provenance = Field(default_factory=Provenance)
+    provenance: Provenance = Field(default_factory=lambda: DEFAULT_PROVENANCE)
+
+    @field_validator("timestamp", mode="before")
+    @classmethod
+    def _decode_timestamp(cls, v: Any) -> Any:
+        # ISO strings (and numeric ones) through the shared, memoized decoder;
+        # numbers are left to the float field
+        return parse_timestamp(v) if isinstance(v, str) else v
+
+    @field_validator("provenance")
+    @classmethod
+    def _intern_provenance(cls, v: Provenance) -> Provenance:
+        # swap the per-record copy (e.g. parsed from JSON) for the shared entry
+        return provenance_interner.intern(v)
 
 
 class TelemetryBatch(BaseModel):
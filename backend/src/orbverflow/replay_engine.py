@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from orbverflow.ingest_pipeline import IngestPipeline
+from orbverflow.telemetry_rows import PROV, TS, TelemetryRow
+
+
+class ReplayStateError(Exception):
+    pass
+
+
+class ReplayEngine:
+    """
+    Streams a recorded pack through the ingest pipeline on a replay clock.
+
+    - speed 1.0 = real time, N = N x, 0 = as fast as the pipeline takes it
+    - rows go out in timestamp order once the replay clock reaches them, one pipeline
+      submit per tick; submit() waits for queue room, so a slow store slows the replay
+      down (reported as lag_sec) instead of dropping rows
+    - rebase_timestamps re-stamps rows onto the wall clock
+      (wall = anchor_wall + (ts - anchor_pack) / speed; at speed 0 the pack is shifted
+      to end now), so the store window, dedup and detection see a live feed; pause,
+      resume, seek and speed changes re-anchor the clock
+    - one replay at a time: start() replaces the running one
+    """
+
+    def __init__(self, pipeline: IngestPipeline, tick_ms: float = 50.0, max_batch_rows: int = 5000) -> None:
+        self.pipeline = pipeline
+        self.tick_ms = tick_ms
+        self.max_batch_rows = max_batch_rows
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.state = "idle"  # idle | loading | playing | paused | finished | stopped | failed
+        self.source: Optional[str] = None
+        self.speed = 1.0
+        self.loop = False
+        self.rebase = True
+        self.error: Optional[str] = None
+
+        self._rows: List[TelemetryRow] = []
+        self._pids: Set[int] = set()  # provenance ids of the loaded rows
+        self._ts: List[float] = []
+        self._pos = 0
+        self._start_offset = 0.0
+        self._paused = False
+        self._position = 0.0  # pack time reached
+        self._anchor_pack = 0.0
+        self._anchor_wall = 0.0
+        self._shift = 0.0     # speed 0 rebasing
+
+        self.rows_sent = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.loops = 0
+        self.lag_sec = 0.0
+        self.started_at: Optional[float] = None
+        self._play_sec = 0.0
+        self._play_since: Optional[float] = None
+
+    # --- clock ---------------------------------------------------------------------
+
+    @property
+    def pack_start(self) -> float:
+        return self._ts[0] if self._ts else 0.0
+
+    @property
+    def pack_end(self) -> float:
+        return self._ts[-1] if self._ts else 0.0
+
+    def _anchor(self) -> None:
+        now = time.time()
+        self._anchor_pack = self._position
+        self._anchor_wall = now
+        self._shift = now - self.pack_end
+
+    def _pack_time(self, now: float) -> float:
+        return self._anchor_pack + (now - self._anchor_wall) * self.speed
+
+    def _rebased(self, ts: float) -> float:
+        if self.speed > 0:
+            return self._anchor_wall + (ts - self._anchor_pack) / self.speed
+        return ts + self._shift
+
+    def _changed(self) -> None:
+        self._anchor()
+        self._wake.set()
+
+    def _playing(self, on: bool) -> None:
+        now = time.monotonic()
+        if self._play_since is not None:
+            self._play_sec += now - self._play_since
+        self._play_since = now if on else None
+
+    # --- control -------------------------------------------------------------------
+
+    def start(
+        self,
+        load: Callable[[], List[TelemetryRow]],
+        source: str,
+        speed: float = 1.0,
+        start_offset_sec: float = 0.0,
+        loop: bool = False,
+        rebase_timestamps: bool = True,
+        paused: bool = False,
+    ) -> None:
+        """Replay the rows returned by load() (blocking; runs in a worker thread)."""
+        if speed < 0:
+            raise ValueError("speed must be >= 0 (0 = as fast as possible)")
+        self.stop()
+        self._reset()
+        self.source = source
+        self.speed = speed
+        self.loop = loop
+        self.rebase = rebase_timestamps
+        self._start_offset = max(0.0, start_offset_sec)
+        self._paused = paused
+        self.started_at = time.time()
+        self._task = asyncio.create_task(self._run(load))
+
+    def _require(self, *states: str) -> None:
+        if self.state not in states:
+            raise ReplayStateError(f"replay is {self.state}")
+
+    def pause(self) -> None:
+        self._require("playing", "paused", "loading")
+        self._paused = True
+        if self.state == "playing":
+            self.state = "paused"
+            self._playing(False)
+            self._wake.set()
+
+    def resume(self) -> None:
+        self._require("playing", "paused", "loading", "finished")
+        self._paused = False
+        if self.state in ("paused", "finished"):
+            if self._pos >= len(self._rows):  # resume after the end = play again
+                self._seek_to(self.pack_start)
+            self.state = "playing"
+            self._playing(True)
+            self._changed()
+
+    def seek(self, offset_sec: float) -> None:
+        """Jump to pack_start + offset_sec (clamped to the pack)."""
+        if self.state == "loading":
+            self._start_offset = max(0.0, offset_sec)
+            return
+        self._require("playing", "paused", "finished")
+        self._seek_to(self.pack_start + offset_sec)
+        if self.state == "finished":
+            self.state = "paused"
+        self._changed()
+
+    def set_speed(self, speed: float) -> None:
+        if speed < 0:
+            raise ValueError("speed must be >= 0 (0 = as fast as possible)")
+        self.speed = speed
+        if self.state in ("playing", "paused"):
+            self._changed()
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            self.state = "stopped"
+            self._playing(False)
+        self._task = None
+
+    def _seek_to(self, pack_ts: float) -> None:
+        pack_ts = min(max(pack_ts, self.pack_start), self.pack_end)
+        self._pos = bisect_left(self._ts, pack_ts)
+        self._position = pack_ts
+        self.lag_sec = 0.0
+
+    # --- loop ----------------------------------------------------------------------
+
+    async def _run(self, load: Callable[[], List[TelemetryRow]]) -> None:
+        try:
+            self.state = "loading"
+
+            def prepare() -> List[TelemetryRow]:
+                rows = load()
+                rows.sort(key=itemgetter(TS))
+                return rows
+
+            self._rows = await asyncio.to_thread(prepare)
+            self._ts = [r[TS] for r in self._rows]
+            self._pids = {r[PROV] for r in self._rows}
+            self._seek_to(self.pack_start + self._start_offset)
+            self._anchor()
+            self.state = "paused" if self._paused else "playing"
+            self._playing(not self._paused)
+            await self._play()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            self._playing(False)
+            print(f"[replay] {self.source} failed: {self.error}")
+
+    async def _wait(self, timeout: Optional[float]) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _play(self) -> None:
+        rows, ts = self._rows, self._ts
+        tick = self.tick_ms / 1000.0
+        while True:
+            self._wake.clear()
+            if self.state != "playing":
+                await self._wait(None)
+                continue
+            if self._pos >= len(rows):
+                if self.loop and rows:
+                    self.loops += 1
+                    self._seek_to(self.pack_start)
+                    self._anchor()
+                    continue
+                self.state = "finished"
+                self._playing(False)
+                await self._wait(None)  # resume / seek can restart it
+                continue
+
+            pos = self._pos
+            limit = min(len(rows), pos + self.max_batch_rows)
+            if self.speed > 0:
+                now = time.time()
+                target = min(self._pack_time(now), self.pack_end)
+                end = bisect_right(ts, target, pos, limit)
+                if end == pos:
+                    # nothing due yet: sleep until the next row is, at most one tick
+                    self._position = max(self._position, target)
+                    self.lag_sec = 0.0
+                    due = self._anchor_wall + (ts[pos] - self._anchor_pack) / self.speed
+                    await self._wait(min(max(due - now, 0.0), tick))
+                    continue
+                self._position = max(self._position, target if end < limit else ts[end - 1])
+                self.lag_sec = max(0.0, target - ts[end - 1]) if end == limit else 0.0
+            else:
+                end = limit
+                self._position = ts[end - 1]
+
+            batch = rows[pos:end]
+            if self.rebase:
+                rebased = self._rebased
+                batch = [(rebased(r[TS]), *r[1:]) for r in batch]
+            self._pos = end
+            self.duplicates += await self.pipeline.submit(rows=batch)
+            self.rows_sent += len(batch)
+            self.batches += 1
+            if self.speed == 0:
+                await asyncio.sleep(0)
+
+    def provenance_ids(self) -> Set[int]:
+        """Provenance ids the loaded pack still has to send (ProvenanceInterner holder)."""
+        return self._pids
+
+    def status(self) -> Dict[str, Any]:
+        total = len(self._rows)
+        duration = self.pack_end - self.pack_start
+        play_sec = self._play_sec + (time.monotonic() - self._play_since if self._play_since is not None else 0.0)
+        return {
+            "state": self.state,
+            "source": self.source,
+            "speed": self.speed,
+            "loop": self.loop,
+            "rebase_timestamps": self.rebase,
+            "rows_total": total,
+            "rows_sent": self.rows_sent,
+            "duplicates": self.duplicates,
+            "batches": self.batches,
+            "loops": self.loops,
+            "pack_start": self.pack_start if total else None,
+            "pack_end": self.pack_end if total else None,
+            "position": self._position if total else None,
+            "position_sec": round(self._position - self.pack_start, 3) if total else 0.0,
+            "duration_sec": round(duration, 3),
+            "pct": round(100.0 * self._pos / total, 1) if total else 0.0,
+            "lag_sec": round(self.lag_sec, 3),
+            "rows_per_sec": round(self.rows_sent / play_sec, 1) if play_sec > 0 else 0.0,
+            "started_at": self.started_at,
+            "error": self.error,
+        }
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from orbverflow.models import provenance_interner
+from orbverflow.state_store import TelemetryStateStore
+
+
+class RetentionSweeper:
+    """
+    Background retention task for TelemetryStateStore.
+
+    Every interval_sec it walks all sats in slices (yielding to the event loop between
+    slices), evicting expired records and dropping sats that stopped reporting. It then
+    enforces the store's max_total_records budget (LRU by last write) and applies
+    the rollup tiers' retention, and lets ProvenanceInterner release entries no
+    longer referenced.
+    The slice size tracks slice_budget_ms and carries over between passes: halved
+    (down to 16) after a slice over budget, doubled (up to sats_per_slice) after one
+    under half of it.
+    Counters live on the store and are published via GET /state/stats.
+    """
+
+    def __init__(
+        self,
+        store: TelemetryStateStore,
+        interval_sec: float = 5.0,
+        sats_per_slice: int = 256,
+        slice_budget_ms: float = 5.0,
+    ) -> None:
+        self.store = store
+        self.interval_sec = interval_sec
+        self.sats_per_slice = sats_per_slice
+        self.slice_budget_ms = slice_budget_ms
+        self._slice = sats_per_slice  # current (adaptive) slice size
+
+        self.passes = 0
+        self.slices = 0
+        self.last_pass_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep_once(self, now: Optional[float] = None) -> int:
+        """One full pass over the store, in bounded slices."""
+        t0 = time.perf_counter()
+        now = now if now is not None else time.time()
+        total_sats = max(1, self.store.tracked_sats())
+        evicted = 0
+        done = 0
+        while done < total_sats:
+            per_slice = self._slice
+            s0 = time.perf_counter()
+            evicted += await self.store.sweep_slice(max_sats=per_slice, now=now)
+            self.slices += 1
+            done += per_slice
+
+            # adapt slice size so one slice stays within the time budget
+            spent_ms = (time.perf_counter() - s0) * 1000.0
+            if spent_ms > self.slice_budget_ms:
+                self._slice = max(min(16, self.sats_per_slice), per_slice // 2)
+            elif spent_ms < self.slice_budget_ms / 2:
+                self._slice = min(self.sats_per_slice, per_slice * 2)
+            await asyncio.sleep(0)
+
+        evicted += await self.store.enforce_budget()
+        self.store.prune_rollups(now)
+        provenance_interner.maybe_collect()
+        self.passes += 1
+        self.last_pass_ms = (time.perf_counter() - t0) * 1000.0
+        return evicted
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                print(f"[retention] sweep failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_sec": self.interval_sec,
+            "sats_per_slice": self.sats_per_slice,
+            "slice_size": self._slice,
+            "passes": self.passes,
+            "slices": self.slices,
+            "last_pass_ms": round(self.last_pass_ms, 3),
+        }
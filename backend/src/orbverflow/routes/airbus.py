@@ -1,19 +1,98 @@
-from fastapi import APIRouter
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
-from orbverflow.app_state import store, prov_registry
+from orbverflow.app_state import store, prov_registry, dedup_index, hub, pack_load_jobs, pack_cache
 from orbverflow.provenance_registry import DatasetMeta
-from orbverflow.airbus.pack_loader import load_airbus_pack
+from orbverflow.airbus.load_jobs import PackLoadJob
+from orbverflow.airbus.pack_loader import iter_airbus_pack_rows
 
 router = APIRouter(prefix="/airbus", tags=["airbus"])
 
+# WS progress events at most this often per job (plus one when the job ends)
+_PROGRESS_EVERY_SEC = 0.5
+
+
 class LoadRequest(BaseModel):
     pack_dir: str
     mapping_path: Optional[str] = None
     source_vendor: str = "AIRBUS"
     source_dataset_id: str = "AIRBUS_PACK_DEMO"
     mapping_version: str = "v0.1"
-    meta_only: bool = False 
+    meta_only: bool = False
+    batch_size: int = 5000       # records per store write
+    workers: Optional[int] = None  # parser processes for sharded packs (default: one per CPU)
+    use_cache: bool = True       # reuse / fill the parsed-pack cache
+    background: bool = False     # return a job_id right away; follow via /airbus/load/progress or WS
+
+
+async def _broadcast_progress(job: PackLoadJob) -> None:
+    try:
+        await hub.broadcast_json({"type": "airbus_load_progress", **job.as_dict()})
+    except Exception:
+        return
+
+
+async def _run_load(job: PackLoadJob, req: LoadRequest) -> None:
+    """
+    Pull batches from the streaming loader in a worker thread (parsing never blocks the
+    event loop) and write each one to the store before asking for the next, so at most
+    one batch is in memory.
+    """
+    batches = iter_airbus_pack_rows(
+        pack_dir=req.pack_dir,
+        mapping_path=req.mapping_path,
+        source_vendor=req.source_vendor,
+        source_dataset_id=req.source_dataset_id,
+        mapping_version=req.mapping_version,
+        batch_size=req.batch_size,
+        progress=job.progress,
+        workers=req.workers,
+        cache=pack_cache if req.use_cache else None,
+    )
+    last_report = 0.0
+    try:
+        while True:
+            rows = await asyncio.to_thread(next, batches, None)
+            if rows is None:
+                break
+            # reloading the same pack must not double its records in the window
+            if dedup_index is not None:
+                rows, dups = dedup_index.filter_rows(rows)
+                job.duplicates += dups
+            if rows:
+                await store.add_rows(rows)
+            job.ingested += len(rows)
+            job.batches += 1
+
+            if time.monotonic() - last_report >= _PROGRESS_EVERY_SEC:
+                last_report = time.monotonic()
+                await _broadcast_progress(job)
+    except Exception as e:
+        job.finish(error=f"{type(e).__name__}: {e}")
+        await _broadcast_progress(job)
+        raise
+
+    job.finish()
+    prov_registry.set_dataset(
+        DatasetMeta(
+            source_vendor=req.source_vendor,
+            source_dataset_id=req.source_dataset_id,
+            mapping_version=req.mapping_version,
+            files=job.progress.files,
+        )
+    )
+    await _broadcast_progress(job)
+
+
+async def _run_load_background(job: PackLoadJob, req: LoadRequest) -> None:
+    try:
+        await _run_load(job, req)
+    except Exception as e:
+        print(f"[airbus] pack load {job.job_id} failed: {e}")
+
 
 @router.post("/load")
 async def load_pack(req: LoadRequest):
@@ -37,24 +116,52 @@ async def load_pack(req: LoadRequest):
             "dataset": prov_registry.get_dataset(),
         }
 
-    # --- Normal ingest mode ---
-    records, files = load_airbus_pack(
-        pack_dir=req.pack_dir,
-        mapping_path=req.mapping_path,
-        source_vendor=req.source_vendor,
-        source_dataset_id=req.source_dataset_id,
-        mapping_version=req.mapping_version,
-    )
+    # --- Normal ingest mode (streamed in batches) ---
+    job = pack_load_jobs.create(req.pack_dir)
+    if req.background:
+        asyncio.create_task(_run_load_background(job, req))
+        return {"ok": True, "mode": "background", "job_id": job.job_id}
 
-    prov_registry.set_dataset(
-        DatasetMeta(
-            source_vendor=req.source_vendor,
-            source_dataset_id=req.source_dataset_id,
-            mapping_version=req.mapping_version,
-            files=files,
-        )
-    )
+    await _run_load(job, req)
+
+    return {
+        "ok": True,
+        "ingested": job.ingested,
+        "duplicates": job.duplicates,
+        "files": job.progress.files,
+        "job_id": job.job_id,
+    }
+
+
+@router.get("/load/progress")
+async def load_progress(job_id: Optional[str] = None):
+    """Progress of one pack load (default: the most recent one)."""
+    job = pack_load_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="no such load job")
+    return {"ok": True, **job.as_dict()}
+
+
+@router.get("/load/jobs")
+async def load_jobs():
+    return {"ok": True, "jobs": pack_load_jobs.list()}
+
+
+class CacheInvalidateRequest(BaseModel):
+    pack_dir: Optional[str] = None  # None = the whole cache
+
+
+@router.get("/cache")
+async def cache_stats():
+    if pack_cache is None:
+        return {"ok": True, "enabled": False}
+    return {"ok": True, "enabled": True, **pack_cache.stats()}
 
-    await store.add_records(records)
 
-    return {"ok": True, "ingested": len(records), "files": files}
+@router.post("/cache/invalidate")
+async def cache_invalidate(req: CacheInvalidateRequest):
+    """Drop cached parses (of one pack, or all); the next load re-reads the source files."""
+    if pack_cache is None:
+        return {"ok": True, "enabled": False, "removed": 0}
+    removed = await asyncio.to_thread(pack_cache.invalidate, req.pack_dir)
+    return {"ok": True, "enabled": True, "removed": removed}
@@ -6,6 +6,6 @@ router = APIRouter(prefix="/clusters", tags=["clusters"])
 
 @router.get("/suggest")
 async def suggest_clusters():
-    latest = await store.latest_all()
-    resp = cluster_engine.suggest_clusters(latest)
+    version, latest = await store.latest_versioned()
+    resp = cluster_engine.suggest_clusters(latest, version=version)
     return resp.model_dump()
@@ -5,15 +5,15 @@ import time
 from dataclasses import asdict, is_dataclass
 from typing import Any, Dict, Optional, Tuple
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Query, Response
+from fastapi.responses import JSONResponse
 
 from orbverflow.app_state import (
     audit_store,
     hub,
-    incident_store,
+    incident_feed,
     jamming_engine,
     playbook_engine,
-    store,
     engine
 )
 
@@ -34,35 +34,41 @@ def _as_dict(x: Any) -> Dict[str, Any]:
         return x.dict()
     return {"value": x}
 
-@router.get("/latest")
-async def latest_incident():
-    latest = await store.latest_all()
-    incident, reason = jamming_engine.detect_and_triangulate(latest)
 
-    playbooks = []
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
 
-    if incident:
-        playbooks = playbook_engine.propose_for_incident(incident)
 
-    if incident is None:
-        existing = incident_store.latest()
-        if existing is None:
-            return {"ok": True, "has_incident": False, "incident": None, "playbooks": None, "reason": reason}
-        return {
-            "ok": True,
-            "has_incident": True,
-            "incident": existing.model_dump(),
-            "playbooks": [p.dict() for p in playbooks],
-            "reason": reason,
-        }
-
-    return {
-        "ok": True,
-        "has_incident": True,
-        "incident": incident.model_dump(),
-        "playbooks": [p.dict() for p in playbooks],
-        "reason": reason,
-    }
+@router.get("/latest")
+async def latest_incident(
+    wait_for_version: Optional[int] = Query(
+        None, ge=0, description="long-poll: hold the request while the view is still at this version"
+    ),
+    timeout: float = Query(25.0, ge=0, le=60, description="long-poll limit (seconds)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    The incident view of the last detection cycle (simulator / replay loop): reading it
+    never runs detection, upserts incidents or proposes playbooks.
+
+    - `version` in the body and the ETag change only when the view does;
+      If-None-Match with the current ETag gets 304
+    - wait_for_version=<version> waits (up to timeout) for the next change first
+    """
+    if wait_for_version is not None:
+        await incident_feed.wait_for(wait_for_version, timeout)
+    etag = incident_feed.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        incident_feed.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(incident_feed.latest(), headers=headers)
 
 
 def _audit_to_dict(evt: Any) -> Dict[str, Any]:
@@ -136,16 +142,26 @@ def _audit_to_dict(evt: Any) -> Dict[str, Any]:
 
 #         _last_jamming_incident_id = inc_id
 
-async def maybe_emit_jamming_events(latest_snapshot, now_ts: Optional[float] = None) -> None:
+async def maybe_emit_jamming_events(
+    latest_snapshot, now_ts: Optional[float] = None, version: Optional[int] = None
+) -> None:
     """
     WS-first:
-    - detect jamming every tick
+    - detect jamming every tick (memoized per store snapshot version)
     - only propose/broadcast playbooks + audit when we see a NEW incident_id
       (prevents duplicate PB spam when incident is "updated" repeatedly)
+    - then publish the cycle's result to incident_feed (GET /incidents/latest)
     """
+    incident, detect_reason = jamming_engine.detect_and_triangulate(latest_snapshot, now_ts=now_ts, version=version)
+    try:
+        await _emit_jamming_events(incident, detect_reason, now_ts)
+    finally:
+        incident_feed.publish(incident, str(detect_reason))
+
+
+async def _emit_jamming_events(incident, detect_reason, now_ts: Optional[float]) -> None:
     global _last_jamming_incident_id, _last_jamming_emit_ts
 
-    incident, detect_reason = jamming_engine.detect_and_triangulate(latest_snapshot, now_ts=now_ts)
     if not incident:
         return
 
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
-from typing import List, Union
+from typing import Any, Dict, List, Union
 from dataclasses import asdict
 import asyncio
 import inspect
+import json
+import struct
 
-from orbverflow.models import TelemetryRecord, TelemetryBatch
+from orbverflow.models import Provenance, ProvenanceTableFull, TelemetryRecord, TelemetryBatch, provenance_interner
+from orbverflow.binary_ingest import BinaryFormatError, decode_rows
+from orbverflow.ingest_pipeline import IngestQueueFull
 from orbverflow.app_state import (
-    store,
+    ingest_pipeline,
+    ingest_sessions,
     hub,
     audit_store,
     mission_orchestrator,
@@ -22,6 +27,7 @@ router = APIRouter(prefix="/ingest", tags=["ingest"])
 class IngestResponse(BaseModel):
     ok: bool = True
     ingested: int
+    duplicates: int = 0  # records dropped as already ingested (same sat_id + timestamp)
 
 
 async def _safe_broadcast(payload: dict) -> None:
@@ -92,28 +98,201 @@ async def _maybe_trigger_mission_continuity(records: List[TelemetryRecord]) -> N
             break
 
 
+# mission continuity runs on the pipeline consumer, after the store write
+ingest_pipeline.add_hook(_maybe_trigger_mission_continuity)
+
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="ingest queue full, retry later",
+        headers={"Retry-After": str(ingest_pipeline.retry_after_sec())},
+    )
+
+
 @router.post("/telemetry", response_model=IngestResponse)
 async def ingest_telemetry(payload: Union[TelemetryBatch, List[TelemetryRecord]]):
     # allow either batch or list of records
     records = payload.records if isinstance(payload, TelemetryBatch) else payload
 
-    await store.add_records(records)
-    await _maybe_trigger_mission_continuity(records)
+    # accepted = queued; the store write and hooks happen on the pipeline consumer
+    try:
+        dups = ingest_pipeline.try_submit(records=records)
+    except IngestQueueFull:
+        raise _queue_full()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return IngestResponse(ingested=len(records) - dups, duplicates=dups)
+
+
+@router.post("/telemetry/bin", response_model=IngestResponse)
+async def ingest_telemetry_bin(request: Request):
+    """
+    Bulk binary ingest (format: orbverflow.binary_ingest, Content-Type application/octet-stream).
+    Rows go straight into the store; mission hooks see the latest record per sat of the batch.
+    """
+    body = await request.body()
+    try:
+        rows = decode_rows(body)
+    except BinaryFormatError as e:
+        raise HTTPException(status_code=400, detail=f"bad telemetry payload: {e}")
+
+    try:
+        dups = ingest_pipeline.try_submit(rows=rows)
+    except IngestQueueFull:
+        raise _queue_full()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return IngestResponse(ingested=len(rows) - dups, duplicates=dups)
+
+
+@router.post("/provenance")
+async def register_provenance(p: Provenance):
+    """Register a Provenance once and get the id binary payloads refer to."""
+    try:
+        return {"ok": True, "provenance_id": provenance_interner.intern_id(p)}
+    except ProvenanceTableFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# binary frame on the sequenced protocol = seq (u64 LE) + binary_ingest payload
+_FRAME_SEQ = struct.Struct("<Q")
+
 
-    return IngestResponse(ingested=len(records))
+async def _sequenced_ingest(ws: WebSocket, hello: Dict[str, Any]) -> None:
+    """
+    Sequenced, pipelined ingest for one producer:
+    - server answers hello with {"type": "welcome", "last_seq", "credit", ...}; the producer
+      resumes at last_seq + 1 (nothing accepted before is re-ingested)
+    - frames carry seq = previous + 1, either JSON {"type": "batch", "seq", ...TelemetryBatch}
+      or binary (u64 seq + binary_ingest payload); seq must stay <= the last granted credit
+    - frames are handed to the ingest pipeline without waiting for the store write; the
+      server sends a cumulative {"type": "ack", "seq", "credit"} every ack_every frames or
+      ack_interval_ms, whichever comes first
+    - seq <= last_seq (a re-send) is dropped as duplicate; a gap gets an error naming the
+      expected seq; a frame that fails validation gets an error and its seq is consumed
+    """
+    producer_id = str(hello.get("producer_id") or "")
+    if not producer_id:
+        await ws.send_json({"type": "error", "detail": "hello needs a producer_id"})
+        await ws.close(code=1008)
+        return
+    session = ingest_sessions.open(producer_id)
+    if session is None:
+        await ws.send_json({"type": "error", "detail": f"producer {producer_id!r} already connected"})
+        await ws.close(code=1008)
+        return
+
+    window = ingest_sessions.window
+    send_lock = asyncio.Lock()
+    acked = session.last_seq
+
+    async def send(payload: Dict[str, Any]) -> None:
+        async with send_lock:
+            await ws.send_json(payload)
+
+    async def send_ack() -> None:
+        nonlocal acked
+        acked = session.last_seq
+        await send({"type": "ack", "seq": acked, "credit": acked + window})
+
+    async def ack_timer() -> None:
+        while True:
+            await asyncio.sleep(ingest_sessions.ack_interval_ms / 1000.0)
+            if session.last_seq > acked:
+                try:
+                    await send_ack()
+                except (WebSocketDisconnect, RuntimeError):
+                    return  # socket closed under us; the receive loop sees the disconnect
+
+    await send({
+        "type": "welcome",
+        "producer_id": producer_id,
+        "last_seq": session.last_seq,
+        "credit": session.last_seq + window,
+        "ack_every": ingest_sessions.ack_every,
+        "ack_interval_ms": ingest_sessions.ack_interval_ms,
+    })
+    timer = asyncio.create_task(ack_timer())
+    try:
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                break
+            raw = msg.get("bytes")
+            try:
+                if raw is not None:
+                    (seq,) = _FRAME_SEQ.unpack_from(raw, 0)
+                    frame: Any = memoryview(raw)[_FRAME_SEQ.size:]
+                else:
+                    frame = json.loads(msg.get("text") or "")
+                    seq = int(frame["seq"])
+            except (ValueError, KeyError, TypeError, struct.error):
+                await send({"type": "error", "detail": "frame without a sequence number"})
+                continue
+
+            if seq <= session.last_seq:
+                session.duplicates += 1
+                continue
+            if seq != session.last_seq + 1:
+                await send({"type": "error", "seq": seq, "detail": "sequence gap", "expected": session.last_seq + 1})
+                continue
+            if seq > acked + window:
+                await send({"type": "error", "seq": seq, "detail": "credit exceeded", "credit": acked + window})
+                await ws.close(code=1008)
+                break
+
+            try:
+                if raw is not None:
+                    rows = decode_rows(frame)
+                    n = len(rows) - await ingest_pipeline.submit(rows=rows)
+                else:
+                    batch = TelemetryBatch(**{k: v for k, v in frame.items() if k not in ("type", "seq")})
+                    n = len(batch.records) - await ingest_pipeline.submit(records=batch.records)
+            except (ValueError, TypeError) as e:  # BinaryFormatError, ValidationError, unstorable batch
+                session.rejected += 1
+                session.last_seq = seq
+                await send({"type": "error", "seq": seq, "detail": f"frame rejected: {e}"})
+                continue
+
+            session.last_seq = seq
+            session.frames += 1
+            session.records += n
+            if session.last_seq - acked >= ingest_sessions.ack_every:
+                await send_ack()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        timer.cancel()
+        ingest_sessions.close(session)
+        await asyncio.gather(timer, return_exceptions=True)
 
 
 @router.websocket("/ws/ingest")
 async def ws_ingest(ws: WebSocket):
+    """
+    The first frame picks the protocol:
+    - {"type": "hello", "producer_id": ...} -> sequenced, pipelined ingest (_sequenced_ingest)
+    - anything else -> legacy: every frame is a TelemetryBatch, acked one at a time; a batch
+      that fails validation gets {"ok": false, "detail"} and the socket stays open
+    """
     await ws.accept()
     try:
+        msg = await ws.receive_json()
+        if isinstance(msg, dict) and msg.get("type") == "hello":
+            await _sequenced_ingest(ws, msg)
+            return
         while True:
+            try:
+                batch = TelemetryBatch(**msg)
+                # backpressure: the ack is withheld until the queue has room for the batch
+                dups = await ingest_pipeline.submit(records=batch.records)
+            except (ValueError, TypeError) as e:
+                await ws.send_json({"ok": False, "detail": f"batch rejected: {e}"})
+            else:
+                await ws.send_json({"ok": True, "ingested": len(batch.records) - dups, "duplicates": dups})
             msg = await ws.receive_json()
-            batch = TelemetryBatch(**msg)
-
-            await store.add_records(batch.records)
-            await _maybe_trigger_mission_continuity(batch.records)
-
-            await ws.send_json({"ok": True, "ingested": len(batch.records)})
     except WebSocketDisconnect:
         return
@@ -6,7 +6,7 @@ from dataclasses import asdict, is_dataclass
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from orbverflow.app_state import audit_store, hub, playbook_engine
+from orbverflow.app_state import audit_store, hub, incident_feed, playbook_engine
 
 router = APIRouter(tags=["playbooks"])
 
@@ -31,6 +31,7 @@ async def approve_playbook(playbook_id: str, req: ApprovalReq):
         pb = playbook_engine.approve(playbook_id)
     except ValueError:
         raise HTTPException(404, "Playbook not found")
+    incident_feed.refresh()  # the approved state shows in GET /incidents/latest
 
     # WS: notify front-end
     await hub.broadcast_json(
@@ -0,0 +1,117 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from orbverflow.app_state import prov_registry, pack_cache, replay_engine
+from orbverflow.provenance_registry import DatasetMeta
+from orbverflow.airbus.pack_loader import LoadProgress, iter_airbus_pack_rows
+from orbverflow.replay_engine import ReplayStateError
+from orbverflow.telemetry_rows import TelemetryRow
+
+router = APIRouter(prefix="/replay", tags=["replay"])
+
+
+class ReplayStartRequest(BaseModel):
+    pack_dir: str
+    mapping_path: Optional[str] = None
+    source_vendor: str = "AIRBUS"
+    source_dataset_id: str = "AIRBUS_PACK_DEMO"
+    mapping_version: str = "v0.1"
+    speed: float = 1.0           # 1 = real time, N = N x, 0 = as fast as possible
+    start_offset_sec: float = 0.0
+    loop: bool = False
+    rebase_timestamps: bool = True  # re-stamp rows onto the wall clock (see ReplayEngine)
+    paused: bool = False         # load, then wait for /replay/resume
+    workers: Optional[int] = None
+    use_cache: bool = True
+
+
+class ReplaySeekRequest(BaseModel):
+    offset_sec: float            # from the first record of the pack
+
+
+class ReplaySpeedRequest(BaseModel):
+    speed: float
+
+
+def _control(fn, *args):
+    try:
+        fn(*args)
+    except ReplayStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "replay": replay_engine.status()}
+
+
+@router.post("/start")
+async def start_replay(req: ReplayStartRequest):
+    """
+    Load the pack (through the parsed-pack cache) off the event loop, then stream it
+    through the ingest pipeline. Returns right away; follow via GET /replay.
+    """
+    progress = LoadProgress()
+
+    def load() -> List[TelemetryRow]:
+        rows: List[TelemetryRow] = []
+        for batch in iter_airbus_pack_rows(
+            pack_dir=req.pack_dir,
+            mapping_path=req.mapping_path,
+            source_vendor=req.source_vendor,
+            source_dataset_id=req.source_dataset_id,
+            mapping_version=req.mapping_version,
+            progress=progress,
+            workers=req.workers,
+            cache=pack_cache if req.use_cache else None,
+        ):
+            rows.extend(batch)
+        prov_registry.set_dataset(
+            DatasetMeta(
+                source_vendor=req.source_vendor,
+                source_dataset_id=req.source_dataset_id,
+                mapping_version=req.mapping_version,
+                files=progress.files,
+            )
+        )
+        return rows
+
+    return _control(
+        replay_engine.start,
+        load,
+        req.pack_dir,
+        req.speed,
+        req.start_offset_sec,
+        req.loop,
+        req.rebase_timestamps,
+        req.paused,
+    )
+
+
+@router.get("")
+def replay_status():
+    return {"ok": True, "replay": replay_engine.status()}
+
+
+@router.post("/pause")
+def pause_replay():
+    return _control(replay_engine.pause)
+
+
+@router.post("/resume")
+def resume_replay():
+    return _control(replay_engine.resume)
+
+
+@router.post("/seek")
+def seek_replay(req: ReplaySeekRequest):
+    return _control(replay_engine.seek, req.offset_sec)
+
+
+@router.post("/speed")
+def set_replay_speed(req: ReplaySpeedRequest):
+    return _control(replay_engine.set_speed, req.speed)
+
+
+@router.post("/stop")
+def stop_replay():
+    return _control(replay_engine.stop)
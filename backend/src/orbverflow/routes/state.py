@@ -1,5 +1,11 @@
-from fastapi import APIRouter, Query
-from orbverflow.app_state import store
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from orbverflow.app_state import store, retention_sweeper, ingest_pipeline, ingest_sessions, pack_cache, replay_engine, cluster_engine, jamming_engine, incident_feed
+from orbverflow.trusted_sources import trusted_sources
+from orbverflow import timestamps
+from orbverflow.models import provenance_interner
 
 router = APIRouter(prefix="/state", tags=["state"])
 
@@ -16,13 +22,48 @@ async def get_latest_all():
 
 
 @router.get("/sat/{sat_id}")
-async def get_recent_sat(sat_id: str, minutes: int = Query(5, ge=1, le=60)):
-    records = await store.recent_sat(sat_id, minutes=minutes)
+async def get_recent_sat(
+    sat_id: str,
+    minutes: int = Query(5, ge=1, le=24 * 60),
+    start: Optional[float] = Query(None, description="epoch seconds; overrides minutes"),
+    end: Optional[float] = Query(None, description="epoch seconds; omit for open-ended"),
+):
+    """
+    Raw records while the span fits in the store window (10 min); longer spans are
+    served from the finest rollup tier that covers them (see `tier`).
+    """
+    if start is None:
+        start = (end if end is not None else time.time()) - minutes * 60
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must be >= start")
+
+    tier, items = await store.history_sat(sat_id, start=start, end=end)
     return {
         "ok": True,
         "sat_id": sat_id,
         "minutes": minutes,
-        "count": len(records),
-        "records": [r.model_dump() for r in records],
+        "start": start,
+        "end": end,
+        "tier": tier,
+        "count": len(items),
+        "records": [r.model_dump() for r in items] if tier == "raw" else items,
+    }
+
+
+@router.get("/stats")
+def get_store_stats():
+    return {
+        "ok": True,
+        **store.stats(),
+        "sweeper": retention_sweeper.stats(),
+        "ingest": ingest_pipeline.stats(),
+        "ingest_ws": ingest_sessions.stats(),
+        "trusted_sources": trusted_sources.stats(),
+        "airbus_pack_cache": pack_cache.stats() if pack_cache is not None else None,
+        "replay": replay_engine.status(),
+        "timestamps": timestamps.cache_stats(),
+        "provenance": provenance_interner.stats(),
+        "clusters": cluster_engine.stats(),
+        "jamming": jamming_engine.stats(),
+        "incident_feed": incident_feed.stats(),
     }
-    
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from orbverflow.models import Provenance, TelemetryRecord, provenance_interner
+from orbverflow.telemetry_rows import LINK_STATES, TelemetryRow, construct_record, row_of
+
+
+# --- on-disk format -----------------------------------------------------------
+# segment file  = MAGIC + VERSION(u16) + frames...
+# frame         = kind(u8) + payload_len(u32) + payload
+#   kind "S"    = string definition: id(u32) + utf-8 bytes   (sat_id / link_state / provenance json)
+#   kind "R"    = record block: count(u32) + count * RECORD
+# string ids are local to one segment, so every segment can be read on its own.
+MAGIC = b"OVSL"
+VERSION = 1
+_FILE_HEADER = struct.Struct("<4sH")
+_FRAME_HEADER = struct.Struct("<cI")
+_STRING_ID = struct.Struct("<I")
+_COUNT = struct.Struct("<I")
+# ts, lat, lon, alt, snr_db, rssi_dbm, packet_loss_pct, power_watt(NaN=None),
+# modem_reset_count, sat_id sid, link_state sid, provenance sid, spoofing
+RECORD = struct.Struct("<8diIIIB")
+
+_KIND_STRING = b"S"
+_KIND_RECORDS = b"R"
+
+
+def _prov_json(p: Provenance) -> str:
+    return json.dumps(p.model_dump(), sort_keys=True, separators=(",", ":"))
+
+
+class _SegmentWriter:
+    def __init__(self, path: str, started_at: float) -> None:
+        self.path = path
+        self.started_at = started_at
+        self._f: BinaryIO = open(path, "ab")
+        if self._f.tell() == 0:
+            self._f.write(_FILE_HEADER.pack(MAGIC, VERSION))
+        self._strings: Dict[str, int] = {}
+        self.size = self._f.tell()
+
+    def _sid(self, s: str, out: bytearray) -> int:
+        sid = self._strings.get(s)
+        if sid is None:
+            sid = len(self._strings)
+            self._strings[s] = sid
+            raw = s.encode("utf-8")
+            out += _FRAME_HEADER.pack(_KIND_STRING, _STRING_ID.size + len(raw))
+            out += _STRING_ID.pack(sid)
+            out += raw
+        return sid
+
+    def append(self, rows: List[TelemetryRow]) -> None:
+        out = bytearray()
+        body = bytearray(_COUNT.pack(len(rows)))
+        prov_cache: Dict[int, int] = {}
+        for (ts, sat_id, lat, lon, alt, snr, rssi, loss, power, modem, link, spoof, pid) in rows:
+            psid = prov_cache.get(pid)
+            if psid is None:
+                psid = prov_cache[pid] = self._sid(_prov_json(provenance_interner.get(pid)), out)
+            body += RECORD.pack(
+                ts, lat, lon, alt, snr, rssi, loss, power, modem,
+                self._sid(sat_id, out),
+                self._sid(LINK_STATES[link], out),
+                psid,
+                spoof,
+            )
+        out += _FRAME_HEADER.pack(_KIND_RECORDS, len(body))
+        out += body
+        # one write per batch
+        self._f.write(out)
+        self._f.flush()
+        self.size += len(out)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _read_segment(path: str, cutoff: float) -> Iterator[List[TelemetryRecord]]:
+    """Yield record blocks (ts >= cutoff) from one segment via mmap. Stops at a torn tail."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _FILE_HEADER.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version = _FILE_HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a telemetry segment: {path}")
+
+            strings: Dict[int, str] = {}
+            provs: Dict[int, Provenance] = {}
+            pos = _FILE_HEADER.size
+            end = len(mm)
+            while pos + _FRAME_HEADER.size <= end:
+                kind, length = _FRAME_HEADER.unpack_from(mm, pos)
+                pos += _FRAME_HEADER.size
+                if pos + length > end:
+                    break  # partial frame from a crash mid-write
+                if kind == _KIND_STRING:
+                    (sid,) = _STRING_ID.unpack_from(mm, pos)
+                    strings[sid] = mm[pos + _STRING_ID.size: pos + length].decode("utf-8")
+                elif kind == _KIND_RECORDS:
+                    block: List[TelemetryRecord] = []
+                    body = memoryview(mm)[pos + _COUNT.size: pos + length]
+                    try:
+                        for (ts, lat, lon, alt, snr, rssi, loss, power, modem,
+                             sat_sid, link_sid, prov_sid, spoof) in RECORD.iter_unpack(body):
+                            if ts < cutoff:
+                                continue
+                            prov = provs.get(prov_sid)
+                            if prov is None:
+                                prov = provs[prov_sid] = provenance_interner.make(**json.loads(strings[prov_sid]))
+                            # written from validated records -> construct without re-validating
+                            block.append(construct_record({
+                                "timestamp": ts, "sat_id": strings[sat_sid], "lat": lat, "lon": lon, "alt": alt,
+                                "snr_db": snr, "rssi_dbm": rssi, "packet_loss_pct": loss,
+                                "modem_reset_count": modem,
+                                "power_watt": None if math.isnan(power) else power,
+                                "link_state": strings[link_sid], "spoofing": bool(spoof),
+                                "provenance": prov,
+                            }))
+                    finally:
+                        body.release()
+                    if block:
+                        yield block
+                pos += length
+
+
+class TelemetrySegmentLog:
+    """
+    Optional append-only persistence under TelemetryStateStore.
+
+    - each add_records() / add_rows() batch is encoded to one binary frame and written with a single append
+    - segments roll over every segment_seconds (or max_segment_bytes)
+    - segments are deleted once everything in them is older than window_seconds
+    - replay() memory-maps the surviving segments and yields record blocks in write order
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        window_seconds: int = 600,
+        segment_seconds: int = 60,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.directory = directory
+        self.window_seconds = window_seconds
+        self.segment_seconds = segment_seconds
+        self.max_segment_bytes = max_segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._writer: Optional[_SegmentWriter] = None
+
+        self.bytes_written = 0
+        self.segments_expired = 0
+
+    def _segments(self) -> List[Tuple[float, str]]:
+        out: List[Tuple[float, str]] = []
+        for name in os.listdir(self.directory):
+            if name.startswith("seg-") and name.endswith(".tlog"):
+                try:
+                    started_ms = int(name[4:-5])
+                except ValueError:
+                    continue
+                out.append((started_ms / 1000.0, os.path.join(self.directory, name)))
+        out.sort()
+        return out
+
+    def _roll(self, now: float) -> _SegmentWriter:
+        if self._writer is not None:
+            self._writer.close()
+        path = os.path.join(self.directory, f"seg-{int(now * 1000):015d}.tlog")
+        self._writer = _SegmentWriter(path, started_at=now)
+        self.expire(now)
+        return self._writer
+
+    def append(self, records: List[TelemetryRecord], now: Optional[float] = None) -> None:
+        self.append_rows([row_of(r) for r in records], now)
+
+    def append_rows(self, rows: List[TelemetryRow], now: Optional[float] = None) -> None:
+        if not rows:
+            return
+        now = now if now is not None else time.time()
+        w = self._writer
+        if (
+            w is None
+            or now - w.started_at >= self.segment_seconds
+            or w.size >= self.max_segment_bytes
+        ):
+            w = self._roll(now)
+        before = w.size
+        w.append(rows)
+        self.bytes_written += w.size - before
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Delete segments whose successor started before the window cutoff."""
+        cutoff = (now if now is not None else time.time()) - self.window_seconds
+        segs = self._segments()
+        removed = 0
+        for (_, path), (next_start, _) in zip(segs, segs[1:]):
+            if next_start >= cutoff:
+                break
+            if self._writer is not None and path == self._writer.path:
+                break
+            os.remove(path)
+            removed += 1
+        self.segments_expired += removed
+        return removed
+
+    def replay(self, now: Optional[float] = None) -> Iterator[List[TelemetryRecord]]:
+        cutoff = (now if now is not None else time.time()) - self.window_seconds
+        for _, path in self._segments():
+            yield from _read_segment(path, cutoff)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def stats(self) -> Dict[str, Any]:
+        segs = self._segments()
+        return {
+            "directory": self.directory,
+            "segments": len(segs),
+            "bytes_on_disk": sum(os.path.getsize(p) for _, p in segs),
+            "bytes_written": self.bytes_written,
+            "segments_expired": self.segments_expired,
+        }
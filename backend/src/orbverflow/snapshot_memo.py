@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SnapshotMemo(Generic[T]):
+    """
+    One result per store snapshot version (StateStore.version).
+
+    - get(version, compute) runs compute() once per version; every other caller with
+      that version (API pollers, the simulator / replay loops) gets the same object back,
+      which they must treat as read-only
+    - only the newest version is kept: versions only go up, so an older one (a caller
+      that read the store before the last write) is computed but not cached
+    - version None = no snapshot version known: always computed, never cached
+    """
+
+    def __init__(self) -> None:
+        self._version: Optional[int] = None
+        self._value: Optional[T] = None
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def get(self, version: Optional[int], compute: Callable[[], T]) -> T:
+        if version is not None and version == self._version:
+            self.hits += 1
+            return self._value  # type: ignore[return-value]
+        value = compute()
+        if version is not None and (self._version is None or version > self._version):
+            self._version = version
+            self._value = value
+            self.misses += 1
+        else:
+            self.uncached += 1
+        return value
+
+    def clear(self) -> None:
+        self._version = None
+        self._value = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "uncached": self.uncached,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
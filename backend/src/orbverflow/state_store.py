@@ -2,49 +2,460 @@ from __future__ import annotations
 
 import time
 import asyncio
-from collections import deque
-from typing import Deque, Dict, List, Optional
+import zlib
+from array import array
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
-from orbverflow.models import TelemetryRecord
+from orbverflow.models import TelemetryRecord, provenance_interner
+from orbverflow.columnar_ring import SatRingBuffer
+from orbverflow.gorilla_series import GorillaSeries
+from orbverflow.telemetry_rollups import DEFAULT_ROLLUP_TIERS, RollupTier, TelemetryRollups
+from orbverflow.segment_log import TelemetrySegmentLog
+from orbverflow.telemetry_rows import SAT, TS, TelemetryRow, check_rows, record_of, row_of
+
+
+BACKENDS = ("deque", "columnar", "compressed")
+
+
+class _RecordSeries:
+    """
+    Default per-sat series: the TelemetryRecord objects as ingested, sorted by timestamp,
+    with a parallel array('d') of timestamps for bisect range lookups.
+    Expired records are skipped via a head offset and compacted in bulk.
+    """
+
+    _COMPACT_MIN = 256
+    # rough footprint of one TelemetryRecord with a shared Provenance (tracemalloc, sim record)
+    ROW_BYTES = 1400
+
+    def __init__(self, sat_id: str) -> None:
+        self.sat_id = sat_id
+        self._recs: List[TelemetryRecord] = []
+        self._ts = array("d")
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._recs) - self._head
+
+    def append(self, r: TelemetryRecord) -> int:
+        return self.append_row(row_of(r), record=r)
+
+    def append_row(self, row: TelemetryRow, record: Optional[TelemetryRecord] = None) -> int:
+        r = record if record is not None else record_of(row)
+        ts = row[TS]
+        if len(self._recs) == self._head or ts >= self._ts[-1]:
+            self._recs.append(r)
+            self._ts.append(ts)
+        else:
+            # rare out-of-order sample: insert at its sorted position
+            i = bisect_right(self._ts, ts, self._head)
+            self._recs.insert(i, r)
+            self._ts.insert(i, ts)
+        return 0
+
+    def prune(self, cutoff: float) -> int:
+        i = bisect_left(self._ts, cutoff, self._head)
+        dropped = i - self._head
+        self._head = i
+        if self._head >= self._COMPACT_MIN and self._head * 2 >= len(self._recs):
+            del self._recs[: self._head]
+            del self._ts[: self._head]
+            self._head = 0
+        return dropped
+
+    def latest(self) -> Optional[TelemetryRecord]:
+        return self._recs[-1] if len(self._recs) > self._head else None
+
+    def nbytes(self) -> int:
+        return len(self) * self.ROW_BYTES
+
+    def provenance_ids(self) -> Set[int]:
+        # records share a few Provenance objects: look each distinct one up once
+        distinct = {id(r.provenance): r.provenance for r in self._recs[self._head:]}
+        return {pid for pid in map(provenance_interner.peek_id, distinct.values()) if pid is not None}
+
+    def range(self, start: float, end: Optional[float] = None) -> List[TelemetryRecord]:
+        lo = bisect_left(self._ts, start, self._head)
+        hi = len(self._ts) if end is None else bisect_right(self._ts, end, lo)
+        return self._recs[lo:hi]
+
+
+Series = Union[_RecordSeries, SatRingBuffer, GorillaSeries]
+
+
+class _Shard:
+    """A slice of the sat_id space with its own lock."""
+
+    __slots__ = ("lock", "series", "lock_wait_s", "acquisitions")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.series: Dict[str, Series] = {}
+        self.lock_wait_s = 0.0
+        self.acquisitions = 0
+
+    async def acquire(self) -> None:
+        t0 = time.perf_counter()
+        await self.lock.acquire()
+        self.lock_wait_s += time.perf_counter() - t0
+        self.acquisitions += 1
 
 
 class TelemetryStateStore:
     """
     In-memory time-window store:
-    state_store = { "SatA": deque([TelemetryRecord...]), ... }
+    state_store = { "SatA": [TelemetryRecord...] (time-ordered), ... }
     Keep last window_seconds per sat.
+
+    backend="columnar" keeps one fixed-capacity SatRingBuffer (typed arrays) per sat
+    instead of the pydantic objects themselves; records are rebuilt on read only.
+    ring_capacity defaults to 2 samples/sec over the window.
+    backend="compressed" keeps Gorilla-style compressed chunks (GorillaSeries) for long
+    full-resolution windows (e.g. 24h); only the open head chunk is mutable.
+
+    History beyond the window:
+    - every ingested record also feeds TelemetryRollups (10s / 60s tiers by default,
+      min/max/mean/last per metric, each tier with its own retention); history_sat()
+      serves raw samples when the span fits in the window, otherwise the finest tier
+      that still reaches back far enough. rollup_tiers=() disables rollups.
+
+    Persistence (optional):
+    - with a TelemetrySegmentLog attached, every add_records() batch is also appended
+      to on-disk segments; replay_log() refills the window from them after a restart.
+
+    Bulk ingest:
+    - add_rows() takes TelemetryRow tuples (see telemetry_rows) that were already decoded
+      and range-checked by the caller; the typed backends store them without ever
+      building a TelemetryRecord, the default backend builds one via model_construct.
+
+    Retention / memory budget:
+    - add_records() only prunes the sats it writes; sweep_slice() (driven by
+      RetentionSweeper) walks all sats round-robin in bounded slices and drops
+      expired samples, removing sats whose window became empty.
+    - max_total_records (optional) is a hard cap on raw records + rollup buckets;
+      enforce_budget() evicts whole sats in least-recently-written order until the
+      store fits.
+    - a sat evicted either way (window empty, or over budget) takes its rollups with it.
+
+    Concurrency:
+    - sats are spread over `shards` shards (crc32(sat_id) % shards), each with its own
+      asyncio.Lock, so writers/readers of different sats do not queue behind each other.
+    - latest_all() reads a copy-on-write snapshot dict that writers replace wholesale
+      after each batch; readers never take a lock and must treat it as read-only.
+    - every published snapshot bumps `version` (monotonic); latest_versioned() returns
+      both, so results computed from a snapshot can be memoized per version.
     """
 
-    def __init__(self, window_seconds: int = 600) -> None:
+    def __init__(
+        self,
+        window_seconds: int = 600,
+        backend: str = "deque",
+        ring_capacity: Optional[int] = None,
+        shards: int = 16,
+        max_total_records: Optional[int] = None,
+        rollup_tiers: Tuple[RollupTier, ...] = DEFAULT_ROLLUP_TIERS,
+        segment_log: Optional[TelemetrySegmentLog] = None,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown store backend {backend!r} (expected one of {BACKENDS})")
+        if shards <= 0:
+            raise ValueError("shards must be > 0")
         self.window_seconds = window_seconds
-        self._store: Dict[str, Deque[TelemetryRecord]] = {}
-        self._lock = asyncio.Lock()
+        self.backend = backend
+        self.ring_capacity = ring_capacity or window_seconds * 2
+        self._shards: List[_Shard] = [_Shard() for _ in range(shards)]
+        self._latest: Dict[str, TelemetryRecord] = {}
+        self.version = 0  # bumped with every published _latest
+        self.rollups: Optional[TelemetryRollups] = TelemetryRollups(rollup_tiers) if rollup_tiers else None
+        self.segment_log = segment_log
+
+        self.max_total_records = max_total_records
+        self._total_records = 0
+        # sat_id -> last write (monotonic), oldest first
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        # sat ids of the current sweep pass (sorted snapshot) and the position in it
+        self._sweep_order: List[str] = []
+        self._sweep_cursor = 0
+
+        self.records_evicted = 0
+        self.bytes_reclaimed = 0
+        self.sats_evicted = 0
+
+    def _shard_index(self, sat_id: str) -> int:
+        return zlib.crc32(sat_id.encode("utf-8")) % len(self._shards)
+
+    def _shard_for(self, sat_id: str) -> _Shard:
+        return self._shards[self._shard_index(sat_id)]
+
+    def _new_series(self, sat_id: str) -> Series:
+        if self.backend == "columnar":
+            return SatRingBuffer(sat_id, self.ring_capacity)
+        if self.backend == "compressed":
+            return GorillaSeries(sat_id)
+        return _RecordSeries(sat_id)
+
+    def _publish_latest(self, changed: Dict[str, Optional[TelemetryRecord]]) -> None:
+        # copy-on-write: never mutate the dict readers may be holding
+        snap = dict(self._latest)
+        for sat_id, r in changed.items():
+            if r is None:
+                snap.pop(sat_id, None)
+            else:
+                snap[sat_id] = r
+        self._latest = snap
+        self.version += 1
 
     async def add_records(self, records: List[TelemetryRecord]) -> None:
+        rows = [row_of(r) for r in records]
+        await self._add(rows, records)
+        if self.segment_log is not None:
+            self.segment_log.append_rows(rows)
+
+    async def add_rows(self, rows: List[TelemetryRow]) -> Dict[str, TelemetryRecord]:
+        """Bulk path for pre-decoded rows. Returns the latest record of every sat written."""
+        changed = await self._add(rows)
+        if self.segment_log is not None:
+            self.segment_log.append_rows(rows)
+        return {sat_id: r for sat_id, r in changed.items() if r is not None}
+
+    async def replay_log(self, on_rows: Optional[Callable[[List[TelemetryRow]], Any]] = None) -> int:
+        """
+        Load the last window from the segment log (startup). Returns records replayed.
+        on_rows sees every replayed block, e.g. DedupIndex.filter_rows so a producer
+        re-sending what the log already held after a restart is still deduplicated.
+        """
+        if self.segment_log is None:
+            return 0
+        replayed = 0
+        for block in self.segment_log.replay():
+            rows = [row_of(r) for r in block]
+            await self._add(rows, block)
+            if on_rows is not None:
+                on_rows(rows)
+            replayed += len(block)
+        return replayed
+
+    async def _add(
+        self, rows: List[TelemetryRow], records: Optional[List[TelemetryRecord]] = None
+    ) -> Dict[str, Optional[TelemetryRecord]]:
+        """Write rows (records[i] is rows[i] as a model, when the caller has one)."""
+        # whole batch refused up front (e.g. a provenance id released while its rows
+        # were queued), before any series is touched
+        check_rows(rows)
         now = time.time()
         cutoff = now - self.window_seconds
-        async with self._lock:
-            for r in records:
-                dq = self._store.setdefault(r.sat_id, deque())
-                dq.append(r)
-                # prune
-                while dq and dq[0].timestamp < cutoff:
-                    dq.popleft()
-    
+        mono = time.monotonic()
+
+        # sat_id -> positions in rows, so each series is looked up and pruned once per batch
+        by_sat_all: Dict[str, List[int]] = {}
+        for i, row in enumerate(rows):
+            by_sat_all.setdefault(row[SAT], []).append(i)
+        by_shard: Dict[int, Dict[str, List[int]]] = {}
+        for sat_id, positions in by_sat_all.items():
+            by_shard.setdefault(self._shard_index(sat_id), {})[sat_id] = positions
+
+        changed: Dict[str, Optional[TelemetryRecord]] = {}
+        for idx, by_sat in by_shard.items():
+            shard = self._shards[idx]
+            await shard.acquire()
+            try:
+                for sat_id, positions in by_sat.items():
+                    s = shard.series.get(sat_id)
+                    if s is None:
+                        s = shard.series[sat_id] = self._new_series(sat_id)
+                    overwritten = 0
+                    for i in positions:
+                        overwritten += s.append_row(rows[i], records[i] if records is not None else None)
+                    before = s.nbytes()
+                    # prune
+                    dropped = s.prune(cutoff)
+                    self._total_records += len(positions) - overwritten - dropped
+                    if overwritten or dropped:
+                        self.records_evicted += overwritten + dropped
+                        self.bytes_reclaimed += before - s.nbytes()
+                    if self.rollups is not None:
+                        self.rollups.add_rows(sat_id, [rows[i] for i in positions])
+                    changed[sat_id] = s.latest()
+                    self._lru[sat_id] = mono
+                    self._lru.move_to_end(sat_id)
+            finally:
+                shard.lock.release()
+
+        if changed:
+            self._publish_latest(changed)
+
+        if self.max_total_records is not None and self._budget_used() > self.max_total_records:
+            await self.enforce_budget()
+        return changed
+
+    def _budget_used(self) -> int:
+        """What max_total_records caps: raw records plus rollup buckets."""
+        return self._total_records + (self.rollups.buckets if self.rollups is not None else 0)
+
+    def _drop_series(self, shard: _Shard, sat_id: str) -> int:
+        """Remove one sat entirely (caller holds the shard lock). Returns records dropped."""
+        s = shard.series.pop(sat_id, None)
+        self._lru.pop(sat_id, None)
+        if self.rollups is not None:
+            self.rollups.drop(sat_id)
+        if s is None:
+            return 0
+        n = len(s)
+        self._total_records -= n
+        self.records_evicted += n
+        self.bytes_reclaimed += s.nbytes()
+        self.sats_evicted += 1
+        return n
+
+    async def sweep_slice(self, max_sats: int = 256, now: Optional[float] = None) -> int:
+        """
+        Prune expired samples for up to max_sats sats, continuing from where the previous
+        slice stopped. Sats left empty are removed from the store and from the latest
+        snapshot. Returns the number of records evicted in this slice.
+
+        A pass walks a sorted snapshot of the sat ids taken when the previous pass ended,
+        so writes reordering the LRU between slices cannot make a sat skip a pass; sats
+        added meanwhile are picked up by the next pass.
+        """
+        cutoff = (now if now is not None else time.time()) - self.window_seconds
+        if self._sweep_cursor >= len(self._sweep_order):
+            self._sweep_order = sorted(self._lru)
+            self._sweep_cursor = 0
+        start = self._sweep_cursor
+        batch = self._sweep_order[start:start + max_sats]
+        self._sweep_cursor = start + len(batch)
+        if not batch:
+            return 0
+
+        evicted = 0
+        removed: Dict[str, Optional[TelemetryRecord]] = {}
+        for sat_id in batch:
+            shard = self._shard_for(sat_id)
+            await shard.acquire()
+            try:
+                s = shard.series.get(sat_id)
+                if s is None:
+                    continue
+                before = s.nbytes()
+                dropped = s.prune(cutoff)
+                if dropped:
+                    self._total_records -= dropped
+                    self.records_evicted += dropped
+                    self.bytes_reclaimed += before - s.nbytes()
+                    evicted += dropped
+                if not len(s):
+                    self._drop_series(shard, sat_id)
+                    removed[sat_id] = None
+            finally:
+                shard.lock.release()
+
+        if removed:
+            self._publish_latest(removed)
+        return evicted
+
+    async def enforce_budget(self) -> int:
+        """Evict least-recently-written sats until records + rollup buckets <= max_total_records."""
+        if self.max_total_records is None:
+            return 0
+        evicted = 0
+        removed: Dict[str, Optional[TelemetryRecord]] = {}
+        while self._budget_used() > self.max_total_records and self._lru:
+            sat_id = next(iter(self._lru))
+            shard = self._shard_for(sat_id)
+            await shard.acquire()
+            try:
+                evicted += self._drop_series(shard, sat_id)
+            finally:
+                shard.lock.release()
+            removed[sat_id] = None
+        if removed:
+            self._publish_latest(removed)
+        return evicted
+
+    def provenance_ids(self) -> Set[int]:
+        """Provenance ids referenced by stored samples (ProvenanceInterner holder)."""
+        out: Set[int] = set()
+        for shard in self._shards:
+            for s in shard.series.values():
+                out |= s.provenance_ids()
+        return out
+
+    def tracked_sats(self) -> int:
+        """Number of sats holding a series (including ones whose window is empty)."""
+        return len(self._lru)
+
+    def snapshot(self) -> Dict[str, TelemetryRecord]:
+        """Lock-free view of the latest record per sat (read-only)."""
+        return self._latest
 
     async def latest_all(self) -> Dict[str, TelemetryRecord]:
-        async with self._lock:
-            out: Dict[str, TelemetryRecord] = {}
-            for sat_id, dq in self._store.items():
-                if dq:
-                    out[sat_id] = dq[-1]
-            return out
+        return self._latest
+
+    async def latest_versioned(self) -> Tuple[int, Dict[str, TelemetryRecord]]:
+        """(version, snapshot): the same version always means the same snapshot."""
+        return self.version, self._latest
 
     async def recent_sat(self, sat_id: str, minutes: int = 5) -> List[TelemetryRecord]:
         now = time.time()
         cutoff = now - minutes * 60
-        async with self._lock:
-            dq = self._store.get(sat_id)
-            if not dq:
+        return await self.range_sat(sat_id, start=cutoff)
+
+    async def range_sat(
+        self, sat_id: str, start: float, end: Optional[float] = None
+    ) -> List[TelemetryRecord]:
+        """Records of one sat with start <= timestamp <= end (bisect on the timestamp index)."""
+        shard = self._shard_for(sat_id)
+        await shard.acquire()
+        try:
+            s = shard.series.get(sat_id)
+            if s is None:
                 return []
-            return [r for r in dq if r.timestamp >= cutoff]
+            return s.range(start, end)
+        finally:
+            shard.lock.release()
+
+    async def history_sat(
+        self, sat_id: str, start: float, end: Optional[float] = None
+    ) -> Tuple[str, List[Any]]:
+        """
+        Pick the source for [start, end]: raw records if start is inside the live window,
+        else the finest rollup tier whose retention covers start.
+        Returns (tier_name, items) where tier_name is "raw" or e.g. "60s".
+        """
+        now = time.time()
+        if self.rollups is None or start >= now - self.window_seconds:
+            return "raw", await self.range_sat(sat_id, start, end)
+        tier = self.rollups.tier_for(start, now)
+        if tier is None:
+            return "raw", await self.range_sat(sat_id, start, end)
+        return tier.name, self.rollups.range(tier, sat_id, start, end)
+
+    def prune_rollups(self, now: Optional[float] = None) -> int:
+        if self.rollups is None:
+            return 0
+        return self.rollups.prune(now if now is not None else time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        acquisitions = sum(s.acquisitions for s in self._shards)
+        lock_wait_s = sum(s.lock_wait_s for s in self._shards)
+        return {
+            "backend": self.backend,
+            "window_seconds": self.window_seconds,
+            "shards": len(self._shards),
+            "satellites": len(self._latest),
+            "version": self.version,
+            "records": self._total_records,
+            "bytes": sum(x.nbytes() for s in self._shards for x in s.series.values()),
+            "max_total_records": self.max_total_records,
+            "budget_used": self._budget_used(),
+            "records_evicted": self.records_evicted,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "sats_evicted": self.sats_evicted,
+            "rollups": self.rollups.stats() if self.rollups is not None else None,
+            "segment_log": self.segment_log.stats() if self.segment_log is not None else None,
+            "lock_acquisitions": acquisitions,
+            "lock_wait_ms_total": round(lock_wait_s * 1000.0, 3),
+            "lock_wait_ms_avg": round(lock_wait_s * 1000.0 / acquisitions, 6) if acquisitions else 0.0,
+        }
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.telemetry_rows import (
+    ALT, LAT, LINK, LINK_STATES, LOSS, LON, RSSI, SAT, SNR, TS, TelemetryRow, row_of,
+)
+
+
+# metrics that get min / max / mean / last per bucket (name, row index)
+ROLLUP_METRICS: Tuple[Tuple[str, int], ...] = (("snr_db", SNR), ("rssi_dbm", RSSI), ("packet_loss_pct", LOSS))
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    resolution_sec: int
+    retention_sec: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.resolution_sec}s"
+
+
+# raw samples (~1s) stay in TelemetryStateStore's window; these extend history beyond it
+DEFAULT_ROLLUP_TIERS: Tuple[RollupTier, ...] = (
+    RollupTier(resolution_sec=10, retention_sec=6 * 3600),
+    RollupTier(resolution_sec=60, retention_sec=24 * 3600),
+)
+
+
+class _RollupSeries:
+    """
+    Time-ordered buckets of one tier for ONE satellite, stored column-wise.
+    Per metric: min / max / sum / last (mean = sum / count). Position and link_state
+    keep the last sample of the bucket.
+    """
+
+    __slots__ = ("res", "start", "count", "last_ts", "lat", "lon", "alt", "link", "stats", "_head")
+
+    # start, last_ts, lat, lon, alt + 4 per metric (8 bytes each), count (4), link (1)
+    BUCKET_BYTES = 8 * (5 + 4 * len(ROLLUP_METRICS)) + 4 + 1
+
+    def __init__(self, resolution_sec: int) -> None:
+        self.res = resolution_sec
+        self.start = array("d")
+        self.count = array("I")
+        self.last_ts = array("d")
+        self.lat = array("d")
+        self.lon = array("d")
+        self.alt = array("d")
+        self.link = array("B")
+        # metric row index -> (min, max, sum, last)
+        self.stats: Dict[int, Tuple[array, array, array, array]] = {
+            idx: (array("d"), array("d"), array("d"), array("d")) for _, idx in ROLLUP_METRICS
+        }
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self.start) - self._head
+
+    def _columns(self) -> List[array]:
+        cols = [self.start, self.count, self.last_ts, self.lat, self.lon, self.alt, self.link]
+        for c in self.stats.values():
+            cols.extend(c)
+        return cols
+
+    def _insert_bucket(self, i: int, bstart: float, grp: List[TelemetryRow], newest: TelemetryRow) -> None:
+        self.start.insert(i, bstart)
+        self.count.insert(i, len(grp))
+        self.last_ts.insert(i, newest[TS])
+        self.lat.insert(i, newest[LAT])
+        self.lon.insert(i, newest[LON])
+        self.alt.insert(i, newest[ALT])
+        self.link.insert(i, newest[LINK])
+        for m, (mn, mx, sm, last) in self.stats.items():
+            vals = [r[m] for r in grp]
+            mn.insert(i, min(vals))
+            mx.insert(i, max(vals))
+            sm.insert(i, sum(vals))
+            last.insert(i, newest[m])
+
+    def add(self, r: TelemetryRow) -> int:
+        return self._merge(math.floor(r[TS] / self.res) * self.res, [r])
+
+    def add_many(self, rows: List[TelemetryRow]) -> int:
+        """
+        Rows of one batch: consecutive rows in the same bucket are folded in one step.
+        Returns buckets opened.
+        """
+        res = self.res
+        opened = 0
+        for bstart, grp in groupby(rows, key=lambda r: math.floor(r[TS] / res) * res):
+            opened += self._merge(bstart, list(grp))
+        return opened
+
+    def _merge(self, bstart: float, grp: List[TelemetryRow]) -> int:
+        newest = grp[0] if len(grp) == 1 else max(grp, key=itemgetter(TS))
+        n = len(self.start)
+        if n == self._head or bstart > self.start[-1]:
+            self._insert_bucket(n, bstart, grp, newest)
+            return 1
+
+        if bstart == self.start[-1]:
+            i = n - 1
+        else:
+            i = bisect_left(self.start, bstart, self._head)
+            if i == n or self.start[i] != bstart:
+                # rare out-of-order sample opening an older bucket
+                self._insert_bucket(i, bstart, grp, newest)
+                return 1
+
+        self.count[i] += len(grp)
+        newer = newest[TS] >= self.last_ts[i]
+        if newer:
+            self.last_ts[i] = newest[TS]
+            self.lat[i] = newest[LAT]
+            self.lon[i] = newest[LON]
+            self.alt[i] = newest[ALT]
+            self.link[i] = newest[LINK]
+        for m, (mn, mx, sm, last) in self.stats.items():
+            vals = [r[m] for r in grp]
+            v = min(vals)
+            if v < mn[i]:
+                mn[i] = v
+            v = max(vals)
+            if v > mx[i]:
+                mx[i] = v
+            sm[i] += sum(vals)
+            if newer:
+                last[i] = newest[m]
+        return 0
+
+    def prune(self, cutoff: float) -> int:
+        """Drop buckets that end before cutoff."""
+        i = bisect_left(self.start, cutoff - self.res, self._head)
+        dropped = i - self._head
+        self._head = i
+        if self._head >= 256 and self._head * 2 >= len(self.start):
+            for col in self._columns():
+                del col[: self._head]
+            self._head = 0
+        return dropped
+
+    def range(self, sat_id: str, start: float, end: Optional[float]) -> List[Dict[str, Any]]:
+        # a bucket overlaps [start, end] if bucket_start + res > start and bucket_start <= end
+        lo = bisect_right(self.start, start - self.res, self._head)
+        hi = len(self.start) if end is None else bisect_right(self.start, end, lo)
+        out: List[Dict[str, Any]] = []
+        for i in range(lo, hi):
+            cnt = self.count[i]
+            item: Dict[str, Any] = {
+                "timestamp": self.start[i],
+                "resolution_sec": self.res,
+                "sat_id": sat_id,
+                "count": cnt,
+                "lat": self.lat[i],
+                "lon": self.lon[i],
+                "alt": self.alt[i],
+                "link_state": LINK_STATES[self.link[i]],
+            }
+            for name, m in ROLLUP_METRICS:
+                mn, mx, sm, last = self.stats[m]
+                item[name] = {"min": mn[i], "max": mx[i], "mean": sm[i] / cnt, "last": last[i]}
+            out.append(item)
+        return out
+
+
+class TelemetryRollups:
+    """
+    Multi-resolution rollups kept up to date on ingest.
+    rollups = { tier: { "SatA": _RollupSeries, ... }, ... }, each tier pruned by its own retention.
+    `buckets` is the live bucket count across tiers (the store's memory budget counts it).
+    """
+
+    def __init__(self, tiers: Tuple[RollupTier, ...] = DEFAULT_ROLLUP_TIERS) -> None:
+        self.tiers = tuple(sorted(tiers, key=lambda t: t.resolution_sec))
+        self._series: Dict[RollupTier, Dict[str, _RollupSeries]] = {t: {} for t in self.tiers}
+        self.buckets = 0
+
+    def add(self, r: TelemetryRecord) -> None:
+        self.add_row(row_of(r))
+
+    def add_row(self, row: TelemetryRow) -> None:
+        self.add_rows(row[SAT], [row])
+
+    def add_rows(self, sat_id: str, rows: List[TelemetryRow]) -> None:
+        """Rows of ONE satellite (one batch)."""
+        for tier, by_sat in self._series.items():
+            s = by_sat.get(sat_id)
+            if s is None:
+                s = by_sat[sat_id] = _RollupSeries(tier.resolution_sec)
+            self.buckets += s.add_many(rows)
+
+    def prune(self, now: float) -> int:
+        """Apply each tier's retention across all sats. Returns buckets dropped."""
+        dropped = 0
+        for tier, by_sat in self._series.items():
+            cutoff = now - tier.retention_sec
+            for sat_id in list(by_sat.keys()):
+                s = by_sat[sat_id]
+                dropped += s.prune(cutoff)
+                if not len(s):
+                    del by_sat[sat_id]
+        self.buckets -= dropped
+        return dropped
+
+    def drop(self, sat_id: str) -> int:
+        """Forget one sat in every tier (evicted from the store). Returns buckets dropped."""
+        dropped = 0
+        for by_sat in self._series.values():
+            s = by_sat.pop(sat_id, None)
+            if s is not None:
+                dropped += len(s)
+        self.buckets -= dropped
+        return dropped
+
+    def tier_for(self, start: float, now: float) -> Optional[RollupTier]:
+        """Finest tier whose retention still reaches back to start."""
+        for tier in self.tiers:
+            if now - tier.retention_sec <= start:
+                return tier
+        return self.tiers[-1] if self.tiers else None
+
+    def range(
+        self, tier: RollupTier, sat_id: str, start: float, end: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        s = self._series.get(tier, {}).get(sat_id)
+        if s is None:
+            return []
+        return s.range(sat_id, start, end)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for tier, by_sat in self._series.items():
+            buckets = sum(len(s) for s in by_sat.values())
+            out[tier.name] = {
+                "retention_sec": tier.retention_sec,
+                "satellites": len(by_sat),
+                "buckets": buckets,
+                "bytes": buckets * _RollupSeries.BUCKET_BYTES,
+            }
+        return out
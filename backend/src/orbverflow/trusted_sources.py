@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.telemetry_rows import construct_record
+
+
+_BATCH_ADAPTER = TypeAdapter(List[TelemetryRecord])
+
+
+class TrustedSource:
+    """
+    In-process producer whose values are already typed (simulator, replay of validated data).
+
+    - record() / records() construct TelemetryRecords without pydantic validation
+    - every sample_every-th record is still validated and compared with the constructed one
+      to catch schema drift (wrong types, missing fields); on drift the source falls back
+      to full validation (one TypeAdapter call per batch) for the rest of the process
+    """
+
+    def __init__(self, name: str, sample_every: int = 100) -> None:
+        if sample_every <= 0:
+            raise ValueError("sample_every must be > 0")
+        self.name = name
+        self.sample_every = sample_every
+        self.validate_all = False
+
+        self.records_built = 0
+        self.sampled = 0
+        self.drift = 0
+        self.last_drift: Optional[str] = None
+
+    def _on_drift(self, detail: str) -> None:
+        self.drift += 1
+        self.last_drift = detail[:500]
+        if not self.validate_all:
+            print(f"[trusted] source {self.name!r} drifted from the schema, validating everything from now on: {detail[:200]}")
+        self.validate_all = True
+
+    def _check(self, fields: Dict[str, Any]) -> TelemetryRecord:
+        self.sampled += 1
+        try:
+            validated = TelemetryRecord(**fields)
+        except ValidationError as e:
+            self._on_drift(str(e))
+            raise
+        built = construct_record(fields)
+        # validation coerced something (e.g. str -> float): the fast path would have stored it raw
+        if any(type(v) is not type(built.__dict__[k]) for k, v in validated.__dict__.items()):
+            self._on_drift(f"coerced fields in {fields!r}")
+        return validated
+
+    def record(self, **fields: Any) -> TelemetryRecord:
+        self.records_built += 1
+        if self.validate_all:
+            return TelemetryRecord(**fields)
+        if (self.records_built - 1) % self.sample_every == 0:  # 1st, N+1th, ...
+            return self._check(fields)
+        return construct_record(fields)
+
+    def records(self, items: List[Dict[str, Any]]) -> List[TelemetryRecord]:
+        """Batch form of record(): same sampling, without a call per record."""
+        if self.validate_all:
+            self.records_built += len(items)
+            return _BATCH_ADAPTER.validate_python(items)
+        out = list(map(construct_record, items))
+        # positions that record() would have validated
+        for i in range(-self.records_built % self.sample_every, len(items), self.sample_every):
+            out[i] = self._check(items[i])
+        self.records_built += len(items)
+        if self.validate_all:
+            # drift showed up in this batch: none of its raw records can be trusted either
+            return _BATCH_ADAPTER.validate_python(items)
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_every": self.sample_every,
+            "validate_all": self.validate_all,
+            "records": self.records_built,
+            "sampled": self.sampled,
+            "drift": self.drift,
+            "last_drift": self.last_drift,
+        }
+
+
+class TrustedSourceRegistry:
+    """name -> TrustedSource; only in-process producers register here, never remote ones."""
+
+    def __init__(self, sample_every: int = 100) -> None:
+        self.sample_every = sample_every
+        self._sources: Dict[str, TrustedSource] = {}
+
+    def register(self, name: str, sample_every: Optional[int] = None) -> TrustedSource:
+        src = self._sources.get(name)
+        if src is None:
+            src = self._sources[name] = TrustedSource(name, sample_every or self.sample_every)
+        return src
+
+    def get(self, name: str) -> Optional[TrustedSource]:
+        return self._sources.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: src.stats() for name, src in self._sources.items()}
+
+
+trusted_sources = TrustedSourceRegistry()
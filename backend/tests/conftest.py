@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the app is run from backend/ with PYTHONPATH=src; do the same for the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
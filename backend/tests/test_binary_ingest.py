@@ -0,0 +1,72 @@
+"""decode_rows(): every malformed payload is a BinaryFormatError, never a stray exception."""
+import struct
+
+import pytest
+
+from orbverflow.binary_ingest import (
+    DEFAULT_FIELDS, LAYOUT_COLUMNS, LAYOUT_ROWS, MAGIC, VERSION, BinaryFormatError, decode_rows,
+)
+from orbverflow.models import Provenance, provenance_interner
+
+PID = provenance_interner.intern_id(Provenance(source_vendor="BIN"))
+
+
+def payload(values, fields=DEFAULT_FIELDS, sats=(b"A",), links=(b"OK",), layout=LAYOUT_ROWS, names=None):
+    """One row per entry of values (dict name -> value), packed with the given field codes."""
+    names = names or [name.encode("utf-8") for name, _ in fields]
+    out = bytearray(struct.pack("<4sHBBII", MAGIC, VERSION, layout, len(fields), PID, len(values)))
+    for raw, (_, code) in zip(names, fields):
+        out += struct.pack("<B", len(raw)) + raw + code.encode("ascii")
+    for table in (sats, links):
+        out += struct.pack("<H", len(table))
+        for s in table:
+            out += struct.pack("<H", len(s)) + s
+    codes = "".join(code for _, code in fields)
+    if layout == LAYOUT_ROWS:
+        for v in values:
+            out += struct.pack("<" + codes, *(v[name] for name, _ in fields))
+    else:
+        for name, code in fields:
+            col = struct.pack("<%d%s" % (len(values), code), *(v[name] for v in values))
+            out += struct.pack("<I", len(col)) + col
+    return bytes(out)
+
+
+ROW = dict(
+    timestamp=1790000000.0, sat_id=0, lat=1.0, lon=2.0, alt=550.0, snr_db=10.0, rssi_dbm=-80.0,
+    packet_loss_pct=1.0, power_watt=5.0, modem_reset_count=0, link_state=0, spoofing=0,
+)
+
+
+def with_code(name, code):
+    return tuple((n, code if n == name else c) for n, c in DEFAULT_FIELDS)
+
+
+@pytest.mark.parametrize("layout", [LAYOUT_ROWS, LAYOUT_COLUMNS])
+def test_well_formed_payload_decodes(layout):
+    rows = decode_rows(payload([ROW, dict(ROW, modem_reset_count=-(2**31))], layout=layout))
+    assert [(r[1], r[9]) for r in rows] == [("A", 0), ("A", -(2**31))]
+
+
+@pytest.mark.parametrize("make", [
+    # non-UTF-8 field name, sat id, link state and type code
+    lambda: payload([ROW], names=[b"\xff\xfe"] + [n.encode() for n, _ in DEFAULT_FIELDS[1:]]),
+    lambda: payload([ROW], sats=(b"\xc3\x28",)),
+    lambda: payload([ROW], links=(b"\x80",)),
+    lambda: payload([ROW]).replace(b"\x03latd", b"\x03lat\xe9"),
+    # signed table indexes are refused; a negative one would wrap in the table
+    lambda: payload([dict(ROW, sat_id=-1)], fields=with_code("sat_id", "h")),
+    lambda: payload([dict(ROW, link_state=-1)], fields=with_code("link_state", "b")),
+    # out-of-range index, modem_reset_count wider than int32
+    lambda: payload([dict(ROW, sat_id=1)]),
+    lambda: payload([dict(ROW, modem_reset_count=2**31)], fields=with_code("modem_reset_count", "q")),
+    lambda: payload([dict(ROW, modem_reset_count=2**40)], fields=with_code("modem_reset_count", "Q"),
+                    layout=LAYOUT_COLUMNS),
+    # truncated, trailing bytes, bad magic
+    lambda: payload([ROW])[:-3],
+    lambda: payload([ROW]) + b"\x00",
+    lambda: b"XXXX" + payload([ROW])[4:],
+])
+def test_malformed_payload_is_a_format_error(make):
+    with pytest.raises(BinaryFormatError):
+        decode_rows(make())
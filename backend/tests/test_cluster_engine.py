@@ -0,0 +1,71 @@
+"""
+ClusterEngine: the incremental tracker (ClusterTracker) must find the same clusters as a
+full recompute, tick after tick, including across the poles and the antimeridian.
+"""
+import math
+import random
+
+import pytest
+
+from orbverflow.engines.cluster_engine import ClusterConfig, ClusterEngine
+from orbverflow.models import TelemetryRecord
+
+
+def fleet_point(rng, mode):
+    if mode == "pole":
+        return rng.uniform(80, 90) * rng.choice([1, -1]), rng.uniform(-180, 180)
+    if mode == "antimeridian":
+        return rng.uniform(-20, 20), rng.choice([rng.uniform(170, 180), rng.uniform(-180, -170)])
+    if mode == "tight":
+        return 10 + rng.uniform(0, 0.01), 20 + rng.uniform(0, 0.01)
+    return math.degrees(math.asin(rng.uniform(-1, 1))), rng.uniform(-180, 180)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_tracker_matches_full_recompute(seed):
+    rng = random.Random(seed)
+    distance = rng.choice([0.0, 5.0, 100.0, 800.0, 1500.0, 5000.0, 15000.0])
+    mode = rng.choice(["pole", "antimeridian", "global", "tight"])
+    n = rng.randint(1, 150)
+
+    def rec(i):
+        lat, lon = fleet_point(rng, mode)
+        degraded = rng.random() < 0.5
+        return TelemetryRecord(
+            timestamp=0.0, sat_id=f"S{i}", lat=lat, lon=lon, alt=550.0,
+            snr_db=2.0 if degraded else 15.0, rssi_dbm=-80.0,
+            packet_loss_pct=90.0 if degraded else 1.0, link_state="OK",
+        )
+
+    latest = {f"S{i}": rec(i) for i in range(n)}
+    full = ClusterEngine(ClusterConfig(distance_km_max=distance))
+    tracker = ClusterEngine(ClusterConfig(distance_km_max=distance, incremental=True))
+    for _ in range(12):
+        # some sats move / change health, new ones appear, one may drop out
+        for _ in range(rng.choice([0, 1, 3, 10, n])):
+            i = rng.randrange(n + 5)
+            latest[f"S{i}"] = rec(i)
+        if rng.random() < 0.2 and latest:
+            latest.pop(rng.choice(list(latest)))
+
+        want = sorted(sorted(c.members) for c in full.suggest_clusters(latest).clusters)
+        res = tracker.suggest_clusters(latest)
+        assert sorted(sorted(c.members) for c in res.clusters) == want
+        assert len({c.cluster_id for c in res.clusters}) == len(res.clusters)
+
+
+def test_tracker_keeps_cluster_ids_for_unchanged_clusters():
+    def rec(sat_id, lat, lon):
+        return TelemetryRecord(
+            timestamp=0.0, sat_id=sat_id, lat=lat, lon=lon, alt=550.0, snr_db=2.0,
+            rssi_dbm=-80.0, packet_loss_pct=90.0, link_state="DEGRADED",
+        )
+
+    latest = {s: rec(s, 10.0 + k * 0.1, 20.0) for k, s in enumerate(["A", "B", "C"])}
+    latest.update({s: rec(s, -40.0 + k * 0.1, 100.0) for k, s in enumerate(["D", "E", "F"])})
+    tracker = ClusterEngine(ClusterConfig(distance_km_max=500.0, incremental=True))
+    before = {tuple(sorted(c.members)): c.cluster_id for c in tracker.suggest_clusters(latest).clusters}
+    latest["G"] = rec("G", -40.3, 100.0)  # grows the second cluster only
+    after = {tuple(sorted(c.members)): c.cluster_id for c in tracker.suggest_clusters(latest).clusters}
+    assert after[("A", "B", "C")] == before[("A", "B", "C")]
+    assert ("D", "E", "F", "G") in after
@@ -0,0 +1,69 @@
+"""dbscan(): same core points and clusters as a brute-force O(n^2) DBSCAN (same border rule)."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from orbverflow.engines.dbscan_engine import dbscan, ecef_km  # noqa: E402
+
+REGIONS = [(random.Random(r).uniform(-50, 50), random.Random(r + 100).uniform(-180, 180)) for r in range(12)]
+
+
+def brute_force(xyz, eps, min_samples):
+    n = len(xyz)
+    diff = xyz[:, None, :] - xyz[None, :, :]
+    d2 = np.einsum("ijk,ijk->ij", diff, diff)
+    near = d2 <= eps * eps
+    core = near.sum(axis=1) >= min_samples
+    labels = np.full(n, -1)
+    for i in range(n):
+        if not core[i] or labels[i] >= 0:
+            continue
+        labels[i] = i
+        stack = [i]
+        while stack:
+            x = stack.pop()
+            for y in np.flatnonzero(near[x] & core):
+                if labels[y] < 0:
+                    labels[y] = i
+                    stack.append(y)
+    # a border point joins its nearest core point's cluster (lowest index on ties)
+    for i in np.flatnonzero(~core):
+        cand = np.flatnonzero(near[i] & core)
+        if len(cand):
+            labels[i] = labels[min(cand, key=lambda j: (d2[i, j], j))]
+    return labels, core
+
+
+def partition(labels):
+    groups = {}
+    for i, label in enumerate(labels.tolist()):
+        if label >= 0:
+            groups.setdefault(label, []).append(i)
+    return sorted(groups.values())
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_dbscan_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n = rng.choice([1, 2, 50, 400])
+    pts = []
+    for _ in range(n):
+        if pts and rng.random() < 0.05:
+            pts.append(rng.choice(pts))  # duplicate position
+            continue
+        lat0, lon0 = rng.choice(REGIONS)
+        spread = rng.choice([0.5, 3.0, 30.0])
+        alt = rng.choice([rng.uniform(500, 600), rng.uniform(20100, 20300), 35786.0])
+        pts.append((lat0 + rng.uniform(-spread, spread), lon0 + rng.uniform(-spread, spread), alt))
+    a = np.array(pts, dtype=np.float64)
+    xyz = ecef_km(np.clip(a[:, 0], -90, 90), a[:, 1], a[:, 2])
+    eps = rng.choice([5.0, 80.0, 500.0, 3000.0, 50000.0])
+    min_samples = rng.choice([1, 2, 3, 5, 30])
+
+    labels, core = dbscan(xyz, eps, min_samples)
+    ref_labels, ref_core = brute_force(xyz, eps, min_samples)
+    assert (core == ref_core).all()
+    assert partition(labels) == partition(ref_labels)
+    assert ((labels < 0) == (ref_labels < 0)).all()
@@ -0,0 +1,77 @@
+"""DedupIndex: duplicates inside the window, slice eviction, key budget, far-future keys."""
+import time
+
+from orbverflow.dedup_index import DedupIndex
+
+
+def test_duplicates_inside_the_window():
+    d = DedupIndex(window_seconds=600, slice_seconds=60)
+    now = time.time()
+    assert not d.seen("A", now)
+    assert d.seen("A", now)
+    assert not d.seen("B", now)
+    assert not d.seen("A", now + 0.5)
+    stats = d.stats()
+    assert stats["checked"] == 4 and stats["duplicates"] == 1
+
+
+def test_filter_rows_drops_repeats_within_a_batch():
+    d = DedupIndex()
+    now = time.time()
+    rows = [(now, "A"), (now, "B"), (now, "A"), (now + 1, "A")]
+    kept, dropped = d.filter_rows([(ts, sat) + (0,) * 11 for ts, sat in rows])
+    assert [(r[0], r[1]) for r in kept] == [(now, "A"), (now, "B"), (now + 1, "A")]
+    assert dropped == 1
+    assert d.filter_rows([(now + 1, "A") + (0,) * 11])[1] == 1
+
+
+def test_keys_behind_the_window_are_untracked():
+    d = DedupIndex(window_seconds=120, slice_seconds=60)
+    now = time.time()
+    old = now - 600
+    assert not d.seen("A", old)
+    assert not d.seen("A", now)  # the newest slice moves past the old key
+    stats = d.stats()
+    assert stats["slices_evicted"] == 1 and stats["keys"] == 1
+    # the old key is no longer tracked: let through (the store's window discards it)
+    assert not d.seen("A", old)
+    assert not d.seen("A", old)
+    assert d.stats()["untracked"] == 2
+    assert d.seen("A", now)
+
+
+def test_slices_older_than_the_window_are_dropped_whole():
+    d = DedupIndex(window_seconds=120, slice_seconds=60)
+    base = (time.time() // 60) * 60 - 600
+    for k in range(10):
+        d.seen("A", base + 60 * k)
+    stats = d.stats()
+    assert stats["slices"] <= 120 // 60 + 1
+    assert stats["keys"] == stats["slices"]
+
+
+def test_key_budget_drops_oldest_slices_but_not_the_newest():
+    d = DedupIndex(window_seconds=600, slice_seconds=60, max_keys=5)
+    base = (time.time() // 60) * 60 - 300
+    for i in range(4):
+        d.seen(f"S{i}", base)
+    for i in range(4):
+        d.seen(f"S{i}", base + 60)
+    assert d.stats()["keys"] == 4  # the older slice went once the budget was hit
+    assert not d.seen("S0", base)  # so its keys are forgotten
+    for i in range(10):
+        d.seen(f"T{i}", base + 120)
+    assert d.stats()["keys"] == 10  # the slice being written is never dropped
+    assert d.seen("T3", base + 120)
+
+
+def test_far_future_timestamps_do_not_move_the_horizon():
+    d = DedupIndex(window_seconds=600, slice_seconds=60, max_future_sec=300)
+    now = time.time()
+    assert not d.seen("A", now)
+    for _ in range(3):
+        assert not d.seen("B", now + 10 * 86400)  # let through, never recorded
+    assert d.stats()["future"] == 3
+    assert d.seen("A", now)  # normal-time keys stay tracked
+    assert not d.seen("C", now + 120)  # within max_future_sec: tracked normally
+    assert d.seen("C", now + 120)
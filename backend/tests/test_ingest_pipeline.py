@@ -0,0 +1,118 @@
+"""IngestPipeline: unstorable batches refused at submit, a failing write only loses its own batch."""
+import asyncio
+import time
+
+import pytest
+
+from orbverflow.dedup_index import DedupIndex
+from orbverflow.ingest_pipeline import IngestPipeline
+from orbverflow.models import TelemetryRecord
+from orbverflow.segment_log import TelemetrySegmentLog
+from orbverflow.state_store import TelemetryStateStore
+from orbverflow.telemetry_rows import construct_record, row_of
+
+
+def rec(sat_id, ts, **kw):
+    fields = dict(
+        timestamp=ts, sat_id=sat_id, lat=10.0, lon=20.0, alt=550.0, snr_db=12.0,
+        rssi_dbm=-85.0, packet_loss_pct=1.0, link_state="OK",
+    )
+    fields.update(kw)
+    return TelemetryRecord(**fields)
+
+
+class FlakyStore(TelemetryStateStore):
+    """Refuses any write that contains a record of a sat in self.bad."""
+
+    bad = {"BAD"}
+
+    async def add_records(self, records):
+        if any(r.sat_id in self.bad for r in records):
+            raise RuntimeError("disk full")
+        await super().add_records(records)
+
+    async def add_rows(self, rows):
+        if any(r[1] in self.bad for r in rows):
+            raise RuntimeError("disk full")
+        return await super().add_rows(rows)
+
+
+async def written(store):
+    return {sat: [r.timestamp for r in await store.range_sat(sat, 0.0)] for sat in await store.latest_all()}
+
+
+def test_unstorable_batch_is_refused_at_submit():
+    async def main():
+        now = time.time()
+        pipe = IngestPipeline(TelemetryStateStore(window_seconds=600))
+        # built on the trusted path, so the model bound never ran
+        bad = construct_record(dict(rec("A", now).model_dump(exclude={"provenance"}), modem_reset_count=2**40))
+        with pytest.raises(ValueError):
+            pipe.try_submit(records=[bad])
+        with pytest.raises(ValueError):
+            await pipe.submit(rows=[row_of(bad)])
+        stats = pipe.stats()
+        assert stats["batches_invalid"] == 2 and stats["batches_in"] == 0 and stats["queue_depth"] == 0
+
+    asyncio.run(main())
+
+
+def test_failed_merged_write_only_drops_the_bad_batch():
+    async def main():
+        now = time.time()
+        store = FlakyStore(window_seconds=600)
+        pipe = IngestPipeline(store)
+        pipe.try_submit(records=[rec("A", now)])
+        pipe.try_submit(records=[rec("BAD", now)])
+        pipe.try_submit(records=[rec("B", now), rec("B", now - 1)])
+        pipe.try_submit(rows=[row_of(rec("C", now))])
+        pipe.start()
+        await pipe.drain()
+        assert await written(store) == {"A": [now], "B": [now - 1, now], "C": [now]}
+        stats = pipe.stats()
+        assert stats["write_failures"] == 1 and stats["records_failed"] == 1
+        assert stats["records_written"] == 4 and stats["queued_records"] == 0
+        assert "disk full" in stats["last_write_error"]
+
+    asyncio.run(main())
+
+
+def test_retry_after_a_failed_write_is_not_a_duplicate():
+    async def main():
+        now = time.time()
+        store = FlakyStore(window_seconds=600)
+        pipe = IngestPipeline(store, dedup=DedupIndex(window_seconds=600))
+        pipe.start()
+        batch = [rec("BAD", now), rec("BAD", now - 1)]
+        assert pipe.try_submit(records=batch) == 0
+        assert pipe.try_submit(rows=[row_of(rec("BAD", now - 2))]) == 0
+        await pipe.drain()
+        assert await written(store) == {} and pipe.stats()["records_failed"] == 3
+
+        store.bad = set()  # the producer retries once the store recovers
+        assert pipe.try_submit(records=batch) == 0
+        assert pipe.try_submit(rows=[row_of(rec("BAD", now - 2))]) == 0
+        await pipe.drain()
+        assert await written(store) == {"BAD": [now - 2, now - 1, now]}
+        # and once written, a re-send is a duplicate again
+        assert pipe.try_submit(records=batch) == 2
+
+    asyncio.run(main())
+
+
+def test_replayed_log_seeds_the_dedup_index(tmp_path):
+    async def main():
+        now = time.time()
+        batch = [rec("A", now - 2), rec("A", now - 1), rec("B", now - 1)]
+        log = TelemetrySegmentLog(str(tmp_path), window_seconds=600)
+        await TelemetryStateStore(window_seconds=600, segment_log=log).add_records(batch)
+        log.close()
+
+        # restart: a fresh store and index refilled from the log
+        store = TelemetryStateStore(window_seconds=600, segment_log=TelemetrySegmentLog(str(tmp_path)))
+        pipe = IngestPipeline(store, dedup=DedupIndex(window_seconds=600))
+        assert await store.replay_log(on_rows=pipe.dedup.filter_rows) == 3
+        # the producer re-sends what it had not seen acked before the restart
+        assert pipe.try_submit(records=batch + [rec("B", now)]) == 3
+
+    asyncio.run(main())
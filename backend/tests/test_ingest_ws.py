@@ -0,0 +1,93 @@
+"""WS ingest: a frame that fails to decode or validate gets an error frame; the socket stays open."""
+import asyncio
+import json
+import time
+
+from fastapi import WebSocketDisconnect
+
+from orbverflow.app_state import ingest_sessions
+from orbverflow.binary_ingest import encode_records
+from orbverflow.models import Provenance, TelemetryRecord, provenance_interner
+from orbverflow.routes.ingest import _FRAME_SEQ, _sequenced_ingest, ws_ingest
+
+
+class FakeWS:
+    """Plays back frames, then disconnects; records what the server sends."""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, payload):
+        self.sent.append(payload)
+
+    async def close(self, code=1000):
+        self.closed = True
+
+    async def receive(self):
+        if not self.frames:
+            return {"type": "websocket.disconnect"}
+        return self.frames.pop(0)
+
+    async def receive_json(self):
+        if not self.frames:
+            raise WebSocketDisconnect()
+        return json.loads(self.frames.pop(0)["text"])
+
+
+def record(sat_id, **kw):
+    fields = dict(
+        timestamp=time.time(), sat_id=sat_id, lat=0.0, lon=0.0, alt=550.0, snr_db=10.0,
+        rssi_dbm=-80.0, packet_loss_pct=0.0, link_state="OK",
+    )
+    fields.update(kw)
+    return fields
+
+
+def text(payload):
+    return {"type": "websocket.receive", "text": json.dumps(payload)}
+
+
+def batch(seq, *records):
+    return text({"type": "batch", "seq": seq, "scenario": "NORMAL", "tick": 1, "records": list(records)})
+
+
+def binary(seq, payload):
+    return {"type": "websocket.receive", "bytes": _FRAME_SEQ.pack(seq) + payload}
+
+
+def test_sequenced_bad_frames_get_an_error_and_the_stream_goes_on(monkeypatch):
+    monkeypatch.setattr(ingest_sessions, "ack_every", 1)
+    pid = provenance_interner.intern_id(Provenance(source_vendor="WS"))
+    good = encode_records([TelemetryRecord(**record("WS-B"))], pid)
+    ws = FakeWS([
+        batch(1, record("WS-A")),
+        binary(2, good.replace(b"WS-B", b"\xff\xfe-B")),  # non-UTF-8 sat id
+        batch(3, record("WS-A", modem_reset_count=2**40)),  # out of the int32 column
+        binary(4, good[:-1]),
+        binary(5, good),
+    ])
+    asyncio.run(_sequenced_ingest(ws, {"type": "hello", "producer_id": "test-bad-frames"}))
+
+    errors = [m for m in ws.sent if m["type"] == "error"]
+    assert [m["seq"] for m in errors] == [2, 3, 4]
+    assert all(m["detail"].startswith("frame rejected") for m in errors)
+    assert [m["seq"] for m in ws.sent if m["type"] == "ack"][-1] == 5
+    assert not ws.closed
+    session = ingest_sessions.get("test-bad-frames")
+    assert (session.frames, session.rejected, session.last_seq) == (2, 3, 5)
+
+
+def test_legacy_bad_batch_gets_an_error_and_the_socket_stays_open():
+    ws = FakeWS([
+        text({"scenario": "NORMAL", "tick": 1, "records": [record("WS-L", modem_reset_count=-(2**31) - 1)]}),
+        text(["not", "a", "batch"]),
+        text({"scenario": "NORMAL", "tick": 2, "records": [record("WS-L")]}),
+    ])
+    asyncio.run(ws_ingest(ws))
+    assert [m["ok"] for m in ws.sent] == [False, False, True]
+    assert ws.sent[-1]["ingested"] == 1
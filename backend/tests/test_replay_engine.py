@@ -0,0 +1,142 @@
+"""ReplayEngine: replay clock pacing, rebasing, seek, pause / resume, against a fake pipeline."""
+import asyncio
+import random
+import time
+
+import pytest
+
+from orbverflow.models import TelemetryRecord
+from orbverflow.replay_engine import ReplayEngine, ReplayStateError
+from orbverflow.telemetry_rows import TS, row_of
+
+
+class FakePipeline:
+    def __init__(self):
+        self.rows = []
+        self.sent_at = []
+
+    async def submit(self, rows=None, records=None):
+        self.rows.extend(rows)
+        self.sent_at.extend([time.time()] * len(rows))
+        return 0
+
+
+def pack(n, step=1.0, start=1000.0, shuffle=True):
+    rows = [
+        row_of(TelemetryRecord(
+            timestamp=start + i * step, sat_id=f"S{i % 3}", lat=1.0, lon=2.0, alt=550.0,
+            snr_db=10.0, rssi_dbm=-80.0, packet_loss_pct=0.0, link_state="OK",
+        ))
+        for i in range(n)
+    ]
+    if shuffle:
+        random.Random(n).shuffle(rows)
+    return rows
+
+
+async def wait_until(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def test_speed_zero_sends_every_row_in_timestamp_order():
+    async def main():
+        pipe = FakePipeline()
+        replay = ReplayEngine(pipe, max_batch_rows=7)
+        rows = pack(100)
+        replay.start(lambda: list(rows), "test", speed=0, rebase_timestamps=False)
+        await wait_until(lambda: replay.state == "finished")
+        assert [r[TS] for r in pipe.rows] == sorted(r[TS] for r in rows)
+        status = replay.status()
+        assert status["rows_sent"] == 100 and status["pct"] == 100.0 and status["batches"] == 15
+        replay.stop()
+
+    asyncio.run(main())
+
+
+def test_speed_zero_rebases_the_pack_to_end_now():
+    async def main():
+        pipe = FakePipeline()
+        replay = ReplayEngine(pipe)
+        replay.start(lambda: pack(50, step=2.0), "test", speed=0)
+        await wait_until(lambda: replay.state == "finished")
+        ts = [r[TS] for r in pipe.rows]
+        assert abs(ts[-1] - time.time()) < 1.0
+        assert all(b - a == pytest.approx(2.0, abs=1e-5) for a, b in zip(ts, ts[1:]))
+        replay.stop()
+
+    asyncio.run(main())
+
+
+def test_clock_paces_rows_at_the_replay_speed():
+    async def main():
+        pipe = FakePipeline()
+        replay = ReplayEngine(pipe, tick_ms=5)
+        replay.start(lambda: pack(21, step=0.1), "test", speed=4.0)
+        t0 = time.time()
+        await wait_until(lambda: replay.state == "finished")
+        # 2 s of pack at 4x
+        assert time.time() - t0 >= 0.45
+        ts = [r[TS] for r in pipe.rows]
+        assert all(b - a == pytest.approx(0.025, abs=1e-5) for a, b in zip(ts, ts[1:]))
+        # a row is never sent before its rebased (wall clock) time
+        for row_ts, sent in zip(ts, pipe.sent_at):
+            assert sent >= row_ts - 0.01
+        replay.stop()
+
+    asyncio.run(main())
+
+
+def test_seek_jumps_and_clamps_to_the_pack():
+    async def main():
+        pipe = FakePipeline()
+        replay = ReplayEngine(pipe)
+        replay.start(lambda: pack(100), "test", speed=0, rebase_timestamps=False, paused=True)
+        await wait_until(lambda: replay.state == "paused")
+        replay.seek(50)
+        assert replay.status()["position_sec"] == 50.0
+        replay.resume()
+        await wait_until(lambda: replay.state == "finished")
+        assert [r[TS] for r in pipe.rows] == [1000.0 + i for i in range(50, 100)]
+
+        replay.seek(10_000)  # past the end: clamped, finished -> paused
+        assert replay.state == "paused" and replay.status()["position"] == 1099.0
+        replay.seek(-5)
+        assert replay.status()["position_sec"] == 0.0
+        replay.stop()
+
+    asyncio.run(main())
+
+
+def test_start_offset_applies_while_loading():
+    async def main():
+        pipe = FakePipeline()
+        replay = ReplayEngine(pipe)
+        replay.start(lambda: pack(20), "test", speed=0, rebase_timestamps=False, start_offset_sec=15)
+        await wait_until(lambda: replay.state == "finished")
+        assert [r[TS] for r in pipe.rows] == [1015.0 + i for i in range(5)]
+        replay.stop()
+
+    asyncio.run(main())
+
+
+def test_pause_holds_rows_until_resume():
+    async def main():
+        pipe = FakePipeline()
+        replay = ReplayEngine(pipe, tick_ms=5)
+        replay.start(lambda: pack(40, step=0.05), "test", speed=1.0)
+        await wait_until(lambda: len(pipe.rows) >= 5)
+        replay.pause()
+        held = len(pipe.rows)
+        await asyncio.sleep(0.3)
+        assert len(pipe.rows) == held and replay.state == "paused"
+        replay.resume()
+        await wait_until(lambda: replay.state == "finished")
+        assert len(pipe.rows) == 40
+        replay.stop()
+        with pytest.raises(ReplayStateError):
+            replay.pause()
+
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+"""
+TelemetryStateStore: the deque, columnar and compressed backends must hold the same
+records; retention sweeps, the record budget and LRU eviction.
+"""
+import asyncio
+import random
+import time
+
+import pytest
+
+from orbverflow.models import Provenance, TelemetryRecord
+from orbverflow.retention_sweeper import RetentionSweeper
+from orbverflow.state_store import BACKENDS, TelemetryStateStore
+from orbverflow.telemetry_rollups import RollupTier
+from orbverflow.telemetry_rows import row_of
+
+
+def rec(sat_id, ts, **kw):
+    fields = dict(
+        timestamp=ts, sat_id=sat_id, lat=10.0, lon=20.0, alt=550.0, snr_db=12.0,
+        rssi_dbm=-85.0, packet_loss_pct=1.0, link_state="OK",
+    )
+    fields.update(kw)
+    return TelemetryRecord(**fields)
+
+
+def random_batches(seed, now, sats=12, batches=30):
+    """Batches of records near now: several sats, some out-of-order, varied fields."""
+    rng = random.Random(seed)
+    provs = [Provenance(), Provenance(source_vendor="AIRBUS", source_file="t.json")]
+    used = set()
+    out = []
+    for _ in range(batches):
+        batch = []
+        for _ in range(rng.randint(1, 40)):
+            sat = f"S{rng.randrange(sats)}"
+            ts = round(now - rng.uniform(0, 500), 3)
+            if (sat, ts) in used:
+                continue
+            used.add((sat, ts))
+            batch.append(rec(
+                sat, ts,
+                lat=rng.uniform(-90, 90), lon=rng.uniform(-180, 180), alt=rng.uniform(400, 36000),
+                snr_db=rng.uniform(-5, 25), rssi_dbm=rng.uniform(-140, -40), packet_loss_pct=rng.uniform(0, 100),
+                modem_reset_count=rng.choice([rng.randint(0, 9), -1, -(2**31), 2**31 - 1]), power_watt=rng.choice([None, 0.0, rng.uniform(1, 90)]),
+                link_state=rng.choice(["OK", "DEGRADED", "DOWN", "SAFE_MODE"]), spoofing=rng.random() < 0.1,
+                provenance=rng.choice(provs),
+            ))
+        out.append(batch)
+    return out
+
+
+def dump(records):
+    return [r.model_dump() for r in records]
+
+
+async def contents(store, sat_ids):
+    latest = await store.latest_all()
+    return (
+        {sat: dump(await store.range_sat(sat, 0.0)) for sat in sat_ids},
+        {sat: r.model_dump() for sat, r in latest.items()},
+        store.stats()["records"],
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_backends_hold_the_same_records(seed):
+    async def main():
+        now = time.time()
+        batches = random_batches(seed, now)
+        sat_ids = sorted({r.sat_id for b in batches for r in b})
+        results = {}
+        for backend in BACKENDS:
+            store = TelemetryStateStore(window_seconds=600, backend=backend, shards=4)
+            for i, batch in enumerate(batches):
+                if i % 2:
+                    await store.add_records(batch)
+                else:
+                    await store.add_rows([row_of(r) for r in batch])
+            before = await contents(store, sat_ids)
+            # half the window expires
+            await store.sweep_slice(max_sats=1000, now=now + 350)
+            results[backend] = (before, await contents(store, sat_ids))
+        expected = results["deque"]
+        n = sum(len(v) for v in expected[0][0].values())
+        assert n == expected[0][2] == sum(len(b) for b in batches)
+        for backend in BACKENDS:
+            assert results[backend] == expected, backend
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_negative_ints_survive_sealed_chunks(backend):
+    async def main():
+        now = round(time.time(), 3)  # the compressed backend keeps microseconds
+        store = TelemetryStateStore(window_seconds=600, backend=backend)
+        resets = [-1, -1, 0, -(2**31), 2**31 - 1, -7] * 50  # enough samples to seal chunks
+        await store.add_records([rec("A", now - 300 + i, modem_reset_count=v) for i, v in enumerate(resets)])
+        assert [r.modem_reset_count for r in await store.range_sat("A", 0.0)] == resets
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_range_is_sorted_and_bounded(backend):
+    async def main():
+        now = round(time.time(), 3)  # the compressed backend keeps microseconds
+        store = TelemetryStateStore(window_seconds=600, backend=backend)
+        stamps = [now - 100, now - 300, now - 10, now - 200, now - 50]
+        await store.add_records([rec("A", ts) for ts in stamps])
+        got = [r.timestamp for r in await store.range_sat("A", now - 250, now - 40)]
+        assert got == sorted(ts for ts in stamps if now - 250 <= ts <= now - 40)
+        assert (await store.latest_all())["A"].timestamp == now - 10
+
+    asyncio.run(main())
+
+
+def test_sweep_drops_expired_records_and_empty_sats():
+    async def main():
+        now = time.time()
+        store = TelemetryStateStore(window_seconds=100)
+        await store.add_records([rec("old", now - 90), rec("mixed", now - 90), rec("mixed", now - 5)])
+        sweeper = RetentionSweeper(store, sats_per_slice=1)
+        evicted = await sweeper.sweep_once(now=now + 20)
+        assert evicted == 2
+        latest = await store.latest_all()
+        assert set(latest) == {"mixed"}
+        assert store.tracked_sats() == 1
+        assert [r.timestamp for r in await store.range_sat("mixed", 0.0)] == [now - 5]
+        assert store.stats()["records"] == 1
+
+    asyncio.run(main())
+
+
+def test_sweep_pass_visits_every_sat_once_despite_writes():
+    async def main():
+        now = time.time()
+        store = TelemetryStateStore(window_seconds=10_000)
+        names = [f"S{i:03d}" for i in range(40)]
+        await store.add_records([rec(s, now - 1) for s in names])
+        visited = []
+        real = store._shard_for
+        rng = random.Random(1)
+        for k in range(10):
+            store._shard_for = lambda s: visited.append(s) or real(s)
+            await store.sweep_slice(max_sats=4, now=now)
+            store._shard_for = real
+            # writes between slices move sats to the LRU tail
+            await store.add_records([rec(s, now + k) for s in rng.sample(names, 5)])
+        assert sorted(visited) == names
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_budget_evicts_least_recently_written_sats(backend):
+    async def main():
+        now = time.time()
+        store = TelemetryStateStore(window_seconds=600, backend=backend, max_total_records=6, rollup_tiers=())
+        for sat in ("A", "B", "C"):
+            await store.add_records([rec(sat, now - 3), rec(sat, now - 2)])
+        await store.add_records([rec("A", now - 1)])  # A is now the most recent write
+        latest = await store.latest_all()
+        assert set(latest) == {"A", "C"}
+        stats = store.stats()
+        assert stats["records"] == 5 and stats["sats_evicted"] == 1
+        await store.add_records([rec("D", now - 1), rec("D", now), rec("D", now - 0.5)])
+        assert set(await store.latest_all()) == {"A", "D"}
+        assert store.stats()["records"] <= 6
+
+    asyncio.run(main())
+
+
+def test_rollups_count_in_the_budget_and_leave_with_their_sat():
+    async def main():
+        now = time.time()
+        tier = RollupTier(resolution_sec=60, retention_sec=3600)
+        store = TelemetryStateStore(window_seconds=100, rollup_tiers=(tier,), max_total_records=8)
+        # per sat: 2 records inside the window + 3 minute buckets = 5 of the budget
+        for sat in ("A", "B"):
+            await store.add_records([rec(sat, now - 60 * k) for k in range(3)])
+        assert set(await store.latest_all()) == {"B"}
+        assert store.rollups.range(tier, "A", 0.0) == []
+        assert store.rollups.buckets == len(store.rollups.range(tier, "B", 0.0)) == 3
+        assert store.stats()["records"] == 2 and store.stats()["budget_used"] == 5
+
+        # the sweeper removes B once its window is empty; its rollups go too
+        await store.sweep_slice(max_sats=10, now=now + 200)
+        assert store.tracked_sats() == 0
+        assert store.rollups.buckets == 0 and store.stats()["budget_used"] == 0
+
+    asyncio.run(main())
+
+
+def test_full_ring_keeps_the_record_count_exact():
+    async def main():
+        now = time.time()
+        store = TelemetryStateStore(window_seconds=600, backend="columnar", ring_capacity=4)
+        await store.add_records([rec("A", now - 10 + i) for i in range(4)])
+        # ring full: one older than all kept samples (dropped), one newer (overwrites the oldest)
+        await store.add_records([rec("A", now - 100), rec("A", now)])
+        kept = await store.range_sat("A", 0.0)
+        assert [r.timestamp for r in kept] == [now - 9, now - 8, now - 7, now]
+        assert store.stats()["records"] == len(kept)
+
+    asyncio.run(main())
+
+
+def test_sweeper_slice_shrinks_under_load_and_grows_back():
+    class TimedStore:
+        """Sweep slices take `delay` seconds; 1000 sats."""
+
+        delay = 0.0
+
+        def tracked_sats(self):
+            return 1000
+
+        async def sweep_slice(self, max_sats, now=None):
+            time.sleep(self.delay)
+            return 0
+
+        async def enforce_budget(self):
+            return 0
+
+        def prune_rollups(self, now=None):
+            return 0
+
+    async def main():
+        store = TimedStore()
+        sweeper = RetentionSweeper(store, sats_per_slice=256, slice_budget_ms=5.0)
+        store.delay = 0.01
+        await sweeper.sweep_once()
+        assert sweeper.stats()["slice_size"] == 16
+        await sweeper.sweep_once()  # the next pass starts where the last one ended
+        assert sweeper.stats()["slice_size"] == 16
+        store.delay = 0.0
+        await sweeper.sweep_once()
+        assert sweeper.stats()["slice_size"] == 256
+
+    asyncio.run(main())
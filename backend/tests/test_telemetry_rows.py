@@ -0,0 +1,107 @@
+"""
+The trusted paths that skip pydantic validation (construct_record, record_of over rows,
+binary decode, compiled pack mappings) must build the same TelemetryRecord as validating.
+"""
+import math
+
+import pytest
+
+from orbverflow.airbus.mapping import compile_mapping
+from orbverflow.binary_ingest import LAYOUT_COLUMNS, LAYOUT_ROWS, decode_rows, encode_records
+from orbverflow.models import Provenance, TelemetryRecord, provenance_interner
+from orbverflow.telemetry_rows import construct_record, record_of, row_of
+
+BASE = dict(
+    timestamp=1790000000.25, sat_id="Sat-7", lat=-12.5, lon=179.9, alt=550.0,
+    snr_db=4.2, rssi_dbm=-98.0, packet_loss_pct=88.0, link_state="DEGRADED",
+)
+
+CASES = [
+    BASE,
+    dict(BASE, modem_reset_count=3, power_watt=41.2, spoofing=True),
+    dict(BASE, power_watt=0.0, packet_loss_pct=0.0, link_state="OK"),
+    dict(BASE, link_state="SAFE_MODE", modem_reset_count=2**31 - 1),
+    dict(BASE, lat=90.0, lon=-180.0, alt=35786.0, snr_db=-3.0, rssi_dbm=-140.5),
+    dict(BASE, provenance=Provenance(source_vendor="AIRBUS", source_file="t.json", source_fields=["lat", "lon"])),
+]
+
+
+def _same(a: TelemetryRecord, b: TelemetryRecord) -> None:
+    assert a == b
+    assert a.model_dump() == b.model_dump()
+    assert a.model_dump_json() == b.model_dump_json()
+    assert a.provenance is b.provenance
+
+
+@pytest.mark.parametrize("fields", CASES)
+def test_construct_record_matches_validated(fields):
+    _same(construct_record(dict(fields)), TelemetryRecord(**fields))
+
+
+@pytest.mark.parametrize("fields", CASES)
+def test_row_round_trip_matches_validated(fields):
+    validated = TelemetryRecord(**fields)
+    _same(record_of(row_of(validated)), validated)
+
+
+def test_iso_timestamp_is_decoded_like_the_validator():
+    validated = TelemetryRecord(**dict(BASE, timestamp="2026-01-30T10:10:00Z"))
+    _same(construct_record(dict(BASE, timestamp=validated.timestamp)), validated)
+
+
+@pytest.mark.parametrize("layout", [LAYOUT_ROWS, LAYOUT_COLUMNS])
+def test_binary_decode_matches_validated(layout):
+    prov = provenance_interner.intern(Provenance(source_vendor="BIN"))
+    validated = [TelemetryRecord(**dict(f, provenance=prov)) for f in CASES[:5]]
+    payload = encode_records(validated, provenance_interner.intern_id(prov), layout=layout)
+    decoded = [record_of(row) for row in decode_rows(payload)]
+    assert len(decoded) == len(validated)
+    for got, want in zip(decoded, validated):
+        _same(got, want)
+
+
+MAPPING = {
+    "satelliteId": "sat_id", "ts": "timestamp", "lat": "lat", "lon": "lon",
+    "altMeters": {"to": "alt", "unit": "m"}, "snr": "snr_db", "rssi": "rssi_dbm", "loss": "packet_loss_pct",
+    "pwr": {"to": "power_watt", "scale": 0.001}, "resets": "modem_reset_count",
+    "$derived": {"link_state": {"from": "packet_loss_pct", "bands": [[20, "OK"], [60, "DEGRADED"]], "else": "DOWN"}},
+}
+PACK_ROWS = [
+    {"satelliteId": "SatA", "ts": "2026-01-30T10:10:00Z", "lat": 24.3, "lon": 121.1, "altMeters": 550000,
+     "snr": 4.2, "rssi": -98, "loss": 88, "pwr": 41200, "resets": 2},
+    {"satelliteId": "SatB", "ts": 1790000000.5, "lat": "24.5", "lon": "121.0", "altMeters": "551000",
+     "snr": "5.1", "loss": "12", "resets": ""},
+]
+
+
+@pytest.mark.parametrize("src", PACK_ROWS)
+def test_compiled_mapping_matches_validated(src):
+    mapping = compile_mapping(MAPPING)
+    prov = Provenance(source_vendor="AIRBUS", source_file="telemetry.json")
+    record = mapping.bind(prov)(src)
+    row = mapping.bind(prov, rows=True)(src)
+
+    loss = float(src["loss"])
+    power = src.get("pwr")
+    validated = TelemetryRecord(
+        timestamp=src["ts"], sat_id=src["satelliteId"], lat=src["lat"], lon=src["lon"],
+        alt=float(src["altMeters"]) / 1000.0, snr_db=src["snr"], rssi_dbm=src.get("rssi", -70.0),
+        packet_loss_pct=loss, modem_reset_count=src["resets"] or 0,
+        power_watt=None if power is None else power * 0.001,
+        link_state="OK" if loss < 20 else "DEGRADED" if loss < 60 else "DOWN",
+        provenance=provenance_interner.with_fields(prov, list(MAPPING)[:-1]),
+    )
+    _same(record, validated)
+    _same(record_of(row), validated)
+    assert math.isnan(row[8]) == (power is None)
+
+
+@pytest.mark.parametrize("resets", [2**31, -(2**31) - 1, 2**40])
+def test_out_of_int32_resets_are_rejected_when_received(resets):
+    with pytest.raises(ValueError):
+        TelemetryRecord(**dict(BASE, modem_reset_count=resets))
+    mapping = compile_mapping(MAPPING)
+    src = dict(PACK_ROWS[0], resets=resets)
+    for rows in (False, True):
+        with pytest.raises(ValueError):
+            mapping.bind(Provenance(source_vendor="AIRBUS"), rows=rows)(src)